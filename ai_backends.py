@@ -0,0 +1,236 @@
+# Librarii
+
+from collections import namedtuple
+
+# Array-uri
+import numpy as np
+
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+
+# Toate backend-urile primesc X = [[weekday, hour], ...] si y = [dB, ...]
+#   incremental = True  -> partial_fit() O(1) per esantion, fit() complet doar la cerere
+#   incremental = False -> doar fit() complet, programat de PatternAI
+
+
+# Profilul de antrenare al backend-urilor complete (forest / hgb):
+#   estimators       - arbori (forest) sau iteratii de boosting (hgb)
+#   max_depth        - adancimea maxima a arborilor (None = nelimitata); limiteaza timpul de fit si marimea modelului
+#   min_samples_leaf - observatii minime per frunza
+#   n_jobs           - thread-uri pentru forest (None = 1, -1 = toate nucleele)
+#   max_samples      - plafonul istoricului folosit la o reantrenare (None = tot istoricul)
+#   sampling         - cum se aleg observatiile peste plafon: "recent", "random" sau "stratified" (zi x ora)
+TrainingProfile = namedtuple("TrainingProfile",
+                             "estimators max_depth min_samples_leaf n_jobs max_samples sampling",
+                             defaults=(100, None, 1, None, None, "recent"))
+
+SAMPLING = ("recent", "random", "stratified")
+
+
+class ForestBackend:
+    name = "forest"
+    incremental = False
+
+    def __init__(self, n_estimators=100, n_jobs=None, max_depth=None, min_samples_leaf=1, model=None):
+        self.model = model if model is not None else RandomForestRegressor(
+            n_estimators=n_estimators, n_jobs=n_jobs, max_depth=max_depth, min_samples_leaf=min_samples_leaf)
+
+    @property
+    def ready(self):
+        # Pickle-urile vechi din states*/ contin paduri cu estimators_ gol (salvate in timpul unui fit)
+        return bool(getattr(self.model, "estimators_", None))
+
+    def fit(self, X, y):
+        self.model.fit(X, y)
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+class HistGBBackend:
+    """Gradient boosting pe histograme - fit aproape liniar in numarul de observatii, model de marime fixa."""
+
+    name = "hgb"
+    incremental = False
+
+    def __init__(self, max_iter=100, max_depth=None, min_samples_leaf=20, model=None):
+        # Ziua saptamanii este categorica (0..6), ora ramane numerica
+        self.model = model if model is not None else HistGradientBoostingRegressor(
+            max_iter=max_iter, max_depth=max_depth, min_samples_leaf=min_samples_leaf,
+            categorical_features=[0], early_stopping=False)
+
+    @property
+    def ready(self):
+        return hasattr(self.model, "n_iter_")
+
+    def fit(self, X, y):
+        self.model.fit(X, y)
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+class BinStatsBackend:
+    """Medie curenta per (zi, interval orar) - actualizare O(1), fara reantrenare."""
+
+    name = "bins"
+    incremental = True
+
+    def __init__(self, bin_minutes=15):
+        self.bin_minutes = bin_minutes
+        self.bins_per_day = (24 * 60) // bin_minutes
+        self.counts = np.zeros((7, self.bins_per_day), dtype=np.int64)
+        self.sums = np.zeros((7, self.bins_per_day), dtype=np.float64)
+
+    @property
+    def ready(self):
+        return bool(self.counts.any())
+
+    def _index(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        days = X[:, 0].astype(np.int64) % 7
+        bins = (X[:, 1] * 60 // self.bin_minutes).astype(np.int64) % self.bins_per_day
+        return days, bins
+
+    def fit(self, X, y):
+        self.counts[:] = 0
+        self.sums[:] = 0
+        self.partial_fit(X, y)
+
+    def partial_fit(self, X, y):
+        days, bins = self._index(X)
+        # Un singur esantion - cazul uzual pe fluxul live
+        if len(days) == 1:
+            self.counts[days[0], bins[0]] += 1
+            self.sums[days[0], bins[0]] += float(np.asarray(y).ravel()[0])
+        else:
+            np.add.at(self.counts, (days, bins), 1)
+            np.add.at(self.sums, (days, bins), np.asarray(y, dtype=np.float64))
+
+    def predict(self, X):
+        days, bins = self._index(X)
+        counts = self.counts[days, bins]
+        sums = self.sums[days, bins]
+        # Interval fara date: se foloseste media aceleiasi ore din toate zilele, apoi media globala
+        hour_counts = self.counts.sum(axis=0)[bins]
+        hour_sums = self.sums.sum(axis=0)[bins]
+        total = max(int(self.counts.sum()), 1)
+        fallback = np.where(hour_counts > 0, hour_sums / np.maximum(hour_counts, 1), self.sums.sum() / total)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), fallback)
+
+
+class SGDBackend:
+    """Regresor SGD cu scalare, ca in misc/video_process.py - partial_fit per esantion."""
+
+    name = "sgd"
+    incremental = True
+    warmup = 100
+
+    def __init__(self, scaler=None, model=None):
+        self.scaler = scaler if scaler is not None else StandardScaler()
+        self.model = model if model is not None else SGDRegressor(max_iter=1, tol=None, penalty='l2', alpha=1e-3)
+        self._warmup_X = []
+        self._warmup_y = []
+        self._fitted = hasattr(self.model, "coef_")
+
+    @property
+    def ready(self):
+        return self._fitted
+
+    def fit(self, X, y):
+        self.scaler = StandardScaler()
+        self.model = SGDRegressor(max_iter=1, tol=None, penalty='l2', alpha=1e-3)
+        self.model.partial_fit(self.scaler.fit_transform(X), y)
+        self._warmup_X, self._warmup_y = [], []
+        self._fitted = True
+
+    def partial_fit(self, X, y):
+        if self._fitted:
+            self.model.partial_fit(self.scaler.transform(X), y)
+            return
+        # Primul batch - scaler-ul are nevoie de suficiente observatii
+        self._warmup_X.extend(np.asarray(X).tolist())
+        self._warmup_y.extend(np.asarray(y).ravel().tolist())
+        if len(self._warmup_y) >= self.warmup:
+            self.fit(np.array(self._warmup_X), np.array(self._warmup_y))
+
+    def predict(self, X):
+        return self.model.predict(self.scaler.transform(X))
+
+
+BACKENDS = {
+    ForestBackend.name: ForestBackend,
+    HistGBBackend.name: HistGBBackend,
+    BinStatsBackend.name: BinStatsBackend,
+    SGDBackend.name: SGDBackend,
+}
+
+
+def wrap_legacy_model(state):
+    """Converteste modelul dintr-un pickle vechi (fara cheia "backend") intr-un backend."""
+    # Varianta scaler + SGD din misc/video_process.py
+    if state.get("scaler") is not None:
+        return SGDBackend(scaler=state["scaler"], model=state["model"])
+    return ForestBackend(model=state["model"])
+
+
+def make_backend(name, **options):
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend necunoscut: {name!r} (disponibile: {', '.join(BACKENDS)})")
+    # Optiuni pentru constructor (din profilul de antrenare, limitate de guvernatorul CPU)
+    return cls(**options)
+
+
+def profile_options(name, profile):
+    """Parametrii constructorului backend-ului `name` corespunzatori profilului de antrenare."""
+    if name == ForestBackend.name:
+        return {"n_estimators": profile.estimators, "n_jobs": profile.n_jobs, "max_depth": profile.max_depth,
+                "min_samples_leaf": profile.min_samples_leaf}
+    if name == HistGBBackend.name:
+        return {"max_iter": profile.estimators, "max_depth": profile.max_depth,
+                "min_samples_leaf": profile.min_samples_leaf}
+    # Backend-urile incrementale nu au parametri de antrenare
+    return {}
+
+
+def subsample(X, y, max_samples, mode="recent", bin_minutes=60, seed=0):
+    """Alege cel mult max_samples observatii din istoric (X, y in ordine cronologica).
+
+    recent     - ultimele max_samples
+    random     - esantion uniform, ordinea pastrata
+    stratified - aceeasi cota pentru fiecare interval (zi x bin_minutes), cele mai recente din fiecare;
+                 intervalele cu putine date intra integral, iar cota ramasa se imparte celorlalte
+    """
+    n = len(y)
+    if not max_samples or n <= max_samples:
+        return X, y
+    if mode == "recent":
+        return X[-max_samples:], y[-max_samples:]
+    if mode == "random":
+        keep = np.sort(np.random.default_rng(seed).choice(n, max_samples, replace=False))
+        return X[keep], y[keep]
+    if mode != "stratified":
+        raise ValueError(f"Esantionare necunoscuta: {mode!r} (disponibile: {', '.join(SAMPLING)})")
+    slots = (24 * 60) // bin_minutes
+    bins = (X[:, 0].astype(np.int64) % 7) * slots + (X[:, 1] * 60 // bin_minutes).astype(np.int64) % slots
+    counts = np.bincount(bins, minlength=7 * slots)
+    # Cota per interval: cel mai mare q cu sum(min(counts, q)) <= max_samples
+    sizes = np.sort(counts[counts > 0])
+    filled = np.cumsum(sizes)
+    # Cu primele k intervale (cele mai mici) incluse integral, restul primeste (plafon - filled[k-1]) / (m - k)
+    m = len(sizes)
+    before = np.concatenate([[0], filled[:-1]])
+    quotas = (max_samples - before) // (m - np.arange(m))
+    k = int(np.argmax(sizes > quotas)) if np.any(sizes > quotas) else m
+    quota = int(quotas[k]) if k < m else int(sizes[-1])
+    # Rangul fiecarei observatii in intervalul ei, numarat de la cea mai recenta
+    order = np.lexsort((-np.arange(n), bins))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - starts[bins[order]]
+    keep = rank < quota
+    return X[keep], y[keep]
@@ -0,0 +1,87 @@
+# Coada marginita intre receptie si worker-ul PatternAI
+#
+# Politici cand coada este plina:
+#   drop-oldest  - se elimina cel mai vechi esantion (modelul invata din datele recente)
+#   drop-newest  - esantionul nou se ignora
+#   coalesce     - esantionul nou se comaseaza intr-o medie cu ultima intrare a aceluiasi senzor, daca este
+#                  din aceeasi secunda; altfel se elimina cea mai veche intrare
+# Sub capacitate toate politicile pastreaza fiecare esantion, neschimbat.
+#
+# Worker-ul scoate loturi intregi (get_batch), grupate per senzor, pentru PatternAI.add_observations_bulk.
+
+import collections
+import threading
+
+
+POLICIES = ("drop-oldest", "drop-newest", "coalesce")
+
+
+class SampleQueue:
+    """Coada (senzor, timestamp, dB) cu capacitate fixa - memoria si latenta raman constante la rafale."""
+
+    def __init__(self, maxsize=10000, policy="drop-oldest"):
+        if policy not in POLICIES:
+            raise ValueError(f"Politica necunoscuta: {policy!r} (disponibile: {', '.join(POLICIES)})")
+        if maxsize < 1:
+            raise ValueError("maxsize trebuie sa fie cel putin 1")
+        self.maxsize = maxsize
+        self.policy = policy
+        # Intrari [senzor, timestamp, suma, numar] - numar > 1 doar pentru secundele comasate
+        self._items = collections.deque()
+        # coalesce: ultima intrare din coada per senzor (aceeasi lista ca in _items)
+        self._open = {}
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.coalesced = 0
+
+    def qsize(self):
+        return len(self._items)
+
+    __len__ = qsize
+
+    def put(self, sensor, t, value):
+        """Adauga un esantion fara sa blocheze. Returneaza False daca un esantion (nou sau vechi) s-a pierdut."""
+        with self._cond:
+            kept = True
+            if len(self._items) >= self.maxsize:
+                if self.policy == "coalesce":
+                    entry = self._open.get(sensor)
+                    if entry is not None and int(entry[1]) == int(t):
+                        entry[2] += value
+                        entry[3] += 1
+                        self.coalesced += 1
+                        return True
+                if self.policy == "drop-newest":
+                    self.dropped += 1
+                    return False
+                old = self._items.popleft()
+                self.dropped += old[3]
+                if self._open.get(old[0]) is old:
+                    del self._open[old[0]]
+                kept = False
+            entry = [sensor, t, value, 1]
+            self._items.append(entry)
+            if self.policy == "coalesce":
+                self._open[sensor] = entry
+            self._cond.notify()
+            return kept
+
+    def get_batch(self, max_items=1000, timeout=None):
+        """Asteapta cel putin o intrare si scoate pana la max_items.
+
+        Returneaza {senzor: ([timestamp, ...], [dB, ...])} in ordinea sosirii; {} la timeout.
+        """
+        with self._cond:
+            if not self._items and not self._cond.wait_for(lambda: self._items, timeout):
+                return {}
+            batch = {}
+            for _ in range(min(max_items, len(self._items))):
+                entry = self._items.popleft()
+                sensor, t, total, n = entry
+                # Intrarea scoasa nu mai poate primi esantioane
+                if self._open.get(sensor) is entry:
+                    del self._open[sensor]
+                times, values = batch.setdefault(sensor, ([], []))
+                times.append(t)
+                values.append(total / n)
+            return batch
@@ -0,0 +1,147 @@
+# Alerte de depasire a pragului - histerezis, durata minima, cooldown + jurnal binar de evenimente
+#
+#   inactiv -> (valoare >= prag) -> in asteptare -> (min_duration secunde peste prag - histerezis) -> activ
+#   activ   -> (valoare < prag - histerezis) -> inactiv, fara o noua alerta timp de `cooldown` secunde
+#
+# Interfata este anuntata doar la tranzitii (start / sfarsit), nu la fiecare esantion.
+
+import math
+import os
+import struct
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+
+# O depasire: timpi Unix, nivel maxim si Leq pe durata evenimentului
+Alert = namedtuple("Alert", "sensor_id start end peak leq threshold")
+
+# Inregistrare jurnal: 40 octeti / eveniment
+EVENT_DTYPE = np.dtype([("start", "<f8"), ("duration", "<f4"), ("peak", "<f4"), ("leq", "<f4"),
+                        ("threshold", "<f4"), ("sensor", "S16")])
+
+_MAGIC = b"PAEV"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+
+
+class AlertLog:
+    """Jurnal append-only cu evenimentele incheiate, in format binar de latime fixa."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, EVENT_DTYPE.itemsize))
+        else:
+            with open(path, "rb") as f:
+                magic, version, size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION or size != EVENT_DTYPE.itemsize:
+                raise ValueError(f"{path} nu este un jurnal de alerte valid")
+        self._file = open(path, "ab")
+
+    def append(self, alert):
+        record = np.zeros(1, dtype=EVENT_DTYPE)
+        record["start"] = alert.start
+        record["duration"] = alert.end - alert.start
+        record["peak"] = alert.peak
+        record["leq"] = alert.leq
+        record["threshold"] = alert.threshold
+        record["sensor"] = str(alert.sensor_id).encode()[:16]
+        # Evenimentele sunt rare - fiecare ajunge imediat pe disc
+        with self._lock:
+            # Un eveniment incheiat dupa oprire (thread-ul motorului inca ruleaza) nu mai ajunge in jurnal
+            if self._file.closed:
+                return
+            self._file.write(record.tobytes())
+            self._file.flush()
+
+    def read(self):
+        with self._lock:
+            self._file.flush()
+        with open(self.path, "rb") as f:
+            f.seek(_HEADER.size)
+            data = f.read()
+        usable = len(data) - len(data) % EVENT_DTYPE.itemsize
+        return np.frombuffer(data[:usable], dtype=EVENT_DTYPE)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _SensorAlert:
+    def __init__(self):
+        self.cooldown_until = float('-inf')
+        self.clear()
+
+    def clear(self):
+        self.since = None
+        self.active = False
+        self.peak = float('-inf')
+        self.energy = 0.0
+        self.n = 0
+
+    def accumulate(self, value):
+        self.peak = max(self.peak, value)
+        self.energy += 10.0 ** (value / 10.0)
+        self.n += 1
+
+
+class AlertEngine:
+    """Detectia depasirilor per senzor. update() intoarce ("alert_start" | "alert_end", Alert) sau None."""
+
+    def __init__(self, threshold=40.0, hysteresis=3.0, min_duration=1.0, cooldown=5.0, log_path=None):
+        # Pragul poate fi schimbat oricand (ex. din GUI) - citit la fiecare esantion
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.min_duration = min_duration
+        self.cooldown = cooldown
+        self.log = AlertLog(log_path) if log_path else None
+        self._states = {}
+
+    def active(self, sensor_id):
+        state = self._states.get(sensor_id)
+        return state is not None and state.active
+
+    def _alert(self, sensor_id, state, end):
+        leq = 10.0 * math.log10(state.energy / state.n) if state.energy > 0 else float('-inf')
+        return Alert(sensor_id, state.since, end, state.peak, leq, self.threshold)
+
+    def update(self, sensor_id, t, value):
+        state = self._states.get(sensor_id)
+        if state is None:
+            state = self._states[sensor_id] = _SensorAlert()
+        release = self.threshold - self.hysteresis
+
+        if state.active:
+            if value >= release:
+                state.accumulate(value)
+                return None
+            alert = self._alert(sensor_id, state, t)
+            state.clear()
+            state.cooldown_until = t + self.cooldown
+            if self.log is not None:
+                self.log.append(alert)
+            return "alert_end", alert
+
+        if state.since is None:
+            if value < self.threshold or t < state.cooldown_until:
+                return None
+            state.since = t
+        elif value < release:
+            # Depasire prea scurta - nu devine alerta
+            state.clear()
+            return None
+
+        state.accumulate(value)
+        if t - state.since >= self.min_duration:
+            state.active = True
+            return "alert_start", self._alert(sensor_id, state, t)
+        return None
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
@@ -0,0 +1,4 @@
+# Benchmark-uri si simulator de senzori
+#
+#   python -m bench.simulator --sensors 4 --rate 20 --format binary    -> trafic UDP sintetic
+#   python -m bench.micro --out bench.json                             -> microbenchmark-uri, raport JSON
@@ -0,0 +1,535 @@
+# Microbenchmark-uri: receptie, reluare captura, statistici, persistenta, reantrenare, predictie, calcul dB
+#
+#   python -m bench.micro --out bench.json
+#   python -m bench.micro --only retrain,predict --sizes 10000,1000000,10000000 --backends bins,sgd
+#   python -m bench.micro --baseline bench.json --tolerance 0.2     -> cod de iesire 1 la regresii
+#
+# Fiecare caz ruleaza intr-un proces separat, deci peak RSS-ul raportat apartine doar cazului respectiv.
+# Rezultat: JSON cu throughput (operatii / secunda), latente (p50 / p90 / p99 / max, microsecunde) si peak RSS (MB).
+
+import argparse
+import concurrent.futures
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Modulele aplicatiei se afla in directorul parinte
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from bench.simulator import Simulator, VirtualSensor
+
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_BACKENDS = ("bins", "sgd", "forest", "hgb")
+# RandomForest pe milioane de esantioane dureaza minute - peste aceasta dimensiune se sare, daca nu se cere explicit
+FOREST_MAX = 100_000
+
+
+def peak_rss_mb():
+    """Varful memoriei rezidente a procesului curent (MB)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux raporteaza in KB, macOS in octeti
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        info = psutil.Process().memory_info()
+        # Windows: peak_wset; altfel doar RSS-ul curent
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def latency_stats(ns):
+    """Percentilele latentei (microsecunde) dintr-un array de durate in nanosecunde."""
+    if not len(ns):
+        return None
+    us = np.asarray(ns, dtype=np.float64) / 1000
+    p50, p90, p99 = np.percentile(us, (50, 90, 99))
+    return {"p50": round(p50, 3), "p90": round(p90, 3), "p99": round(p99, 3), "max": round(float(us.max()), 3)}
+
+
+def result(name, ops, seconds, latencies=None, unit="ops", **params):
+    return {
+        "name": name,
+        "params": params,
+        "ops": int(ops),
+        "unit": unit,
+        "seconds": round(seconds, 6),
+        "throughput": round(ops / seconds, 3) if seconds > 0 else None,
+        "latency_us": latency_stats(latencies) if latencies is not None else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def timed_loop(fn, args_iter):
+    """Apeleaza fn(*args) pentru fiecare element si masoara fiecare apel."""
+    ns = []
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for args in args_iter:
+        t0 = clock()
+        fn(*args)
+        ns.append(clock() - t0)
+    return time.perf_counter() - start, ns
+
+
+def synthetic_history(n, seed=0):
+    """n observatii (weekday, ora, dB) cu un tipar zi / noapte, ca datele reale."""
+    rng = np.random.default_rng(seed)
+    week_days = rng.integers(0, 7, n).astype(np.uint8)
+    hours = rng.uniform(0, 24, n)
+    values = 40 + 10 * np.sin((hours - 6) / 24 * 2 * np.pi) + rng.normal(0, 3, n)
+    return week_days, hours, values
+
+
+def synthetic_values(n, seed=0):
+    return VirtualSensor(1, np.random.default_rng(seed)).samples(n)
+
+
+# ---- Cazuri ----
+# Fiecare functie primeste (size, opts) si intoarce o lista de rezultate
+
+def bench_wire(size, opts):
+    from wire_format import encode, decode
+    batch = opts["batch"]
+    values = synthetic_values(size, opts["seed"])
+    binary = [encode(1, i, i * 100, values[j:j + batch], interval_ms=100)
+              for i, j in enumerate(range(0, size, batch))]
+    ascii_ = [f"1:{v:.2f}".encode() for v in values]
+    out = []
+    seconds, ns = timed_loop(decode, ((p,) for p in binary))
+    out.append(result("wire.decode", size, seconds, ns, unit="samples", format="binary", batch=batch))
+    seconds, ns = timed_loop(decode, ((p,) for p in ascii_))
+    out.append(result("wire.decode", size, seconds, ns, unit="samples", format="ascii-id", batch=1))
+    return out
+
+
+def _engine(tmp, backend="bins"):
+    from ingest_engine import IngestEngine
+    from sensor_registry import SensorRegistry
+
+    def ai_factory(path):
+        from pattern_ai import PatternAI
+        return PatternAI(save_path=path, backend=backend)
+    registry = SensorRegistry(18000, state_dir=tmp, ai_factory=ai_factory)
+    return IngestEngine("127.0.0.1", _free_port(), registry, timeout=30)
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_ingest(size, opts):
+    """Calea unui pachet prin IngestEngine (decodare, statistici, coada AI), fara socket."""
+    from wire_format import encode
+    batch = opts["batch"]
+    sensors = opts["sensors"]
+    values = synthetic_values(size, opts["seed"])
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("binary", "ascii-id"):
+            engine = _engine(tmp)
+            if fmt == "binary":
+                packets = [(encode(i % sensors + 1, i // sensors, (i // sensors) * batch * 100,
+                                   values[j:j + batch], interval_ms=100), ("127.0.0.1", 0))
+                           for i, j in enumerate(range(0, size, batch))]
+            else:
+                packets = [(f"{i % sensors + 1}:{v:.2f}".encode(), ("127.0.0.1", 0))
+                           for i, v in enumerate(values)]
+            seconds, ns = timed_loop(engine.datagram_received, packets)
+            out.append(result("ingest.datagram", size, seconds, ns, unit="samples", format=fmt,
+                              batch=batch if fmt == "binary" else 1, sensors=sensors))
+    return out
+
+
+def bench_ingest_udp(size, opts):
+    """Trafic real pe loopback: simulatorul trimite cat de repede poate, motorul receptioneaza."""
+    sensors = opts["sensors"]
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("binary", "ascii-id"):
+            engine = _engine(tmp)
+            thread = threading.Thread(target=engine.run, daemon=True)
+            thread.start()
+            # Asteapta ca socket-ul sa fie deschis
+            while engine._loop is None and thread.is_alive():
+                time.sleep(0.01)
+            per_sensor = size // sensors
+            sim = Simulator("127.0.0.1", engine.port, sensors=sensors, rate=opts["rate"], fmt=fmt,
+                            batch=opts["batch"], seed=opts["seed"])
+            start = time.perf_counter()
+            sim.run(samples=per_sensor)
+            sim.close()
+            # Se asteapta pana nu mai sosesc esantioane (sau toate au sosit); durata se opreste la ultimul sosit
+            last, idle = -1, time.perf_counter()
+            while time.perf_counter() - idle < 1.0:
+                if engine.ingest_count != last:
+                    last, idle = engine.ingest_count, time.perf_counter()
+                if last >= sim.sent_samples:
+                    break
+                time.sleep(0.005)
+            seconds = idle - start
+            engine.stop()
+            thread.join(timeout=5)
+            received = engine.ingest_count
+            r = result("ingest.udp", received, seconds, unit="samples", format=fmt, sensors=sensors,
+                       batch=sim.batch, rate=opts["rate"])
+            r["sent"] = sim.sent_samples
+            # Pierderile la rata maxima arata unde se umple buffer-ul socket-ului
+            r["dropped"] = sim.sent_samples - received
+            out.append(r)
+    return out
+
+
+def bench_replay(size, opts):
+    """Captura sintetica reluata fara pauze prin tot lantul: decodare, statistici, alerte, coada si worker AI."""
+    from alerts import AlertEngine
+    from capture import CaptureReader, CaptureWriter, replay
+    batch = opts["batch"]
+    sensors = opts["sensors"]
+    rng = np.random.default_rng(opts["seed"])
+    nodes = [VirtualSensor(i + 1, rng) for i in range(sensors)]
+    with tempfile.TemporaryDirectory() as tmp:
+        # 10 esantioane / secunda per senzor, ca senzorul real - sesiunea se termina acum
+        ticks = max(size // (batch * sensors), 1)
+        start = time.time() - ticks * batch * 0.1
+        path = os.path.join(tmp, "bench.dbcap")
+        writer = CaptureWriter(path, start=start)
+        for tick in range(ticks):
+            millis = tick * batch * 100
+            for node in nodes:
+                for packet in node.packets("binary", batch, millis & 0xFFFFFFFF, 100):
+                    writer.write(start + millis / 1000, packet, ("127.0.0.1", 40000 + node.node_id))
+        writer.close()
+
+        engine = _engine(tmp)
+        engine.alerts = AlertEngine()
+        engine.start_offline(start)
+        began = time.perf_counter()
+        datagrams = replay(engine, CaptureReader(path))
+        ingest = time.perf_counter() - began
+        engine.drain_ai()
+        total = time.perf_counter() - began
+        for sensor in engine.sensors:
+            if sensor.ai is not None:
+                sensor.ai.close()
+        return [
+            result("replay.ingest", engine.ingest_count, ingest, unit="samples", datagrams=datagrams,
+                   batch=batch, sensors=sensors, capture_kb=round(os.path.getsize(path) / 1024)),
+            # Pana la ultima observatie procesata de PatternAI (backpressure: nimic pierdut)
+            result("replay.pipeline", engine.ingest_count, total, unit="samples", batch=batch, sensors=sensors,
+                   dropped=engine.ai_queue.dropped),
+        ]
+
+
+def bench_stats(size, opts):
+    from window_stats import SlidingStats
+    from alerts import AlertEngine
+    values = synthetic_values(size, opts["seed"]).tolist()
+    # 10 esantioane / secunda, ca senzorul real
+    times = (np.arange(size) * 0.1).tolist()
+    stats = SlidingStats()
+    seconds, ns = timed_loop(stats.add, zip(times, values))
+    out = [result("stats.sliding_add", size, seconds, ns, unit="samples")]
+    summaries = max(size // 100, 1)
+    seconds, ns = timed_loop(stats.summary, ((times[-1] + i * 0.1,) for i in range(summaries)))
+    out.append(result("stats.sliding_summary", summaries, seconds, ns))
+    alerts = AlertEngine()
+    seconds, ns = timed_loop(alerts.update, (("1", t, v) for t, v in zip(times, values)))
+    out.append(result("stats.alert_update", size, seconds, ns, unit="samples"))
+    return out
+
+
+def bench_persist(size, opts):
+    from observation_log import ObservationLog
+    week_days, hours, values = synthetic_history(size, opts["seed"])
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.obs")
+        log = ObservationLog(path)
+        # Append individual doar pana la 1M - peste, e dominat de interpretor si nu aduce informatie noua
+        n = min(size, 1_000_000)
+        seconds, ns = timed_loop(log.append, zip(week_days[:n].tolist(), hours[:n].tolist(), values[:n].tolist()))
+        log.flush()
+        out.append(result("persist.append", n, seconds, ns, unit="records", size=size))
+        log.close()
+        os.remove(path)
+
+        log = ObservationLog(path)
+        start = time.perf_counter()
+        log.extend(week_days, hours, values)
+        log.flush()
+        out.append(result("persist.extend", size, time.perf_counter() - start, unit="records", size=size))
+        log.close()
+
+        # Redeschidere + citire completa prin memmap (ca la pornire / reantrenare)
+        start = time.perf_counter()
+        log = ObservationLog(path)
+        X, y = log.arrays()
+        out.append(result("persist.reload_arrays", len(y), time.perf_counter() - start, unit="records", size=size))
+        log.close()
+    return out
+
+
+def _pattern_ai(tmp, backend, size, opts):
+    from ai_backends import TrainingProfile
+    from pattern_ai import PatternAI
+    # Profilul implicit PatternAI sau cel din .env (settings.AI_PROFILE)
+    profile = None
+    if opts["profile"] == "app":
+        import settings
+        profile = TrainingProfile(**settings.AI_PROFILE)
+    # Fara generatii zilnice - ar copia tot istoricul sintetic la prima salvare
+    ai = PatternAI(save_path=os.path.join(tmp, f"bench_{backend}.pkl"), backend=backend, profile=profile,
+                   keep_generations=0)
+    ai.history.extend(*synthetic_history(size, opts["seed"]))
+    return ai
+
+
+def _train(ai):
+    # Backend-urile incrementale se reconstruiesc din istoric (fit complet), ca la _load_state
+    if ai.model.incremental:
+        X, y = ai.history.arrays()
+        ai.model.fit(X, y)
+        ai.initialized = ai.model.ready
+    ai._retrain_model()
+
+
+def _backends(size, opts):
+    for backend in opts["backends"]:
+        # Cu profilul din .env istoricul se plafoneaza (AI_MAX_TRAIN_SAMPLES), deci padurea ramane fezabila
+        if backend == "forest" and size > opts["forest_max"] and opts["profile"] == "default":
+            print(f"  (forest sarit la {size} observatii; --forest-max {opts['forest_max']})", file=sys.stderr)
+            continue
+        yield backend
+
+
+def bench_retrain(size, opts):
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in _backends(size, opts):
+            ai = _pattern_ai(tmp, backend, size, opts)
+            start = time.perf_counter()
+            _train(ai)
+            # Checkpoint-ul se scrie in fundal - inclus in masuratoare, ca inainte
+            ai.checkpoint(wait=True)
+            out.append(result("ai.retrain", size, time.perf_counter() - start, unit="observations",
+                              backend=backend, size=size, profile=opts["profile"],
+                              train_samples=ai.train_samples or size, model_kb=round(ai.model_bytes / 1024)))
+            ai.close()
+    return out
+
+
+def bench_add_observation(size, opts):
+    """Costul per esantion al PatternAI.add_observation (fara reantrenari declansate)."""
+    out = []
+    n = min(size, opts["live_max"])
+    values = synthetic_values(n, opts["seed"]).tolist()
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in _backends(size, opts):
+            ai = _pattern_ai(tmp, backend, size, opts)
+            _train(ai)
+            ai.refit_every = ai.refit_interval = float("inf")
+            seconds, ns = timed_loop(ai.add_observation, ((v,) for v in values))
+            out.append(result("ai.add_observation", n, seconds, ns, unit="samples", backend=backend, size=size))
+            ai.close()
+    return out
+
+
+def bench_predict(size, opts):
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in _backends(size, opts):
+            ai = _pattern_ai(tmp, backend, size, opts)
+            _train(ai)
+            week_days, hours, _ = synthetic_history(10_000, opts["seed"] + 1)
+            start = time.perf_counter()
+            ai.predict_many(week_days, hours)
+            out.append(result("ai.predict_many", len(hours), time.perf_counter() - start, unit="predictions",
+                              backend=backend, size=size))
+            seconds, ns = timed_loop(ai._update_grid, (() for _ in range(5)))
+            out.append(result("ai.update_grid", 5, seconds, ns, backend=backend, size=size,
+                              grid_minutes=ai.grid_minutes))
+            seconds, ns = timed_loop(ai.predict_current_pattern, (() for _ in range(10_000)))
+            out.append(result("ai.predict_current", 10_000, seconds, ns, backend=backend, size=size))
+            ai.close()
+    return out
+
+
+def bench_db_levels(size, opts):
+    """compute_db_levels pe un WAV sintetic de `size` / 10 secunde (o fereastra de 100 ms per observatie)."""
+    import soundfile as sf
+    sys.path.insert(0, os.path.join(ROOT, "misc"))
+    from video_process import compute_db_levels
+    sr = 48000
+    seconds_audio = max(size // 10, 1)
+    rng = np.random.default_rng(opts["seed"])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.wav")
+        with sf.SoundFile(path, "w", samplerate=sr, channels=2, subtype="PCM_16") as f:
+            # Scris pe bucati de 60 s - fisierul poate fi mai mare decat memoria alocata benchmark-ului
+            for start in range(0, seconds_audio, 60):
+                n = min(60, seconds_audio - start) * sr
+                f.write((rng.normal(0, 0.1, (n, 2))).astype(np.float32))
+        start = time.perf_counter()
+        levels = compute_db_levels(path, interval_ms=100)
+        return [result("db.compute_levels", len(levels), time.perf_counter() - start, unit="windows",
+                       audio_seconds=seconds_audio, samplerate=sr, channels=2)]
+
+
+CASES = {
+    "wire": bench_wire,
+    "ingest": bench_ingest,
+    "ingest_udp": bench_ingest_udp,
+    "replay": bench_replay,
+    "stats": bench_stats,
+    "persist": bench_persist,
+    "add_observation": bench_add_observation,
+    "retrain": bench_retrain,
+    "predict": bench_predict,
+    "db_levels": bench_db_levels,
+}
+
+# Cazurile care nu depind de dimensiunea istoricului ruleaza o singura data, cu --samples
+FIXED_SIZE = {"wire", "ingest", "ingest_udp", "replay", "stats"}
+
+
+def run_case(name, size, opts):
+    try:
+        return CASES[name](size, opts)
+    except ImportError as e:
+        # Dependinta optionala lipsa (ex. soundfile pentru db_levels)
+        return [{"name": name, "params": {"size": size}, "skipped": str(e)}]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Rezultatele cu throughput mai mic decat baseline * (1 - tolerance). Cheie: nume + parametri."""
+    def key(r):
+        return r["name"], json.dumps(r.get("params", {}), sort_keys=True)
+    old = {key(r): r for r in baseline.get("results", []) if r.get("throughput")}
+    regressions = []
+    for r in results:
+        before = old.get(key(r))
+        if before is None or not r.get("throughput"):
+            continue
+        ratio = r["throughput"] / before["throughput"]
+        if ratio < 1 - tolerance:
+            regressions.append({"name": r["name"], "params": r["params"], "ratio": round(ratio, 3),
+                                "throughput": r["throughput"], "baseline": before["throughput"]})
+    return regressions
+
+
+def _print(r):
+    if "skipped" in r:
+        print(f"  {r['name']:<24} sarit: {r['skipped']}", file=sys.stderr)
+        return
+    params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+    lat = r["latency_us"]
+    lat = f"  p50 {lat['p50']:.1f} us  p99 {lat['p99']:.1f} us" if lat else ""
+    print(f"  {r['name']:<24} {r['throughput']:>14,.0f} {r['unit']}/s{lat}  rss {r['peak_rss_mb']:.0f} MB  [{params}]",
+          file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark-uri decibelmetru")
+    parser.add_argument("--only", default=None, help=f"cazuri separate prin virgula ({', '.join(CASES)})")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="dimensiuni istoric PatternAI (observatii), separate prin virgula")
+    parser.add_argument("--samples", type=int, default=100_000, help="esantioane pentru wire / ingest / stats")
+    parser.add_argument("--backends", default=",".join(DEFAULT_BACKENDS))
+    parser.add_argument("--forest-max", type=int, default=FOREST_MAX,
+                        help="dimensiunea maxima a istoricului pentru backend-ul forest")
+    parser.add_argument("--profile", choices=("default", "app"), default="default",
+                        help="profil de antrenare: implicit PatternAI sau cel din .env (AI_ESTIMATORS, ...)")
+    parser.add_argument("--live-max", type=int, default=50_000, help="apeluri add_observation masurate")
+    parser.add_argument("--sensors", type=int, default=4, help="noduri simulate (ingest)")
+    parser.add_argument("--batch", type=int, default=10, help="esantioane per pachet binar")
+    parser.add_argument("--rate", type=float, default=0, help="rata simulatorului pentru ingest_udp (0 = maxim)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="fisier JSON (implicit stdout)")
+    parser.add_argument("--baseline", default=None, help="raport JSON anterior pentru comparatie")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="scadere de throughput acceptata (fractiune)")
+    parser.add_argument("--in-process", action="store_true", help="fara proces separat per caz (RSS cumulat)")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"cazuri necunoscute: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    opts = {"backends": args.backends.split(","), "forest_max": args.forest_max, "live_max": args.live_max,
+            "profile": args.profile, "sensors": args.sensors, "batch": args.batch, "rate": args.rate, "seed": args.seed}
+
+    jobs = []
+    for name in names:
+        for size in ([args.samples] if name in FIXED_SIZE else sizes):
+            jobs.append((name, size))
+
+    results = []
+    for name, size in jobs:
+        print(f"[bench] {name} ({size})", file=sys.stderr)
+        if args.in_process:
+            case_results = run_case(name, size, opts)
+        else:
+            # Proces nou per caz (spawn) - peak RSS si cache-urile nu se amesteca intre cazuri
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                case_results = pool.submit(run_case, name, size, opts).result()
+        for r in case_results:
+            _print(r)
+        results.extend(case_results)
+
+    report = {"environment": environment(), "options": {**opts, "sizes": sizes, "samples": args.samples},
+              "results": results}
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        for reg in report["regressions"]:
+            print(f"[regresie] {reg['name']} {reg['params']}: {reg['ratio']:.0%} din baseline", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"Raport salvat in {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
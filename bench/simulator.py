@@ -0,0 +1,155 @@
+# Simulator UDP - unul sau mai multe Arduino-uri virtuale, la rata si in formatul ales
+#
+#   python -m bench.simulator --port 5005 --sensors 4 --rate 20 --format binary --batch 10
+#
+# Formate: "ascii" (ca proiect.ino vechi), "ascii-id" ("<id>:<valoare>"), "binary" (wire_format v1)
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+# Modulele aplicatiei se afla in directorul parinte
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from wire_format import encode
+
+
+FORMATS = ("ascii", "ascii-id", "binary")
+
+
+class VirtualSensor:
+    """Un nod: semnal sintetic (fundal + zgomot + evenimente zgomotoase) si numar de secventa propriu."""
+
+    def __init__(self, node_id, rng, base=45.0):
+        self.node_id = node_id
+        self.rng = rng
+        self.base = base + rng.uniform(-5, 5)
+        self.seq = 0
+        self._event_left = 0
+
+    def samples(self, n):
+        values = self.base + self.rng.normal(0, 2.0, n)
+        # Din cand in cand, cateva secunde de zgomot puternic (declanseaza alertele)
+        if self._event_left <= 0 and self.rng.random() < 0.01:
+            self._event_left = int(self.rng.integers(20, 100))
+        if self._event_left > 0:
+            k = min(n, self._event_left)
+            values[:k] += 15.0
+            self._event_left -= k
+        return values
+
+    def packets(self, fmt, n, millis, interval_ms):
+        values = self.samples(n)
+        if fmt == "binary":
+            packet = encode(self.node_id, self.seq, millis, values, interval_ms=interval_ms)
+            self.seq += 1
+            return [packet]
+        prefix = f"{self.node_id}:" if fmt == "ascii-id" else ""
+        return [f"{prefix}{v:.2f}".encode() for v in values]
+
+
+class Simulator:
+    """Trimite trafic catre (host, port). rate = esantioane / secunda / senzor, batch = esantioane / pachet (binar).
+
+    loss / reorder: fractiunea de pachete binare pierdute / trimise inversate cu urmatorul.
+    """
+
+    def __init__(self, host, port, sensors=1, rate=5.0, fmt="binary", batch=10, seed=0,
+                 loss=0.0, reorder=0.0):
+        if fmt not in FORMATS:
+            raise ValueError(f"format necunoscut: {fmt}")
+        self.address = (host, port)
+        self.rate = rate
+        self.fmt = fmt
+        self.batch = batch if fmt == "binary" else 1
+        self.loss = loss
+        self.reorder = reorder
+        self.rng = np.random.default_rng(seed)
+        self.nodes = [VirtualSensor(i + 1, self.rng) for i in range(sensors)]
+        # Un socket per nod - fiecare Arduino are propria adresa sursa
+        self.sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in self.nodes]
+        self.sent_packets = 0
+        self.sent_samples = 0
+
+    def close(self):
+        for sock in self.sockets:
+            sock.close()
+
+    def _send(self, sock, packets):
+        for packet in packets:
+            if self.loss and self.rng.random() < self.loss:
+                continue
+            sock.sendto(packet, self.address)
+            self.sent_packets += 1
+
+    def run(self, duration=None, samples=None):
+        """Trimite pana la `duration` secunde sau `samples` esantioane per senzor; rate <= 0 = cat de repede se poate."""
+        interval_ms = int(round(1000 / self.rate)) if self.rate > 0 else 0
+        period = self.batch / self.rate if self.rate > 0 else 0.0
+        start = time.perf_counter()
+        epoch_ms = int(time.monotonic() * 1000)
+        ticks = 0
+        held = [None] * len(self.nodes)
+        while True:
+            if samples is not None and ticks * self.batch >= samples:
+                break
+            if duration is not None and time.perf_counter() - start >= duration:
+                break
+            millis = (epoch_ms + ticks * self.batch * interval_ms) & 0xFFFFFFFF
+            for i, (node, sock) in enumerate(zip(self.nodes, self.sockets)):
+                packets = node.packets(self.fmt, self.batch, millis, interval_ms)
+                self.sent_samples += self.batch
+                # Reordonare: pachetul curent se tine si pleaca dupa urmatorul
+                if held[i] is not None:
+                    self._send(sock, packets + held[i])
+                    held[i] = None
+                elif self.reorder and self.fmt == "binary" and self.rng.random() < self.reorder:
+                    held[i] = packets
+                else:
+                    self._send(sock, packets)
+            ticks += 1
+            if period:
+                delay = start + ticks * period - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        for node_held, sock in zip(held, self.sockets):
+            if node_held is not None:
+                self._send(sock, node_held)
+        return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulator UDP pentru decibelmetru")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("UDP_PORT", 5005)))
+    parser.add_argument("--sensors", type=int, default=1, help="numar de noduri simulate")
+    parser.add_argument("--rate", type=float, default=5.0, help="esantioane / secunda / senzor (0 = maxim)")
+    parser.add_argument("--format", choices=FORMATS, default="binary")
+    parser.add_argument("--batch", type=int, default=10, help="esantioane per pachet (format binar)")
+    parser.add_argument("--duration", type=float, default=None, help="secunde (implicit pana la Ctrl+C)")
+    parser.add_argument("--samples", type=int, default=None, help="esantioane per senzor")
+    parser.add_argument("--loss", type=float, default=0.0, help="fractiunea de pachete pierdute")
+    parser.add_argument("--reorder", type=float, default=0.0, help="fractiunea de pachete reordonate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sim = Simulator(args.host, args.port, sensors=args.sensors, rate=args.rate, fmt=args.format,
+                    batch=args.batch, seed=args.seed, loss=args.loss, reorder=args.reorder)
+    print(f"Trimit catre {args.host}:{args.port} - {args.sensors} senzori, {args.rate:g} esantioane/s, {args.format}")
+    elapsed = 0.0
+    try:
+        elapsed = sim.run(duration=args.duration, samples=args.samples)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.close()
+    if elapsed:
+        print(f"{sim.sent_packets} pachete / {sim.sent_samples} esantioane in {elapsed:.2f} s "
+              f"({sim.sent_samples / elapsed:.0f} esantioane/s)")
+
+
+if __name__ == "__main__":
+    main()
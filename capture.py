@@ -0,0 +1,141 @@
+# Captura datagramelor UDP brute, pentru reluare (misc/replay.py)
+#
+# Format (little-endian):
+#   antet:       "DBCP", versiune u2, timpul Unix al inceputului capturii f8
+#   inregistrare: decalaj fata de inceput (microsecunde) u8, sursa u2, lungime u2, apoi octetii datagramei
+# Sursele (ip, port) se scriu o singura data, la prima aparitie: o inregistrare cu sursa = _NEW_SOURCE si
+# continutul "ip:port" primeste urmatorul index. Overhead-ul este de 12 octeti per datagrama.
+#
+# O captura intrerupta brusc ramane lizibila pana la ultima inregistrare completa.
+#
+# Reluarea (paced + replay) trece datagramele prin acelasi IngestEngine, cu timpii din captura - la viteza
+# originala, de N ori mai repede sau fara pauze (test de throughput pentru tot lantul).
+
+import datetime
+import os
+import struct
+import time
+
+
+_MAGIC = b"DBCP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHd")
+_RECORD = struct.Struct("<QHH")
+_NEW_SOURCE = 0xFFFF
+
+# Golirea buffer-ului de scriere pe disc (secunde) - o oprire brusca pierde cel mult atat
+FLUSH_INTERVAL = 1.0
+
+EXTENSION = ".dbcap"
+
+
+def capture_path(path):
+    """Un director devine <director>/capture_AAAALLZZ_HHMMSS.dbcap; altfel calea ramane neschimbata."""
+    if os.path.isdir(path) or path.endswith(os.sep):
+        os.makedirs(path, exist_ok=True)
+        return os.path.join(path, datetime.datetime.now().strftime("capture_%Y%m%d_%H%M%S") + EXTENSION)
+    return path
+
+
+class CaptureWriter:
+    """Scrie datagramele primite de IngestEngine, in ordinea sosirii, cu timpul si adresa sursei."""
+
+    def __init__(self, path, start=None):
+        self.path = capture_path(path)
+        self.start = time.time() if start is None else start
+        self._file = open(self.path, "wb", buffering=1 << 16)
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, self.start))
+        self._sources = {}
+        self._flushed = self.start
+        self.datagrams = 0
+        self.bytes = _HEADER.size
+
+    def write(self, arrival, data, addr):
+        source = self._sources.get(addr)
+        if source is None:
+            source = self._sources[addr] = len(self._sources)
+            name = f"{addr[0]}:{addr[1]}".encode()
+            self._file.write(_RECORD.pack(0, _NEW_SOURCE, len(name)) + name)
+            self.bytes += _RECORD.size + len(name)
+        offset = max(int(round((arrival - self.start) * 1e6)), 0)
+        self._file.write(_RECORD.pack(offset, source, len(data)))
+        self._file.write(data)
+        self.datagrams += 1
+        self.bytes += _RECORD.size + len(data)
+        if arrival - self._flushed >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._flushed = arrival
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def _parse_source(name):
+    host, _, port = name.decode().rpartition(":")
+    return host, int(port)
+
+
+class CaptureReader:
+    """Iterare peste (timp Unix de sosire, datagrama, (ip, port)), in ordinea din captura."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path}: nu este o captura (fisier prea scurt)")
+        magic, version, self.start = _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: format de captura necunoscut ({magic!r}, versiunea {version})")
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(_HEADER.size)
+            sources = []
+            while True:
+                record = f.read(_RECORD.size)
+                if len(record) < _RECORD.size:
+                    return
+                offset, source, size = _RECORD.unpack(record)
+                data = f.read(size)
+                if len(data) < size:
+                    return  # Inregistrare trunchiata (captura intrerupta)
+                if source == _NEW_SOURCE:
+                    sources.append(_parse_source(data))
+                    continue
+                yield self.start + offset / 1e6, data, sources[source]
+
+
+def paced(records, speed=1.0, start=None):
+    """Reda ritmul original al inregistrarilor: speed = factorul de accelerare (1 = timp real), 0 = fara pauze.
+
+    start: momentul din captura care corespunde pornirii (implicit prima inregistrare).
+    """
+    origin = None if start is None else (start, time.perf_counter())
+    for record in records:
+        if speed > 0:
+            if origin is None:
+                origin = (record[0], time.perf_counter())
+            delay = origin[1] + (record[0] - origin[0]) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield record
+
+
+def replay(engine, records, backpressure=True):
+    """Trece inregistrarile prin IngestEngine.datagram_received - aceeasi cale ca datagramele de pe socket.
+
+    backpressure: cand coada AI este pe jumatate plina se asteapta worker-ul, ca la reluarea rapida sa nu se
+    piarda observatii (fara worker AI pornit nu are efect). Returneaza numarul de datagrame.
+    """
+    limit = engine.ai_queue.maxsize // 2
+    wait = backpressure and engine.ai_thread is not None
+    count = 0
+    for arrival, data, addr in records:
+        if wait:
+            while engine.ai_queue.qsize() > limit:
+                time.sleep(0.001)
+        engine.datagram_received(data, addr, arrival)
+        count += 1
+    return count
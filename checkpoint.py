@@ -0,0 +1,102 @@
+# Checkpoint-uri PatternAI pe un thread dedicat
+#
+# Fluxul de esantioane doar incrementeaza un contor; thread-ul de checkpoint verifica periodic fiecare model
+# inregistrat si il salveaza cand:
+#   - s-a cerut explicit (dupa o reantrenare completa, la inchidere)
+#   - au trecut `interval` secunde de la ultima salvare si exista date noi
+#   - s-au adunat `every` esantioane noi
+# Salvarea lucreaza pe o copie (snapshot) luata sub lock-ul modelului, apoi scrie atomic (state_file.write_state).
+# O data pe zi se pastreaza si o generatie completa (model + istoric, .npz comprimat), ca instantaneele
+# manuale din states*/ - ultimele `keep` raman pe disc.
+
+import os
+import threading
+import time
+import weakref
+
+
+class Checkpointer:
+
+    def __init__(self, poll=1.0):
+        self.poll = poll
+        self._models = weakref.WeakSet()
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._busy = False
+        self._thread = None
+
+    def register(self, ai):
+        with self._cond:
+            self._models.add(ai)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="checkpoint", daemon=True)
+                self._thread.start()
+
+    def request(self, ai):
+        """Salvare la urmatoarea trecere a thread-ului, fara limitarea de rata."""
+        ai.checkpoint_requested = True
+        self._wake.set()
+
+    def wait(self, timeout=None):
+        """Asteapta pana cand toate salvarile cerute sunt scrise. False la expirarea timeout-ului."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._busy or any(ai.checkpoint_requested for ai in list(self._models)):
+                self._wake.set()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else self.poll)
+        return True
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll)
+            self._wake.clear()
+            now = time.monotonic()
+            for ai in list(self._models):
+                if not ai.checkpoint_due(now):
+                    continue
+                with self._cond:
+                    self._busy = True
+                try:
+                    ai.write_checkpoint()
+                except Exception as e:
+                    # Checkpoint-ul anterior ramane intact (scriere atomica); se reincearca la urmatorul termen
+                    print(f"[PatternAI] Checkpoint esuat pentru {ai.save_path}: {e!r}")
+                finally:
+                    # checkpoint_requested se sterge la inceputul scrierii - o cerere noua ramane pentru tura urmatoare
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+            with self._cond:
+                self._cond.notify_all()
+
+
+# Thread-ul comun tuturor modelelor din proces
+CHECKPOINTS = Checkpointer()
+
+
+def generation_path(save_path, day, directory=None):
+    """<director>/<nume>_ZZLLAA.npz - aceeasi conventie ca instantaneele din states*/."""
+    root = os.path.splitext(os.path.basename(save_path))[0]
+    directory = directory or os.path.join(os.path.dirname(save_path), "checkpoints")
+    return os.path.join(directory, f"{root}_{day.strftime('%d%m%y')}.npz")
+
+
+def generations(save_path, directory=None):
+    """Generatiile existente ale unui checkpoint, cele mai noi primele."""
+    root = os.path.splitext(os.path.basename(save_path))[0]
+    directory = directory or os.path.join(os.path.dirname(save_path), "checkpoints")
+    if not os.path.isdir(directory):
+        return []
+    # Numele senzorilor secundari incep cu acelasi prefix - sufixul trebuie sa fie exact _ZZLLAA
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name.startswith(root + "_") and name.endswith(".npz")
+             and len(name) == len(root) + 11 and name[len(root) + 1:-4].isdigit()]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def prune(save_path, keep, directory=None):
+    for path in generations(save_path, directory)[keep:]:
+        os.remove(path)
@@ -0,0 +1,854 @@
+# Librarii
+# GUI
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+
+# Timp
+import time
+import datetime
+
+# Import matplotlib in fundal
+import threading
+
+# Coada thread motor -> thread GUI
+import collections
+
+# Array-uri (axa de timp a prognozei)
+import numpy as np
+
+# Receptie, statistici si PatternAI - independente de GUI
+from ingest_engine import IngestEngine, make_registry
+
+# Leq / percentile pe ferestre glisante
+from window_stats import WINDOWS, format_summary, window_label
+
+# Depasiri de prag (histerezis, durata minima, cooldown)
+from alerts import AlertEngine
+
+# Istoric pe termen lung (pe zile, cu agregari)
+from timeseries import TimeSeriesStore
+
+# Metrici (Δt randare, rate, coada AI) + endpoint /metrics optional
+import metrics
+from metrics import REGISTRY
+
+# Configurare din .env
+from settings import (UDP_IP, UDP_PORT, UDP_TIMEOUT, PLOT_CAPACITY, PLOT_WINDOW,
+                      RENDER_FPS, CPU_BUDGET, AI_BACKEND, AI_PROFILE, AI_FORECAST_HORIZON, AI_CHECKPOINT,
+                      AI_QUEUE_SIZE, AI_QUEUE_POLICY, AI_BATCH,
+                      ALERT_THRESHOLD, ALERT_HYSTERESIS, ALERT_MIN_DURATION, ALERT_COOLDOWN, ALERT_LOG,
+                      LOG_INTERVAL, METRICS_PORT, METRICS_HOST, STORE_DIR, UDP_CAPTURE)
+
+# Optiunea din lista de senzori care afiseaza toate nodurile
+ALL_SENSORS = "Toti"
+
+# Durate disponibile in fereastra de istoric (secunde)
+HISTORY_SPANS = {"1 h": 3600, "6 h": 6 * 3600, "24 h": 86400, "7 zile": 7 * 86400, "30 zile": 30 * 86400}
+# Puncte afisate - rezolutia ceruta = durata / HISTORY_POINTS
+HISTORY_POINTS = 2000
+
+# Plot live: puncte trimise catre matplotlib per pixel de latime (piramida min/max alege nivelul de detaliu)
+POINTS_PER_PIXEL = 2
+# "Urmareste live": spatiul liber din dreapta ultimului esantion (fractiune din fereastra) - axa X sare o data
+# la fiecare astfel de interval, intre salturi se redeseneaza doar liniile (blitting)
+FOLLOW_LEAD = 0.1
+# Latimea minima a ferestrei urmarite (secunde)
+FOLLOW_MIN_SPAN = 10.0
+
+
+# GUI - Plot: matplotlib (~0.7 s la import) se incarca pe un thread separat, fereastra apare fara el
+def _import_plotting():
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    return Figure, FigureCanvasTkAgg, NavigationToolbar2Tk
+
+
+# Secunde de la lansarea procesului (inclusiv pornirea interpretorului si importurile)
+def _since_launch():
+    import psutil
+    return time.time() - psutil.Process().create_time()
+
+
+class HistoryWindow(tk.Toplevel):
+    """Interval istoric din TimeSeriesStore - se incarca agregarea cea mai grosiera care ajunge pentru plot."""
+
+    def __init__(self, master, store):
+        super().__init__(master)
+        self.title("Istoric")
+        self.geometry("900x450")
+        self.store = store
+
+        bar = tk.Frame(self)
+        bar.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
+        tk.Label(bar, text="Senzor").pack(side=tk.LEFT)
+        sensors = store.sensors()
+        self.sensor_var = tk.StringVar(value=sensors[0] if sensors else "")
+        ttk.Combobox(bar, textvariable=self.sensor_var, values=sensors, state='readonly', width=12).pack(side=tk.LEFT, padx=5)
+        tk.Label(bar, text="De la (AAAA-LL-ZZ HH:MM)").pack(side=tk.LEFT)
+        start = datetime.datetime.now() - datetime.timedelta(days=1)
+        self.start_var = tk.StringVar(value=start.strftime("%Y-%m-%d %H:%M"))
+        tk.Entry(bar, textvariable=self.start_var, width=17).pack(side=tk.LEFT, padx=5)
+        tk.Label(bar, text="Durata").pack(side=tk.LEFT)
+        self.span_var = tk.StringVar(value="24 h")
+        ttk.Combobox(bar, textvariable=self.span_var, values=list(HISTORY_SPANS), state='readonly', width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bar, text="Incarca", command=self.load).pack(side=tk.LEFT, padx=5)
+        self.info_var = tk.StringVar(value="")
+        tk.Label(bar, textvariable=self.info_var, fg="gray").pack(side=tk.LEFT, padx=5)
+
+        Figure, FigureCanvasTkAgg, _ = _import_plotting()
+        fig = Figure(figsize=(6, 3))
+        self.ax = fig.add_subplot(111)
+        self.ax.set_ylabel("dB")
+        self.canvas = FigureCanvasTkAgg(fig, master=self)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def load(self):
+        try:
+            start = datetime.datetime.strptime(self.start_var.get().strip(), "%Y-%m-%d %H:%M").timestamp()
+        except ValueError:
+            messagebox.showerror("Istoric", "Data trebuie sa fie de forma AAAA-LL-ZZ HH:MM", parent=self)
+            return
+        span = HISTORY_SPANS[self.span_var.get()]
+        t0 = time.perf_counter()
+        level, data = self.store.query(self.sensor_var.get(), start, start + span, resolution=span / HISTORY_POINTS)
+        load_ms = (time.perf_counter() - t0) * 1000
+
+        self.ax.clear()
+        self.ax.set_ylabel("dB")
+        if len(data):
+            times = [datetime.datetime.fromtimestamp(t) for t in data["t"]]
+            if level:
+                # Banda min / max + media si Leq pe fiecare interval
+                self.ax.fill_between(times, data["min"], data["max"], color="#129FE1", alpha=0.2, label="min / max")
+                self.ax.plot(times, data["mean"], color="#129FE1", linewidth=1, label="medie")
+                self.ax.plot(times, data["leq"], color="orange", linewidth=1, label="Leq")
+            else:
+                self.ax.plot(times, data["value"], color="#129FE1", linewidth=1, label="dB")
+            self.ax.legend(loc="upper right", fontsize=8)
+            self.ax.figure.autofmt_xdate()
+        resolution = f"{level} s" if level else "brut"
+        self.info_var.set(f"{len(data)} puncte, rezolutie {resolution}, {load_ms:.0f} ms")
+        self.canvas.draw_idle()
+
+
+
+class DecibelMetru(tk.Tk):
+    def __init__(self, ip=UDP_IP, port=UDP_PORT, capture=UDP_CAPTURE):
+        super().__init__()
+        self.title("Decibelmetru cu comunicatie fara fir")
+        self.geometry("1000x600")
+        
+
+            # Initializare
+        self.running = False
+
+        # Senzori - fiecare cu statistici, buffer circular (timp, dB), istoric decimat si PatternAI propriu
+        self.sensors = make_registry(PLOT_CAPACITY, window=PLOT_WINDOW, backend=AI_BACKEND, profile=AI_PROFILE,
+                                     forecast_horizon=AI_FORECAST_HORIZON, checkpoint=AI_CHECKPOINT)
+
+        # Alertele se evalueaza in motor; GUI-ul primeste doar inceputul / sfarsitul unei depasiri
+        self.alerts = AlertEngine(ALERT_THRESHOLD, ALERT_HYSTERESIS, ALERT_MIN_DURATION,
+                                  ALERT_COOLDOWN, log_path=ALERT_LOG)
+
+        # Motorul de receptie ruleaza pe thread-ul sau; GUI-ul este doar un abonat
+        self.engine = IngestEngine(ip, port, self.sensors, timeout=UDP_TIMEOUT,
+                                   stop_on_timeout=True, remote_reset=False, alerts=self.alerts,
+                                   ai_queue_size=AI_QUEUE_SIZE, ai_queue_policy=AI_QUEUE_POLICY, ai_batch=AI_BATCH,
+                                   cpu_budget=CPU_BUDGET,
+                                   store=TimeSeriesStore(STORE_DIR) if STORE_DIR else None, capture=capture)
+        # Evenimente primite si inca nerandate (thread motor -> thread GUI, deque.append este atomic)
+        self.pending = collections.deque()
+        self.engine.subscribe(self.pending.append)
+        # Modelul primului senzor se incarca in fundal de acum, nu la primul pachet
+        self.engine.preload_ai()
+        self.plot_thread = threading.Thread(target=_import_plotting, daemon=True)
+        self.plot_thread.start()
+
+        # Timpul dintre doua actualizari ale plot-ului (ultimele 15 pentru afisaj) si durata unei redesenari
+        self.m_plot_interval = REGISTRY.histogram("decibel_render_interval_seconds",
+                                                  "Timp intre actualizarile plot-ului", recent=15)
+        self.m_render = REGISTRY.histogram("decibel_render_seconds", "Durata unei redesenari a plot-ului")
+        self.last_plot_time = None
+
+        # Rate receptie / randare
+        self.render_count = 0
+        self.ingest_rate = 0.0
+        self.render_rate = 0.0
+        self.rate_ingest_mark = 0
+        self.rate_render_mark = 0
+        self.rate_since = time.time()
+
+        # GUI - plot-ul se adauga cand matplotlib este importat (_poll_plot)
+        self.ax = None
+        self.lines = {}
+        self.threshold_line = None
+        self.prediction_line = None
+        self.forecast_line = None
+        # Prognoza / predictia desenate acum (se redeseneaza fundalul doar cand se schimba)
+        self._forecast_source = None
+        self._forecast = None
+        self._shown_forecast = None
+        self._shown_pred = None
+        # Fundalul static pentru blitting (None = redesenare completa in asteptare)
+        self._background = None
+        # set_xlim din cod (nu de la utilizator) si saltul la marginea live la urmatoarea redesenare
+        self._setting_limits = False
+        self._jump = True
+        self.create_widgets()
+        self.after(20, self._poll_plot)
+
+        # Timp pana la fereastra utilizabila / primul esantion desenat (de la lansarea procesului)
+        self.m_ready = REGISTRY.gauge("decibel_gui_ready_seconds", "Secunde de la lansare pana la fereastra utilizabila")
+        self.m_first_sample = REGISTRY.gauge("decibel_gui_first_sample_seconds",
+                                             "Secunde de la lansare pana la primul esantion desenat")
+        self.start_clicked = None
+        self.after_idle(self._report_ready)
+
+        # Start periodic prediction update
+        self.after(200, self._update_prediction_var)
+        # Start tick randare
+        self.after(int(1000 / RENDER_FPS), self._render_tick)
+        # Ferestrele glisante expira si fara pachete noi
+        self.after(1000, self._window_stats_tick)
+
+        # Metrici: endpoint HTTP optional + linie periodica in consola
+        self.metrics_server = None
+        if METRICS_PORT:
+            try:
+                self.metrics_server = metrics.serve(METRICS_PORT, METRICS_HOST)
+            except OSError as e:
+                print(f"Endpoint-ul de metrici nu poate porni pe {METRICS_HOST}:{METRICS_PORT} - {e}")
+        if LOG_INTERVAL > 0:
+            self.after(int(LOG_INTERVAL * 1000), self._log_metrics)
+
+    def _update_prediction_var(self):
+        pred = self._current_prediction()
+        if hasattr(self, 'pred_var') and pred is not None:
+            self.pred_var.set(f"{pred:.1f}")
+            # Model antrenat intre timp din datele noi
+            if str(self.pred_entry.cget('state')) == 'disabled':
+                self._set_ai_status("gata", ready=True)
+        self.after(200, self._update_prediction_var)
+
+    # Predictia senzorului afisat (primul din selectie)
+    def _current_prediction(self):
+        sensors = self.selected_sensors()
+        return sensors[0].ai_pred if sensors else None
+
+    # Prognoza senzorului afisat, pe axa de timp a plot-ului: (x [s de la pornire], dB) sau None
+    # Acelasi obiect cat timp prognoza nu se schimba
+    def _current_forecast(self):
+        sensors = self.selected_sensors()
+        forecast = sensors[0].ai_forecast if sensors else None
+        if forecast is not self._forecast_source:
+            self._forecast_source = forecast
+            if forecast is None:
+                self._forecast = None
+            else:
+                t0, values = forecast
+                self._forecast = t0 - self.engine.start_time + 60.0 * np.arange(len(values)), values
+        return self._forecast
+
+    def create_widgets(self):
+        # Container widget-uri
+        controls_frame = tk.Frame(self)
+        controls_frame.pack(side=tk.LEFT, fill=tk.Y, padx=20, pady=10)
+
+        # Titlu
+        tk.Label(controls_frame, text="Decibelmetru", font=("Freestyle Script", 36), fg="#129FE1").pack(pady=10)
+
+        # Selectie senzor afisat
+        tk.Label(controls_frame, text="Senzor").pack()
+        self.sensor_var = tk.StringVar(value=ALL_SENSORS)
+        self.sensor_cb = ttk.Combobox(controls_frame, textvariable=self.sensor_var,
+                                      values=[ALL_SENSORS], state='readonly', width=20)
+        self.sensor_cb.bind("<<ComboboxSelected>>", lambda e: self._on_sensor_selected())
+        self.sensor_cb.pack(pady=(0, 5))
+
+        # Medie
+        tk.Label(controls_frame, text="Medie sunet").pack()
+        self.avg_var = tk.StringVar(value="---")
+        tk.Entry(controls_frame, textvariable=self.avg_var, font=("Digital-7",28),
+                 justify='center', state='readonly', width=12).pack(pady=5)
+
+        # Min/Max
+        min_max = tk.Frame(controls_frame)
+        min_max.pack(pady=5)
+        tk.Label(min_max, text="Min").pack(side=tk.LEFT)
+        self.min_var = tk.StringVar(value="---")
+        tk.Entry(min_max, textvariable=self.min_var, font=("Digital-7",16),
+                 justify='center', state='readonly', width=6, fg="blue").pack(side=tk.LEFT, padx=5)
+        self.max_var = tk.StringVar(value="---")
+        tk.Entry(min_max, textvariable=self.max_var, font=("Digital-7",16),
+                 justify='center', state='readonly', width=6, fg="red").pack(side=tk.LEFT, padx=5)
+        tk.Label(min_max, text="Max").pack(side=tk.LEFT)
+
+        # Leq / L10 / L50 / L90 / max pe fereastra glisanta aleasa
+        window_frame = tk.Frame(controls_frame)
+        window_frame.pack(pady=(5, 0))
+        tk.Label(window_frame, text="Fereastra").pack(side=tk.LEFT)
+        self.window_labels = {window_label(span): span for span in WINDOWS}
+        self.window_var = tk.StringVar(value=window_label(WINDOWS[0]))
+        window_cb = ttk.Combobox(window_frame, textvariable=self.window_var,
+                                 values=list(self.window_labels), state='readonly', width=8)
+        window_cb.bind("<<ComboboxSelected>>", lambda e: self._update_window_stats())
+        window_cb.pack(side=tk.LEFT, padx=5)
+        self.window_stats_var = tk.StringVar(value="---")
+        tk.Label(controls_frame, textvariable=self.window_stats_var, font=("Arial", 9)).pack()
+
+        # Buton reset + safety lock
+        self.lock_var = tk.BooleanVar()
+        lock_cb = ttk.Checkbutton(controls_frame, text="Unlock?", variable=self.lock_var, command=self.on_lock)
+        lock_cb.pack(pady=5)
+        self.reset_btn = ttk.Button(controls_frame, text="Reset", command=self.reset_avg, state=tk.DISABLED)
+        self.reset_btn.pack()
+
+        # Vizualizare: marginea live (fereastra live sau intreaga sesiune); zoom / pan pe plot opresc urmarirea
+        self.follow_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(controls_frame, text="Urmareste live", variable=self.follow_var,
+                        command=self._on_follow).pack(pady=(5, 0))
+        self.full_view_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(controls_frame, text="Toata sesiunea", variable=self.full_view_var,
+                        command=lambda: (self.follow_var.set(True), self._on_follow())).pack(pady=(0, 5))
+
+        # Prag + alerta
+        tk.Label(controls_frame, text="Prag dB").pack(pady=(20,0))
+        self.threshold_var = tk.DoubleVar(value=ALERT_THRESHOLD)
+        self.threshold_var.trace_add('write', lambda *args: self._update_threshold_line())
+        th_frame = tk.Frame(controls_frame)
+        th_frame.pack()
+        tk.Scale(th_frame, from_=5, to=70, orient=tk.HORIZONTAL,
+                 variable=self.threshold_var, length=150).pack(side=tk.LEFT)
+        tk.Entry(th_frame, textvariable=self.threshold_var, width=5).pack(side=tk.RIGHT, padx=5)
+
+        # Predictie nivel zgomot
+        tk.Label(controls_frame, text="Predictie nivel zgomot").pack(pady=(20,0))
+        self.pred_var = tk.StringVar(value="---")
+        # Dezactivat pana cand modelul este incarcat si antrenat
+        self.pred_entry = tk.Entry(controls_frame, textvariable=self.pred_var, font=("Digital-7",16),
+                                   justify='center', state='disabled', width=8)
+        self.pred_entry.pack()
+        self.ai_status_var = tk.StringVar(value="Model: in asteptare")
+        tk.Label(controls_frame, textvariable=self.ai_status_var, font=("Arial", 8), fg="gray").pack()
+
+        # Bara stare + indicator LED
+        status_frame = tk.LabelFrame(controls_frame, text="Status")
+        status_frame.pack(pady=20)
+        self.lamp = tk.Canvas(status_frame, width=30, height=20)
+        self.lamp.create_oval(2,2,18,18, fill="red", tags="led")
+        self.lamp.pack(side=tk.LEFT, padx=5)
+        self.status_text = tk.Text(status_frame, width=40, height=3)
+        self.status_text.insert(tk.END, "Program oprit\nSalut! :)")
+        self.status_text.configure(state='disabled')
+        self.status_text.pack(side=tk.LEFT)
+
+        # Buton start
+        self.start_btn = ttk.Button(controls_frame, text="Start", command=self.start_udp)
+        self.start_btn.pack(side=tk.BOTTOM, pady=20, fill=tk.X)
+
+        # Istoric pe termen lung
+        if self.engine.store is not None:
+            ttk.Button(controls_frame, text="Istoric", command=self.open_history).pack(side=tk.BOTTOM, fill=tk.X)
+
+        # Plot update times (small, responsive, single row)
+        self.plot_times_var = tk.StringVar(value="")
+        self.plot_times_label = tk.Label(
+            controls_frame,
+            textvariable=self.plot_times_var,
+            font=("Arial", 7),
+            fg="gray",
+            anchor="w",
+            width=80,
+            justify="left"
+        )
+        self.plot_times_label.pack(side=tk.BOTTOM, pady=(2, 0), fill=tk.X)
+
+    def open_history(self):
+        HistoryWindow(self, self.engine.store)
+
+    # Plot
+    def _poll_plot(self):
+        if self.plot_thread.is_alive():
+            self.after(20, self._poll_plot)
+            return
+        self.create_plot()
+        self._redraw()
+
+    def _report_ready(self):
+        self.m_ready.set(_since_launch())
+        print(f"[GUI] Fereastra gata in {self.m_ready.value:.2f} s de la lansare")
+
+    def create_plot(self):
+        Figure, FigureCanvasTkAgg, NavigationToolbar2Tk = _import_plotting()
+        fig = Figure(figsize=(4,3))
+        self.ax = fig.add_subplot(111)
+        self.ax.set_title("Nivel sunet")
+        self.ax.set_xlabel("Timp [s]")
+        self.ax.set_ylabel("dB")
+        # Limitele se stabilesc explicit (_set_limits / zoom) - autoscale ar declansa xlim_changed la fiecare linie
+        self.ax.set_autoscale_on(False)
+        plot_frame = tk.Frame(self)
+        plot_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.canvas = FigureCanvasTkAgg(fig, master=plot_frame)
+        # Zoom / pan din bara matplotlib + zoom pe axa X cu rotita mouse-ului
+        self.toolbar = NavigationToolbar2Tk(self.canvas, plot_frame, pack_toolbar=False)
+        self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.mpl_connect("scroll_event", self._on_scroll)
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        # O linie per senzor - si pentru senzorii aparuti inainte de plot
+        for sensor in self.sensors:
+            self._add_line(sensor)
+
+    # Update threshold line when slider changes
+    def _update_threshold_line(self):
+        try:
+            self.alerts.threshold = self.threshold_var.get()
+        except tk.TclError:
+            return  # Valoare incompleta in campul de text
+        if self.threshold_line:
+            thr = self.threshold_var.get()
+            self.threshold_line.set_ydata([thr, thr])
+            self._draw_full()
+
+    # Safety lock
+    def on_lock(self):
+        if self.lock_var.get():
+            self.reset_btn.config(state=tk.NORMAL)
+        else:
+            self.reset_btn.config(state=tk.DISABLED)
+
+    # Logica buton reset - senzorii selectati (butonul) sau senzorul care a cerut reset (remote)
+    def reset_avg(self, sensors=None):
+        if self.lock_var.get():
+
+            # Resetare valori
+            if sensors is None:
+                sensors = self.selected_sensors()
+            self.engine.reset(sensors)
+            for sensor in sensors:
+                if sensor.id in self.lines:
+                    self.lines[sensor.id].set_data([], [])
+            self.avg_var.set("---")
+            self.min_var.set("---")
+            self.max_var.set("---")
+            self.window_stats_var.set("---")
+
+            # Se afiseaza un mesaj de confirmare a resetarii - dupa 5 secunde se revine la mesajul de stare curent
+            self._set_status("Statistici resetate.")
+            self.after(5000, lambda: self._set_status(self._connected_text()) if  self.running else self._set_status("Program oprit\nSalut! :)"))        
+
+            # Resetare plot
+            if self.ax is None:
+                return
+            # Set reasonable default axis limits to prevent wild expansion
+            self._set_limits(0, 10, 0, 80, pad=0)
+            self._jump = True
+            # Update threshold line position (don't remove it)
+            thr = self.threshold_var.get()
+            if self.threshold_line:
+                self.threshold_line.set_ydata([thr, thr])
+            else:
+                # Create if doesn't exist
+                self.threshold_line = self.ax.axhline(thr, color='red', linestyle='--', linewidth=2, label='Prag')
+            self._draw_full()
+
+    # Senzorii afisati, conform selectiei
+    def selected_sensors(self):
+        choice = self.sensor_var.get() if hasattr(self, 'sensor_var') else ALL_SENSORS
+        if choice == ALL_SENSORS:
+            return list(self.sensors)
+        sensor = self.sensors.find(choice)
+        return [sensor] if sensor else []
+
+    def _on_sensor_selected(self):
+        shown = {s.id for s in self.selected_sensors()}
+        for sensor_id, line in self.lines.items():
+            line.set_visible(sensor_id in shown)
+        self._update_alert_bg()
+        self._jump = True
+        self._redraw()
+
+    # Fundal rosu cat timp unul dintre senzorii afisati are o alerta activa - apelat doar la tranzitii
+    def _update_alert_bg(self):
+        bg = 'red' if any(self.alerts.active(s.id) for s in self.selected_sensors()) else 'white'
+        if bg != self.cget("bg"):
+            self.configure(bg=bg)
+
+    # Senzor nou - se adauga in lista si i se creeaza linia
+    def _on_new_sensor(self, sensor):
+        self.sensor_cb.configure(values=[ALL_SENSORS] + self.sensors.ids())
+        if self.ax is not None:
+            self._add_line(sensor)
+        if self.running:
+            self._set_status(self._connected_text())
+
+    def _add_line(self, sensor):
+        # animated: in afara fundalului static, desenata prin blitting (_blit / _on_draw)
+        line, = self.ax.plot([], [], '-', label=str(sensor.id), animated=True)
+        line.set_visible(sensor in self.selected_sensors())
+        self.lines[sensor.id] = line
+
+    # Starea modelului PatternAI (incarcare in fundal) - predictia devine activa cand modelul este gata
+    def _set_ai_status(self, text, ready):
+        self.ai_status_var.set(f"Model: {text}")
+        self.pred_entry.config(state='readonly' if ready else 'disabled')
+
+    def _on_ai_ready(self, ai):
+        if ai is None:
+            self._set_ai_status("eroare la incarcare", ready=False)
+        elif ai.initialized:
+            self._set_ai_status(f"{ai.backend}, {len(ai.history)} observatii", ready=True)
+        else:
+            self._set_ai_status(f"{ai.backend}, se antreneaza din date noi", ready=False)
+
+    def _connected_text(self):
+        if len(self.sensors) <= 1:
+            return "Conectat la Arduino Uno R4 WiFi"
+        return f"Conectat la {len(self.sensors)} senzori"
+
+    # Pornire conexiune UDP - buton start
+    def start_udp(self):
+
+        # Led-ul este un flag - daca conexiunea este deja stabilita...
+        #                            ...nu poti porni un program deja pornit
+        if self.lamp.itemcget("led", "fill") == "green" or self.engine.running:
+            messagebox.showinfo("Alerta", "Programul functioneaza.")
+            return
+        self._set_status("Se conecteaza...")
+        self._set_lamp('yellow')
+        self.start_clicked = time.time()
+        # Executa in continuu citirea de la socket-ul UDP
+        self.engine.start()
+
+    # Confirmare in status ca avem conexiune
+    def confirm_conn(self):
+        self._set_status(self._connected_text())
+        self._set_lamp('green')
+        self.running = True
+
+    # Tick randare - ruleaza pe thread-ul principal la RENDER_FPS (redus de guvernatorul CPU la incarcare mare)
+    # si consuma tot ce s-a adunat in coada
+    def _render_tick(self):
+        self.after(int(1000 / self.engine.governor.render_fps(RENDER_FPS)), self._render_tick)
+        if not self.pending:
+            return
+
+        updated = False
+        while self.pending:
+            item = self.pending.popleft()
+            kind = item[0]
+            # Statisticile si buffer-ele senzorului sunt deja actualizate de motor
+            if kind == "sample":
+                updated = True
+            elif kind == "sensor":
+                self._on_new_sensor(item[1])
+            elif kind == "connected":
+                self.confirm_conn()
+            elif kind == "reset":
+                self.reset_avg([item[1]])
+            elif kind == "alert_start":
+                self._update_alert_bg()
+            elif kind == "alert_end":
+                self._update_alert_bg()
+                alert = item[2]
+                self._set_status(f"Alerta {alert.sensor_id}: {alert.end - alert.start:.1f} s\n"
+                                 f"Max {alert.peak:.1f} dB  Leq {alert.leq:.1f} dB")
+                self.after(5000, lambda: self._set_status(self._connected_text()) if self.running else None)
+            elif kind == "ai_loading":
+                self._set_ai_status("se incarca...", ready=False)
+            elif kind == "ai_ready":
+                self._on_ai_ready(item[1])
+            elif kind == "ai_loaded":
+                self._on_ai_ready(item[1].ai)
+                self._set_status(f"Model PatternAI incarcat: {item[1].id}")
+                self.after(3000, lambda: self._set_status(self._connected_text()) if self.running else None)
+            elif kind == "timeout":
+                self._set_lamp('red')
+                self._set_status("Timeout UDP")
+                self.running = False
+            elif kind == "error":
+                self._set_lamp('red')
+                self._set_status(item[1])
+                self.running = False
+
+        # Nicio valoare noua (doar evenimente de stare)
+        if updated:
+            with self.m_render.time():
+                self._redraw()
+            self._report_rates()
+
+    # Actualizare indicatori + plot pentru senzorii selectati
+    def _redraw(self):
+        sensors = [s for s in self.selected_sensors() if s.count]
+        if not sensors:
+            return
+
+        # Indicatori avg, min, max - cumulati peste senzorii afisati
+        count = sum(s.count for s in sensors)
+        avg = sum(s.avg * s.count for s in sensors) / count
+        self.avg_var.set(f"{avg:.1f}")
+        self.min_var.set(f"{min(s.min for s in sensors):.1f}")
+        self.max_var.set(f"{max(s.max for s in sensors):.1f}")
+        self._update_window_stats()
+        if self.ax is None:
+            return
+
+        # Prag, predictie, prognoza - parte din fundalul static
+        full = self._update_overlays()
+
+        # "Urmareste live": axa X sare cand ultimul esantion trece de marginea dreapta (sau la cerere);
+        # limitele Y se recalculeaza la salt si se extind cand o valoare noua iese din ele
+        follow = self.follow_var.get()
+        x0, x1 = self.ax.get_xlim()
+        live = max(s.last_time for s in sensors)
+        jump = follow and (self._jump or live > x1)
+        if jump:
+            x0, x1 = self._follow_range(sensors, live)
+        lo, hi = self._update_lines(sensors, x0, x1)
+        y0, y1 = self.ax.get_ylim()
+        if jump or (follow and (lo < y0 or hi > y1)):
+            forecast = self._current_forecast()
+            if forecast is not None:
+                fx, fy = forecast
+                shown = fy[(fx >= x0) & (fx <= x1)]
+                if len(shown):
+                    lo, hi = min(lo, shown.min()), max(hi, shown.max())
+            if lo <= hi:
+                self._set_limits(x0, x1, lo, hi)
+            else:
+                self._set_limits(x0, x1, y0, y1, pad=0)
+            self._jump = False
+            full = True
+
+        # Redesenare completa doar la schimbarea axelor / fundalului; altfel doar liniile peste fundalul salvat
+        if full:
+            self._draw_full()
+        else:
+            self._blit()
+        if self.m_first_sample.value == 0:
+            self.m_first_sample.set(_since_launch())
+            since_start = f", {time.time() - self.start_clicked:.2f} s de la Start" if self.start_clicked else ""
+            print(f"[GUI] Primul esantion desenat la {self.m_first_sample.value:.2f} s de la lansare{since_start}")
+
+    # Prag, predictia (linie orizontala) sau prognoza (curba) - True daca fundalul trebuie redesenat
+    def _update_overlays(self):
+        changed = False
+        if self.threshold_line is None:
+            thr = self.threshold_var.get()
+            self.threshold_line = self.ax.axhline(thr, color='red', linestyle='--', linewidth=2, label='Prag')
+            changed = True
+
+        # Curba de prognoza (minutul curent + orizontul); fara prognoza ramane linia orizontala a predictiei
+        forecast = self._current_forecast()
+        pred = self._current_prediction() if forecast is None else None
+        if forecast is self._shown_forecast and pred == self._shown_pred:
+            return changed
+        self._shown_forecast, self._shown_pred = forecast, pred
+        if forecast is not None:
+            if self.forecast_line:
+                self.forecast_line.set_data(*forecast)
+                self.forecast_line.set_visible(True)
+            else:
+                self.forecast_line, = self.ax.plot(*forecast, color='orange', linestyle=':', linewidth=1.5,
+                                                   label='Prognoza')
+            if self.prediction_line:
+                self.prediction_line.set_visible(False)
+        elif pred is not None:
+            if self.forecast_line:
+                self.forecast_line.set_visible(False)
+            if self.prediction_line:
+                self.prediction_line.set_ydata([pred, pred])
+                self.prediction_line.set_visible(True)
+            else:
+                self.prediction_line = self.ax.axhline(pred, color='orange', linestyle=':', linewidth=1.5, label='Predictie')
+        return True
+
+    # Fereastra urmarita: ultimele esantioane din buffer-ul live (sau toata sesiunea) + spatiu liber in dreapta,
+    # pana la jumatate din latime pentru prognoza
+    def _follow_range(self, sensors, live):
+        if self.full_view_var.get():
+            starts = [s.session.first for s in sensors if s.session.first is not None]
+        else:
+            starts = [t for t in (s.session.raw_start() for s in sensors) if t is not None]
+        if not starts:
+            # Un "reset" a golit datele intre cadre - intervalul ramane cel afisat
+            return self.ax.get_xlim()
+        x0 = min(starts)
+        span = max(live - x0, FOLLOW_MIN_SPAN)
+        lead = span * FOLLOW_LEAD
+        forecast = self._current_forecast()
+        if forecast is not None:
+            lead = max(lead, min(forecast[0][-1] - live, span / 2))
+        return live - span, live + lead
+
+    # Datele liniilor pentru intervalul [x0, x1] - cel mult POINTS_PER_PIXEL puncte per pixel, indiferent de
+    # durata sesiunii; returneaza (min, max) al valorilor vizibile
+    def _update_lines(self, sensors, x0, x1):
+        max_points = max(int(self.ax.bbox.width * POINTS_PER_PIXEL), 100)
+        lo, hi = float('inf'), float('-inf')
+        for sensor in sensors:
+            xs, ys = sensor.session.view(x0, x1, max_points)
+            self.lines[sensor.id].set_data(xs, ys)
+            shown = ys[(xs >= x0) & (xs <= x1)]
+            if len(shown):
+                lo, hi = min(lo, shown.min()), max(hi, shown.max())
+        return lo, hi
+
+    # Redesenare completa (axe, grila, linii orizontale); fundalul pentru blitting se salveaza in _on_draw
+    def _draw_full(self):
+        self._background = None
+        self.canvas.draw_idle()
+
+    def _draw_lines(self):
+        for line in self.lines.values():
+            if line.get_visible():
+                self.ax.draw_artist(line)
+
+    # Dupa orice redesenare completa (inclusiv zoom / pan / redimensionare): fundal fara linii + liniile peste el
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines()
+
+    # Doar liniile peste fundalul salvat - costul nu include axele, textul si grila
+    def _blit(self):
+        if self._background is None:
+            return  # Redesenare completa in asteptare - liniile se deseneaza in _on_draw
+        self.canvas.restore_region(self._background)
+        self._draw_lines()
+        self.canvas.blit(self.ax.bbox)
+
+    # Zoom / pan de la utilizator (bara de unelte, rotita) - vederea ramane fixa, datele se recalculeaza
+    # pentru noul interval inainte de redesenarea ceruta de bara
+    def _on_xlim_changed(self, ax):
+        if self._setting_limits:
+            return
+        self.follow_var.set(False)
+        self._background = None
+        sensors = [s for s in self.selected_sensors() if s.count]
+        if sensors:
+            self._update_lines(sensors, *ax.get_xlim())
+
+    # Rotita: zoom pe axa X in jurul cursorului (pasul intra in istoricul inapoi / inainte al barei)
+    def _on_scroll(self, event):
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        factor = 1 / 1.25 if event.button == "up" else 1.25
+        x0, x1 = self.ax.get_xlim()
+        x = event.xdata
+        self.toolbar.push_current()
+        self.ax.set_xlim(x - (x - x0) * factor, x + (x1 - x) * factor)
+        self._draw_full()
+
+    # Reactivare "Urmareste live" - saltul la marginea live la urmatoarea redesenare
+    def _on_follow(self):
+        self._jump = True
+        if self.follow_var.get():
+            self._redraw()
+
+    # Statistici pe fereastra glisanta - senzorul afisat (primul din selectie), rezultat cache-uit in WindowStats
+    def _update_window_stats(self):
+        sensors = self.selected_sensors()
+        if not sensors:
+            return
+        span = self.window_labels[self.window_var.get()]
+        # Timpul curent relativ la motor (ca esantioanele) - esantioanele iesite din fereastra se elimina
+        summary = sensors[0].stats.window(span).summary(time.time() - self.engine.start_time)
+        text = format_summary(summary)
+        if text != self.window_stats_var.get():
+            self.window_stats_var.set(text)
+
+    def _window_stats_tick(self):
+        self._update_window_stats()
+        self.after(1000, self._window_stats_tick)
+
+    # Output time between plot updates + rata de receptie / randare - o vedere peste metricile de randare
+    def _report_rates(self):
+        now = time.time()
+        if self.last_plot_time is not None:
+            self.m_plot_interval.observe(now - self.last_plot_time)
+        self.last_plot_time = now
+        self.render_count += 1
+
+        # Ratele se recalculeaza o data pe secunda
+        span = now - self.rate_since
+        if span >= 1.0:
+            self.ingest_rate = (self.engine.ingest_count - self.rate_ingest_mark) / span
+            self.render_rate = (self.render_count - self.rate_render_mark) / span
+            self.rate_ingest_mark = self.engine.ingest_count
+            self.rate_render_mark = self.render_count
+            self.rate_since = now
+
+        interval = self.m_plot_interval
+        if interval.count:
+            times_str = " ".join(f"{t * 1000:.0f}" for t in interval.recent)
+            ai_queue = self.engine.ai_queue
+            queue_text = (f"  |  AI q: {ai_queue.qsize()}  drop: {ai_queue.dropped}"
+                          if ai_queue.qsize() or ai_queue.dropped else "")
+            self.plot_times_var.set(
+                f"Δt(ms): [{times_str}]  |  Avg: {interval.mean * 1000:.1f}  Max: {interval.max * 1000:.1f}"
+                f"  |  Rx: {self.ingest_rate:.1f}/s  Render: {self.render_rate:.1f} fps"
+                f"{self._loss_text()}{queue_text}"
+            )
+
+    # Linie periodica cu toate metricile (aceeasi ca in modul headless)
+    def _log_metrics(self):
+        print(f"[{time.strftime('%H:%M:%S')}] metrici: {REGISTRY.summary_line()}")
+        self.after(int(LOG_INTERVAL * 1000), self._log_metrics)
+
+    # Pierderi / reordonari - doar pentru senzorii care trimit numere de secventa (format binar)
+    def _loss_text(self):
+        trackers = [s.sequence for s in self.selected_sensors() if s.sequence.received]
+        if not trackers:
+            return ""
+        lost = sum(t.lost for t in trackers)
+        total = sum(t.received + t.lost for t in trackers)
+        reordered = sum(t.reordered for t in trackers)
+        return f"  |  Loss: {lost / total:.1%}  Reord: {reordered}"
+
+    # Limite axe din datele vizibile - schimbare din cod, nu opreste "Urmareste live"
+    def _set_limits(self, x0, x1, lo, hi, pad=None):
+        if x1 <= x0:
+            x1 = x0 + 1
+        if pad is None:
+            pad = max((hi - lo) * 0.05, 1.0)
+        self._setting_limits = True
+        try:
+            self.ax.set_xlim(x0, x1)
+            self.ax.set_ylim(lo - pad, hi + pad)
+        finally:
+            self._setting_limits = False
+
+    # Lampa
+    def _set_lamp(self, color):
+        self.lamp.itemconfig("led", fill=color)
+
+    # Zona status
+    def _set_status(self, text):
+        self.status_text.config(state='normal')
+        self.status_text.delete('1.0', tk.END)
+        self.status_text.insert(tk.END, text)
+        self.status_text.config(state='disabled')
+
+    # Oprire program
+    def on_close(self):
+        self.running = False
+        # Receptia si worker-ul AI se opresc complet inainte de inchiderea alertelor, istoricului si capturii
+        self.engine.stop(wait=True)
+        self.engine.stop_ai()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+        self._set_status("Program oprit")
+        self._set_lamp('orange')
+
+        self.alerts.close()
+        self.engine.close_store()
+        self.engine.close_capture()
+
+        # Salvare dataset AI (fiecare senzor) & confirmare salvare
+        if self.engine.save_all():
+            # Show confirmation when model is saved
+            messagebox.showinfo("Model Saved", "PatternAI model saved successfully.")
+        self.destroy()
@@ -1,422 +1,156 @@
-# Librarii
-# GUI
-import tkinter as tk
-from tkinter import ttk, messagebox
-
-
-# Multitasking
-import threading
-import queue
-
-# Timp
+# Punct de intrare - interfata grafica (implicit) sau daemon fara GUI (--headless)
+#
+#   python -m decibel_meter               -> fereastra Tk
+#   python -m decibel_meter --headless    -> doar receptie + statistici + PatternAI, fara Tk/matplotlib
+#   python -m decibel_meter --headless --capture captures/  -> in plus, datagramele brute (misc/replay.py)
+
+import argparse
+import asyncio
+import signal
 import time
 
-# CPU monitoring
-import psutil
-
-# Conexiune wireless
-import socket
-
-# GUI - Plot
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-# Componenta de inteligenta artificiala
-from pattern_ai import PatternAI
-
-# Environment variables
-import os
-from dotenv import load_dotenv
-
-# Incarca variabilele de mediu din .env
-load_dotenv()
-
-        # Configurare socket UDP
-# Aplicatia va accepta pachete de la orice IP de pe portul configurat in .env
-UDP_IP = os.getenv("UDP_IP")
-UDP_PORT = int(os.getenv("UDP_PORT"))
-
-# Creare socket care va folosi IPv4 și UDP
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-# Timeout pentru socket
-sock.settimeout(5)
-# Legare IP & port de socket
-sock.bind((UDP_IP, UDP_PORT))
-
-
-
-class DecibelMetru(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Decibelmetru cu comunicatie fara fir")
-        self.geometry("1000x600")
-        
-
-            # Initializare
-        self.running = False
-
-        # Valori inregistrate
-        self.values = []
-
-
-        self.plot_update_times = []
-        self.plot_update_max = 0
-        self.plot_update_sum = 0
-        self.plot_update_count = 0
-
-        # Valoarea medie, minima, maxima + contor pentru medie
-        self.count = 0
-        self.avg = 0.0
-        self.min = float('inf')
-        self.max = float('-inf')
-
-        # Functie predictie AI
-        self.ai = PatternAI()
-        self.ai_queue = queue.Queue()
-        self.ai_pred = None
-        self.ai_prediction_enabled = True  # Disable if CPU too high
-        self.last_cpu_check = time.time()
-        self.ai_thread = threading.Thread(target=self._ai_worker, daemon=True)
-        self.ai_thread.start()
-
-        # GUI
-        self.create_widgets()
-        self.create_plot()
-
-        self.plot_update_times = []
-
-        # Show confirmation when model is loaded
-        self.after(100, self.show_model_loaded_popup)
-        # Start periodic prediction update
-        self.after(200, self._update_prediction_var)
-
-    def _ai_worker(self):
-        while True:
-            value = self.ai_queue.get()
-            # Always save data for training
-            self.ai.add_observation(value)
-            
-            # Check CPU usage every 5 seconds
-            if time.time() - self.last_cpu_check > 5:
-                cpu_percent = psutil.cpu_percent(interval=0.1)
-                self.ai_prediction_enabled = cpu_percent < 85  # Disable if >85%
-                self.last_cpu_check = time.time()
-            
-            # Only predict if enabled and model is trained
-            if self.ai_prediction_enabled and self.ai.initialized and len(self.ai.history) >= 50:
-                try:
-                    pred = self.ai.predict_current_pattern()
-                    self.ai_pred = pred
-                except Exception:
-                    pass
-            self.ai_queue.task_done()
-
-    def _update_prediction_var(self):
-        if hasattr(self, 'pred_var') and self.ai_pred is not None:
-            self.pred_var.set(f"{self.ai_pred:.1f}")
-        self.after(200, self._update_prediction_var)
-    def show_model_loaded_popup(self):
-        messagebox.showinfo("Model Loaded", "PatternAI model loaded successfully.")
-
-    def create_widgets(self):
-        # Container widget-uri
-        controls_frame = tk.Frame(self)
-        controls_frame.pack(side=tk.LEFT, fill=tk.Y, padx=20, pady=10)
-
-        # Titlu
-        tk.Label(controls_frame, text="Decibelmetru", font=("Freestyle Script", 36), fg="#129FE1").pack(pady=10)
-
-        # Medie
-        tk.Label(controls_frame, text="Medie sunet").pack()
-        self.avg_var = tk.StringVar(value="---")
-        tk.Entry(controls_frame, textvariable=self.avg_var, font=("Digital-7",28),
-                 justify='center', state='readonly', width=12).pack(pady=5)
-
-        # Min/Max
-        min_max = tk.Frame(controls_frame)
-        min_max.pack(pady=5)
-        tk.Label(min_max, text="Min").pack(side=tk.LEFT)
-        self.min_var = tk.StringVar(value="---")
-        tk.Entry(min_max, textvariable=self.min_var, font=("Digital-7",16),
-                 justify='center', state='readonly', width=6, fg="blue").pack(side=tk.LEFT, padx=5)
-        self.max_var = tk.StringVar(value="---")
-        tk.Entry(min_max, textvariable=self.max_var, font=("Digital-7",16),
-                 justify='center', state='readonly', width=6, fg="red").pack(side=tk.LEFT, padx=5)
-        tk.Label(min_max, text="Max").pack(side=tk.LEFT)
-
-        # Buton reset + safety lock
-        self.lock_var = tk.BooleanVar()
-        lock_cb = ttk.Checkbutton(controls_frame, text="Unlock?", variable=self.lock_var, command=self.on_lock)
-        lock_cb.pack(pady=5)
-        self.reset_btn = ttk.Button(controls_frame, text="Reset", command=self.reset_avg, state=tk.DISABLED)
-        self.reset_btn.pack()
-
-        # Prag + alerta
-        tk.Label(controls_frame, text="Prag dB").pack(pady=(20,0))
-        self.threshold_var = tk.DoubleVar(value=40.0)
-        self.threshold_var.trace_add('write', lambda *args: self._update_threshold_line())
-        th_frame = tk.Frame(controls_frame)
-        th_frame.pack()
-        tk.Scale(th_frame, from_=5, to=70, orient=tk.HORIZONTAL,
-                 variable=self.threshold_var, length=150).pack(side=tk.LEFT)
-        tk.Entry(th_frame, textvariable=self.threshold_var, width=5).pack(side=tk.RIGHT, padx=5)
-
-        # Predictie nivel zgomot
-        tk.Label(controls_frame, text="Predictie nivel zgomot").pack(pady=(20,0))
-        self.pred_var = tk.StringVar(value="---")
-        tk.Entry(controls_frame, textvariable=self.pred_var, font=("Digital-7",16),
-                 justify='center', state='readonly', width=8).pack()
-
-        # Bara stare + indicator LED
-        status_frame = tk.LabelFrame(controls_frame, text="Status")
-        status_frame.pack(pady=20)
-        self.lamp = tk.Canvas(status_frame, width=30, height=20)
-        self.lamp.create_oval(2,2,18,18, fill="red", tags="led")
-        self.lamp.pack(side=tk.LEFT, padx=5)
-        self.status_text = tk.Text(status_frame, width=40, height=3)
-        self.status_text.insert(tk.END, "Program oprit\nSalut! :)")
-        self.status_text.configure(state='disabled')
-        self.status_text.pack(side=tk.LEFT)
-
-        # Buton start
-        self.start_btn = ttk.Button(controls_frame, text="Start", command=self.start_udp)
-        self.start_btn.pack(side=tk.BOTTOM, pady=20, fill=tk.X)
-
-        # Plot update times (small, responsive, single row)
-        self.plot_times_var = tk.StringVar(value="")
-        self.plot_times_label = tk.Label(
-            controls_frame,
-            textvariable=self.plot_times_var,
-            font=("Arial", 7),
-            fg="gray",
-            anchor="w",
-            width=80,
-            justify="left"
-        )
-        self.plot_times_label.pack(side=tk.BOTTOM, pady=(2, 0), fill=tk.X)
-
-    # Plot
-    def create_plot(self):
-        fig = Figure(figsize=(4,3))
-        self.ax = fig.add_subplot(111)
-        self.ax.set_title("Nivel sunet")
-        self.ax.set_xlabel("Timp [s]")
-        self.ax.set_ylabel("dB")
-        self.line, = self.ax.plot([], [], 'b-')
-        self.threshold_line = None
-        self.prediction_line = None
-        self.canvas = FigureCanvasTkAgg(fig, master=self)
-        self.canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-
-    # Update threshold line when slider changes
-    def _update_threshold_line(self):
-        if self.threshold_line:
-            thr = self.threshold_var.get()
-            self.threshold_line.set_ydata([thr, thr])
-            self.canvas.draw_idle()
-
-    # Safety lock
-    def on_lock(self):
-        if self.lock_var.get():
-            self.reset_btn.config(state=tk.NORMAL)
-        else:
-            self.reset_btn.config(state=tk.DISABLED)
-
-    # Logica buton reset
-    def reset_avg(self):
-        if self.lock_var.get():
-
-            # Resetare valori
-            self.avg = 0.0
-            self.min = float('inf')
-            self.max = float('-inf')
-            self.count = 0
-            self.values.clear()
-            self.avg_var.set("---")
-            self.min_var.set("---")
-            self.max_var.set("---")
-
-            # Se afiseaza un mesaj de confirmare a resetarii - dupa 5 secunde se revine la mesajul de stare curent
-            self._set_status("Statistici resetate.")
-            self.after(5000, lambda: self._set_status("Conectat la Arduino Uno R4 WiFi") if  self.running else self._set_status("Program oprit\nSalut! :)"))        
-
-            # Resetare plot
-            self.line.set_data([], [])
-            # Set reasonable default axis limits to prevent wild expansion
-            self.ax.set_xlim(0, 10)
-            self.ax.set_ylim(0, 80)
-            # Re-enable autoscaling so it works when new data arrives
-            self.ax.autoscale(enable=True, axis='both')
-            # Update threshold line position (don't remove it)
-            thr = self.threshold_var.get()
-            if self.threshold_line:
-                self.threshold_line.set_ydata([thr, thr])
-            else:
-                # Create if doesn't exist
-                self.threshold_line = self.ax.axhline(thr, color='red', linestyle='--', linewidth=2, label='Prag')
-            self.canvas.draw_idle()
-
-    # Pornire conexiune UDP - buton start
-    def start_udp(self):
-
-        # Led-ul este un flag - daca conexiunea este deja stabilita...
-        #                            ...nu poti porni un program deja pornit
-        if self.lamp.itemcget("led", "fill") == "green":
-            messagebox.showinfo("Alerta", "Programul functioneaza.")
-            return
-        self._set_status("Se conecteaza...")
-        self._set_lamp('yellow')
-        # Executa in continuu citirea de la socket-ul UDP
-        threading.Thread(target=self.read_loop, daemon=True).start()
-
-    # Confirmare in status ca avem conexiune
-    def confirm_conn(self):
-        self._set_status("Conectat la Arduino Uno R4 WiFi")
-        self._set_lamp('green')
-        self.running = True
-
-    # Citire valori
-    def read_loop(self):
-        start_time = time.time()
-        last_plot_time = None
-        while self.lamp.itemcget("led", "fill") != "red":
-            try:
-                # Data primeste valoarea de la socket, _ este neglijabila intrucat nu sunt relevante IP-ul expeditorului
-                data, _ = sock.recvfrom(1024)
-                # Daca nu se primesc date este declansata exceptia si se indica un timeout
-
-                if self.lamp.itemcget("led", "fill") != "green":
-                    self.confirm_conn();
-                # ...altfel ne asiguram ca status-ul este actualizat
-            except socket.timeout:
-                self._set_lamp('red')
-                self._set_status("Timeout UDP")
-                self.running = False
-                break
-
-
-            # Decodare pachet de la Arduino
-            line = data.decode().strip()
-
-
-            # Reset remote, daca se detecteaza cuvantul "reset"
-            if line.lower() == "reset":
-                self.reset_avg()
-                continue
-            # Daca pachet-ul primit nu contine "reset", se incearca extragerea unei valori float
-            try:
-                value = float(line)
-            # Daca nu se reuseste, pachetul a avut o eroare - ignora pachetul fara sa opresti programul
-            except:
-                continue
-
-            # Adaugare valoare noua + timestamp
-            elapsed = time.time() - start_time
-            self.values.append((elapsed, value))
-
-            # Indicatori avg, min, max
-            self.count += 1
-            self.avg = ((self.avg * (self.count-1)) + value) / self.count
-            self.min = min(self.min, value)
-            self.max = max(self.max, value)
-
-            self.avg_var.set(f"{self.avg:.1f}")
-            self.min_var.set(f"{self.min:.1f}")
-            self.max_var.set(f"{self.max:.1f}")
-
-            # Logica prag
-            thr = self.threshold_var.get()
-            bg = 'red' if value >= thr else 'white'
-            self.configure(bg=bg)
-
-            # Invatare & predictie AI (non-blocking)
+# Configurare din .env
+import settings
+
+# Receptie, statistici si PatternAI - independente de GUI
+from ingest_engine import IngestEngine, make_registry
+
+# Leq / percentile pe ferestre glisante
+from window_stats import format_summary, window_label
+
+# Depasiri de prag (histerezis, durata minima, cooldown)
+from alerts import AlertEngine
+
+# Metrici - linie periodica + endpoint /metrics optional
+import metrics
+
+# Istoric pe termen lung
+from timeseries import TimeSeriesStore
+
+
+# Compatibilitate: "from decibel_meter import DecibelMetru" importa GUI-ul doar la cerere
+def __getattr__(name):
+    if name == "DecibelMetru":
+        from decibel_gui import DecibelMetru
+        return DecibelMetru
+    raise AttributeError(name)
+
+
+# Linie de stare periodica pentru modul headless
+async def _log_status(engine, interval):
+    while True:
+        await asyncio.sleep(interval)
+        for sensor in engine.sensors:
+            if sensor.count:
+                pred = f"{sensor.ai_pred:.1f}" if sensor.ai_pred is not None else "---"
+                if sensor.ai_forecast is not None:
+                    values = sensor.ai_forecast[1]
+                    pred += f" prognoza+{len(values) - 1}m={values[-1]:.1f}"
+                seq = sensor.sequence
+                loss = f" loss={seq.loss_ratio:.1%} reord={seq.reordered}" if seq.received else ""
+                print(f"[{time.strftime('%H:%M:%S')}] {sensor.id}: n={sensor.count} "
+                      f"avg={sensor.avg:.1f} min={sensor.min:.1f} max={sensor.max:.1f} pred={pred}{loss}")
+                for span, summary in sensor.stats.summary(time.time() - engine.start_time).items():
+                    print(f"    {window_label(span)}: {format_summary(summary)}")
+        if engine.bad_packets:
+            print(f"[{time.strftime('%H:%M:%S')}] pachete invalide: {engine.bad_packets}")
+        if engine.ai_queue.dropped:
+            print(f"[{time.strftime('%H:%M:%S')}] coada AI plina ({engine.ai_queue.policy}): "
+                  f"{engine.ai_queue.dropped} esantioane pierdute")
+        print(f"[{time.strftime('%H:%M:%S')}] metrici: {metrics.REGISTRY.summary_line()}")
+
+
+def run_headless(ip, port, capture=None):
+    sensors = make_registry(settings.PLOT_CAPACITY, window=settings.PLOT_WINDOW, backend=settings.AI_BACKEND,
+                            profile=settings.AI_PROFILE, forecast_horizon=settings.AI_FORECAST_HORIZON,
+                            checkpoint=settings.AI_CHECKPOINT)
+    alerts = AlertEngine(settings.ALERT_THRESHOLD, settings.ALERT_HYSTERESIS, settings.ALERT_MIN_DURATION,
+                         settings.ALERT_COOLDOWN, log_path=settings.ALERT_LOG)
+    engine = IngestEngine(ip, port, sensors, timeout=settings.UDP_TIMEOUT, alerts=alerts,
+                          ai_queue_size=settings.AI_QUEUE_SIZE, ai_queue_policy=settings.AI_QUEUE_POLICY,
+                          ai_batch=settings.AI_BATCH, cpu_budget=settings.CPU_BUDGET,
+                          store=TimeSeriesStore(settings.STORE_DIR) if settings.STORE_DIR else None,
+                          capture=capture)
+
+    def on_event(event):
+        kind = event[0]
+        if kind == "sensor":
+            print(f"Senzor nou: {event[1].id} ({event[1].address[0]})")
+        elif kind == "reset":
+            print(f"Reset remote: {event[1].id}")
+        elif kind == "alert_start":
+            print(f"[{time.strftime('%H:%M:%S')}] Alerta {event[1].id}: peste {event[2].threshold:.1f} dB")
+        elif kind == "alert_end":
+            alert = event[2]
+            print(f"[{time.strftime('%H:%M:%S')}] Alerta {event[1].id} incheiata: {alert.end - alert.start:.1f} s, "
+                  f"max {alert.peak:.1f} dB, Leq {alert.leq:.1f} dB")
+        elif kind in ("timeout", "error"):
+            print("Timeout UDP" if kind == "timeout" else event[1])
+    engine.subscribe(on_event)
+    # Modelul primului senzor se incarca in paralel cu pornirea receptiei
+    engine.preload_ai()
+
+    if settings.METRICS_PORT:
+        try:
+            metrics.serve(settings.METRICS_PORT, settings.METRICS_HOST)
+            print(f"Metrici: http://{settings.METRICS_HOST}:{settings.METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"Endpoint-ul de metrici nu poate porni pe {settings.METRICS_HOST}:{settings.METRICS_PORT} - {e}")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        # Oprire curata la SIGINT / SIGTERM
+        for sig in (signal.SIGINT, signal.SIGTERM):
             try:
-                self.ai_queue.put_nowait(value)
-            except queue.Full:
-                pass  # If queue is full, skip this value
-
-            # Update plot
-            if self.values:
-                xs, ys = zip(*self.values)
-            else:
-                # Exceptie - cazul in care se face reset si nu exista valori
-                xs, ys = [], []
-            
-            # Update line data
-            self.line.set_data(xs, ys)
-            
-            # Recalculate limits based on data only
-            if xs:
-                self.ax.relim()
-                self.ax.autoscale_view()
-            
-            # Update or create threshold line (axhline doesn't affect autoscaling)
-            thr = self.threshold_var.get()
-            if self.threshold_line:
-                self.threshold_line.set_ydata([thr, thr])
-            else:
-                self.threshold_line = self.ax.axhline(thr, color='red', linestyle='--', linewidth=2, label='Prag')
-            
-            # Update or create prediction line
-            if self.ai_pred is not None:
-                if self.prediction_line:
-                    self.prediction_line.set_ydata([self.ai_pred, self.ai_pred])
-                else:
-                    self.prediction_line = self.ax.axhline(self.ai_pred, color='orange', linestyle=':', linewidth=1.5, label='Predictie')
-
-            # Actualizeaza plot-ul cand nu esti ocupat
-            self.canvas.draw_idle()
-
-            # Output time between plot updates
-            now = time.time()
-            if last_plot_time is not None:
-                delta_ms = (now - last_plot_time) * 1000
-                self.plot_update_times.append(delta_ms)
-                if len(self.plot_update_times) > 15:
-                    self.plot_update_times.pop(0)
-                self.plot_update_sum += delta_ms
-                self.plot_update_count += 1
-                if delta_ms > self.plot_update_max:
-                    self.plot_update_max = delta_ms
-                times_str = " ".join(f"{t:.0f}" for t in self.plot_update_times)
-                avg_session = self.plot_update_sum / self.plot_update_count
-                self.plot_times_var.set(
-                    f"Δt(ms): [{times_str}]  |  Avg: {avg_session:.1f}  Max: {self.plot_update_max:.1f}"
-                )
-            last_plot_time = now
-
-            # Delay 
-            # time.sleep(0.05)
+                loop.add_signal_handler(sig, engine.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        logger = asyncio.create_task(_log_status(engine, settings.LOG_INTERVAL))
+        try:
+            await engine.serve()
+        finally:
+            logger.cancel()
+
+    print(f"Decibelmetru headless - ascult pe {ip}:{port}")
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # serve() s-a incheiat - nu mai sosesc datagrame; worker-ul AI preda ultimul lot inainte de salvare
+        engine.stop_ai()
+        # Salvare dataset AI + intervalele deschise din istoric
+        engine.save_all()
+        engine.close_store()
+        engine.close_capture()
+        alerts.close()
+
+
+def run_gui(ip, port, capture=None):
+    from decibel_gui import DecibelMetru
+    app = DecibelMetru(ip, port, capture=capture)
+    app.protocol("WM_DELETE_WINDOW", app.on_close)
+    app.mainloop()
 
-    # Lampa
-    def _set_lamp(self, color):
-        self.lamp.itemconfig("led", fill=color)
 
-    # Zona status
-    def _set_status(self, text):
-        self.status_text.config(state='normal')
-        self.status_text.delete('1.0', tk.END)
-        self.status_text.insert(tk.END, text)
-        self.status_text.config(state='disabled')
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decibelmetru cu comunicatie fara fir")
+    parser.add_argument("--headless", action="store_true",
+                        help="ruleaza doar colectarea (fara interfata grafica)")
+    parser.add_argument("--ip", default=settings.UDP_IP, help="adresa pe care se asculta (implicit UDP_IP)")
+    parser.add_argument("--port", type=int, default=settings.UDP_PORT, help="portul UDP (implicit UDP_PORT)")
+    parser.add_argument("--capture", default=settings.UDP_CAPTURE or None,
+                        help="captura datagramelor brute: fisier .dbcap sau director (implicit UDP_CAPTURE)")
+    args = parser.parse_args(argv)
+    if not args.port:
+        parser.error("portul UDP nu este configurat (UDP_PORT in .env sau --port)")
 
-    # Oprire program
-    def on_close(self):
-        self.running = False
-        self._set_status("Program oprit")
-        self._set_lamp('orange')
+    if args.headless:
+        run_headless(args.ip, args.port, capture=args.capture)
+    else:
+        run_gui(args.ip, args.port, capture=args.capture)
 
-        # Salvare dataset AI & confirmare salvare
-        self.ai._save_state()
-        if hasattr(self.ai, 'save_path'):
-            print(f"[PatternAI] State saved to {self.ai.save_path}")
-            # Show confirmation when model is saved
-            messagebox.showinfo("Model Saved", "PatternAI model saved successfully.")
-        self.destroy()
 
-# Daca programul este rulat direct (nu importat), creeaza o instanta,
-    # defineste un protocol de oprire
-        # si executa un event loop pentru GUI
+# Daca programul este rulat direct (nu importat), porneste GUI-ul sau daemon-ul
 if __name__ == "__main__":
-    app = DecibelMetru()
-    app.protocol("WM_DELETE_WINDOW", app.on_close)
-    app.mainloop()
+    main()
@@ -0,0 +1,187 @@
+# Prognoza pe orizont (ex. urmatoarele 60 de minute) peste modelul sezonier PatternAI
+#
+# Modelul principal (forest / hgb / bins / sgd) invata tiparul saptamanal din (zi, ora). Prognoza adauga
+# peste el un model al abaterii fata de tipar, antrenat pe serii la rezolutie de minut:
+#   - codificari ciclice ale momentului tinta (sin / cos pe zi si pe saptamana) si distanta h (minute)
+#   - semnalul recent la momentul prognozei: abaterea ultimelor minute (lag) si mediile pe 5 / 15 minute
+# Prognoza directa: un singur model pentru toate distantele h, deci tot orizontul iese dintr-un singur predict().
+
+from collections import deque
+
+import numpy as np
+
+
+WEEK_MINUTES = 7 * 24 * 60
+
+# Minute anterioare folosite ca lag (1 = ultimul minut incheiat) si ferestrele mediilor mobile (minute)
+LAGS = (1, 2)
+WINDOWS = (5, 15)
+HISTORY_MINUTES = max(max(LAGS), max(WINDOWS))
+
+
+def minute_of_week(week_days, hours):
+    """Minutul din saptamana (0 .. 10079) pentru perechi (zi, ora fractionara)."""
+    # Orele sunt float32 in jurnal - 0.001 minute toleranta ca 13:59 sa nu devina 13:58.99
+    minutes = np.floor(np.asarray(hours, dtype=np.float64) * 60 + 1e-3).astype(np.int64)
+    return (np.asarray(week_days, dtype=np.int64) * 24 * 60 + minutes) % WEEK_MINUTES
+
+
+def time_features(minutes):
+    """Codificari ciclice ale minutului din saptamana: sin / cos pe zi si pe saptamana."""
+    minutes = np.asarray(minutes, dtype=np.float64)
+    day = 2 * np.pi * (minutes % (24 * 60)) / (24 * 60)
+    week = 2 * np.pi * minutes / WEEK_MINUTES
+    return np.column_stack([np.sin(day), np.cos(day), np.sin(week), np.cos(week)])
+
+
+def minute_series(week_days, hours, values):
+    """Observatiile cronologice -> medii per minut consecutiv.
+
+    Returneaza (minute din saptamana, medii, breaks); breaks[i] = True cand minutul i nu urmeaza direct
+    minutului i - 1 (pauza in masuratori).
+    """
+    minutes = minute_of_week(week_days, hours)
+    if not len(minutes):
+        return minutes, np.empty(0), np.empty(0, dtype=bool)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(minutes)) + 1])
+    counts = np.diff(np.append(starts, len(minutes)))
+    means = np.add.reduceat(np.asarray(values, dtype=np.float64), starts) / counts
+    minutes = minutes[starts]
+    breaks = np.ones(len(minutes), dtype=bool)
+    breaks[1:] = (minutes[1:] - minutes[:-1]) % WEEK_MINUTES != 1
+    return minutes, means, breaks
+
+
+def signal_features(residuals, breaks):
+    """Lag-uri si medii mobile ale abaterii, la fiecare minut (inclusiv minutul respectiv), vectorizat.
+
+    Valorile care ar trece peste o pauza raman NaN (backend-ul hgb trateaza NaN nativ).
+    """
+    n = len(residuals)
+    segment = np.cumsum(breaks) - 1
+    first = np.flatnonzero(breaks)
+    position = np.arange(n) - first[segment]
+    columns = []
+    for lag in LAGS:
+        col = np.full(n, np.nan)
+        ok = position >= lag - 1
+        col[ok] = residuals[np.flatnonzero(ok) - (lag - 1)]
+        columns.append(col)
+    cumsum = np.concatenate([[0.0], np.cumsum(residuals)])
+    for window in WINDOWS:
+        col = np.full(n, np.nan)
+        idx = np.flatnonzero(position >= window - 1)
+        col[idx] = (cumsum[idx + 1] - cumsum[idx + 1 - window]) / window
+        columns.append(col)
+    return np.column_stack(columns)
+
+
+def window_features(recent):
+    """Aceleasi caracteristici ca signal_features, pentru ultimele minute ale fluxului live (cele vechi primele)."""
+    recent = np.asarray(recent, dtype=np.float64)
+    row = [recent[-lag] if len(recent) >= lag else np.nan for lag in LAGS]
+    row += [recent[-window:].mean() if len(recent) >= window else np.nan for window in WINDOWS]
+    return np.array(row)
+
+
+class MinuteSignal:
+    """Mediile ultimelor minute incheiate din fluxul live - actualizare O(1) per esantion."""
+
+    def __init__(self):
+        # (minut Unix, minut din saptamana, medie), cel mai vechi primul; doar minute consecutive
+        self.minutes = deque(maxlen=HISTORY_MINUTES)
+        self._current = None
+        self._sum = 0.0
+        self._count = 0
+        # Creste la fiecare minut incheiat - cheia cache-ului de prognoza
+        self.version = 0
+
+    def _enter(self, epoch_minute, week_minute):
+        """Trece la minutul dat; False pentru un esantion intarziat (minut deja incheiat)."""
+        if self._current is not None:
+            if epoch_minute == self._current[0]:
+                return True
+            if epoch_minute < self._current[0]:
+                return False
+            self._close()
+        self._current = (epoch_minute, week_minute)
+        self._sum = 0.0
+        self._count = 0
+        return True
+
+    def add(self, epoch_minute, week_minute, value):
+        if self._enter(epoch_minute, week_minute):
+            self._sum += value
+            self._count += 1
+
+    def extend(self, epoch_minutes, week_minutes, values):
+        """Un lot ordonat in timp - un singur pas per minut distinct."""
+        epoch_minutes = np.asarray(epoch_minutes, dtype=np.int64)
+        if not len(epoch_minutes):
+            return
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(epoch_minutes)) + 1])
+        sums = np.add.reduceat(np.asarray(values, dtype=np.float64), starts)
+        counts = np.diff(np.append(starts, len(epoch_minutes)))
+        for start, total, count in zip(starts.tolist(), sums.tolist(), counts.tolist()):
+            if self._enter(int(epoch_minutes[start]), int(week_minutes[start])):
+                self._sum += total
+                self._count += count
+
+    def _close(self):
+        epoch_minute, week_minute = self._current
+        if self.minutes and self.minutes[-1][0] != epoch_minute - 1:
+            self.minutes.clear()
+        self.minutes.append((epoch_minute, week_minute, self._sum / self._count))
+        self.version += 1
+
+    @property
+    def last_minute(self):
+        return self.minutes[-1][0] if self.minutes else None
+
+
+class Forecaster:
+    """Abaterea fata de tiparul sezonier la h = 1 .. horizon minute dupa ultimul minut incheiat."""
+
+    def __init__(self, horizon=60, max_rows=200000, horizons_per_origin=4, seed=0):
+        self.horizon = horizon
+        self.max_rows = max_rows
+        self.horizons_per_origin = horizons_per_origin
+        self.seed = seed
+        self.model = None
+
+    @staticmethod
+    def _features(target_minutes, h, signal):
+        return np.column_stack([time_features(target_minutes), h, signal])
+
+    def fit(self, minutes, means, breaks, seasonal):
+        """minutes / means / breaks din minute_series; seasonal = predictia tiparului pentru fiecare minut."""
+        residuals = means - seasonal
+        signal = signal_features(residuals, breaks)
+        n = len(residuals)
+        rng = np.random.default_rng(self.seed)
+        # Cateva distante h aleatoare per minut de origine - setul ramane proportional cu istoricul
+        origins = np.repeat(np.arange(n), self.horizons_per_origin)
+        h = rng.integers(1, self.horizon + 1, len(origins))
+        targets = origins + h
+        segment = np.cumsum(breaks)
+        ok = targets < n
+        ok[ok] &= segment[targets[ok]] == segment[origins[ok]]
+        origins, targets, h = origins[ok], targets[ok], h[ok]
+        if len(origins) < 100:
+            self.model = None
+            return False
+        if len(origins) > self.max_rows:
+            keep = np.sort(rng.choice(len(origins), self.max_rows, replace=False))
+            origins, targets, h = origins[keep], targets[keep], h[keep]
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        model = HistGradientBoostingRegressor(max_iter=100, max_depth=6, early_stopping=False)
+        model.fit(self._features(minutes[targets], h, signal[origins]), residuals[targets])
+        self.model = model
+        return True
+
+    def predict(self, target_minutes, h, recent_residuals):
+        """Abaterile prognozate pentru minutele tinta, la distantele h de ultimul minut incheiat."""
+        if self.model is None:
+            return np.zeros(len(target_minutes))
+        signal = np.broadcast_to(window_features(recent_residuals), (len(target_minutes), len(LAGS) + len(WINDOWS)))
+        return self.model.predict(self._features(target_minutes, h, signal))
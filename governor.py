@@ -0,0 +1,94 @@
+# Guvernator CPU - tine procesul in bugetul de CPU configurat
+#
+# CPU-ul se citeste fara blocare (psutil.cpu_percent(None) = media de la citirea anterioara) si se netezeste.
+# Rezultatul este un singur factor `scale` in (0, 1], ajustat AIMD: scade multiplicativ peste buget,
+# creste aditiv sub buget. Din el se deriva:
+#   - intervalul minim dintre predictii
+#   - cat de rar se reantreneaza PatternAI (refit_every / refit_interval inmultite cu 1 / scale)
+#   - dimensiunea modelului si numarul de thread-uri pentru reantrenare (forest / hgb), relativ la profilul
+#     de antrenare configurat
+#   - FPS-ul de randare al GUI-ului
+
+import os
+import threading
+import time
+
+import psutil
+
+
+class ResourceGovernor:
+    MIN_SCALE = 0.1
+    # Sub buget * RELAX se considera ca exista loc de crestere
+    RELAX = 0.8
+
+    def __init__(self, budget=80.0, period=2.0, smoothing=0.5):
+        self.budget = budget
+        self.period = period
+        self.smoothing = smoothing
+        self.scale = 1.0
+        self.cpu = None
+        self._last_sample = 0.0
+        self._lock = threading.Lock()
+        # Prima citire initializeaza referinta psutil (intoarce 0.0)
+        psutil.cpu_percent(None)
+
+    def sample(self, now=None):
+        """Citire CPU non-blocanta, cel mult o data per `period`. Returneaza True daca scale s-a schimbat."""
+        now = time.monotonic() if now is None else now
+        if now - self._last_sample < self.period or not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._last_sample = now
+            cpu = psutil.cpu_percent(None)
+            self.cpu = cpu if self.cpu is None else self.cpu + self.smoothing * (cpu - self.cpu)
+            return self._adjust(self.cpu)
+        finally:
+            self._lock.release()
+
+    def _adjust(self, cpu):
+        old = self.scale
+        if cpu > self.budget:
+            self.scale = max(self.MIN_SCALE, self.scale * 0.7)
+        elif cpu < self.budget * self.RELAX:
+            self.scale = min(1.0, self.scale + 0.1)
+        return self.scale != old
+
+    @property
+    def saturated(self):
+        return self.scale <= self.MIN_SCALE
+
+    # ---- Parametri derivati ----
+
+    def prediction_interval(self):
+        """Secunde minime intre doua predictii ale aceluiasi senzor (0 = la fiecare minut nou)."""
+        return 0.0 if self.scale >= 1.0 else 60.0 * (1.0 / self.scale - 1.0)
+
+    def refit_scale(self):
+        return 1.0 / self.scale
+
+    def backend_overrides(self, backend, options):
+        """Limitele aplicate peste optiunile profilului la urmatoarea reantrenare.
+
+        Numarul de arbori / iteratii scade proportional cu scale; thread-urile (forest) raman in bugetul de CPU.
+        """
+        if backend == "forest":
+            cores = os.cpu_count() or 1
+            budget_jobs = max(1, int(cores * self.budget / 100 * self.scale))
+            n_jobs = options.get("n_jobs") or 1
+            if n_jobs < 0:
+                n_jobs = max(1, cores + 1 + n_jobs)
+            n_estimators = options.get("n_estimators", 100)
+            return {"n_estimators": max(min(20, n_estimators), int(n_estimators * self.scale)),
+                    "n_jobs": min(n_jobs, budget_jobs)}
+        if backend == "hgb":
+            max_iter = options.get("max_iter", 100)
+            return {"max_iter": max(min(20, max_iter), int(max_iter * self.scale))}
+        return {}
+
+    def render_fps(self, base):
+        return max(2.0, base * self.scale)
+
+    def apply(self, ai):
+        """Transmite limitele curente unui PatternAI (folosite la urmatoarea reantrenare)."""
+        ai.refit_scale = self.refit_scale()
+        ai.governor_options = self.backend_overrides(ai.backend, ai.backend_options)
@@ -0,0 +1,445 @@
+# Librarii
+
+# Receptie UDP
+import asyncio
+
+# Multitasking
+import threading
+
+# Coada marginita spre PatternAI (drop-oldest / drop-newest / coalesce)
+from ai_queue import SampleQueue
+
+# Timp
+import time
+
+# Bugetul de CPU - predictii, reantrenari si FPS adaptate la incarcare
+from governor import ResourceGovernor
+
+# Senzori multipli pe acelasi socket
+from sensor_registry import SensorRegistry
+
+# Decodare pachete (binar v1 + ASCII legacy)
+from wire_format import decode
+
+# Contoare / histograme pentru /metrics si linia de stare
+from metrics import REGISTRY
+
+# Captura datagramelor brute (reluare cu misc/replay.py)
+from capture import CaptureWriter
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, engine):
+        self.engine = engine
+
+    def datagram_received(self, data, addr):
+        self.engine.datagram_received(data, addr)
+
+    def error_received(self, exc):
+        self.engine._emit("error", str(exc))
+
+
+class IngestEngine:
+    """Receptie UDP, statistici per senzor si alimentarea PatternAI - independent de GUI.
+
+    Abonatii (subscribe) primesc evenimente sub forma de tupluri, pe thread-ul motorului:
+        ("connected",) ("sensor", s) ("sample", s, elapsed, value) ("reset", s)
+        ("alert_start", s, alert) ("alert_end", s, alert) ("ai_loading", s | None) ("ai_loaded", s)
+        ("timeout",) ("error", mesaj)
+    preload_ai() adauga ("ai_ready", ai | None), emis de thread-ul care incarca modelul.
+    """
+
+    def __init__(self, ip, port, registry, timeout=5, stop_on_timeout=False, remote_reset=True, alerts=None,
+                 ai_queue_size=10000, ai_queue_policy="drop-oldest", ai_batch=1000, cpu_budget=80.0,
+                 store=None, capture=None):
+        self.ip = ip
+        self.port = port
+        self.sensors = registry
+        # AlertEngine optional - evaluat pe thread-ul motorului, evenimentele pleaca doar la tranzitii
+        self.alerts = alerts
+        # TimeSeriesStore optional - fiecare esantion ajunge si in istoricul pe termen lung
+        self.store = store
+        # Fisier (sau director) pentru captura datagramelor brute - deschis la prima pornire, inchis de close_capture()
+        self.capture_path = capture
+        self.capture = None
+        self.timeout = timeout
+        # GUI: timeout-ul opreste receptia (se reporneste cu Start); daemon: se asteapta in continuare
+        self.stop_on_timeout = stop_on_timeout
+        # GUI: reset-ul remote trece prin safety lock-ul din interfata, deci doar se anunta
+        self.remote_reset = remote_reset
+
+        self.subscribers = []
+        self.running = False
+        self.connected = False
+        self.ingest_count = 0
+        self.bad_packets = 0
+        self.start_time = time.time()
+        self.last_packet = None
+        self._loop = None
+        self._stop = None
+        self._thread = None
+
+        # Functie predictie AI - coada comuna marginita (senzor, timestamp, valoare), PatternAI separat per senzor
+        self.ai_queue = SampleQueue(ai_queue_size, ai_queue_policy)
+        self.ai_batch = ai_batch
+        # Citit si de GUI (FPS), esantionat de worker-ul AI
+        self.governor = ResourceGovernor(cpu_budget)
+        self.ai_thread = None
+        self._ai_stop = threading.Event()
+        # Iteratii ale worker-ului AI - drain_ai() asteapta o iteratie incheiata dupa golirea cozii
+        self.ai_cycles = 0
+        self._last_prediction_error = None
+        self._last_ai_error = None
+        # Senzori al caror model nu s-a putut incarca - fara PatternAI pana la repornire
+        self._ai_failed = set()
+
+        # Metrici - create o singura data, actualizate pe caile critice
+        self.m_packets = REGISTRY.counter("decibel_packets_total", "Datagrame UDP primite")
+        self.m_bad_packets = REGISTRY.counter("decibel_bad_packets_total", "Datagrame care nu au putut fi decodate")
+        self.m_late_packets = REGISTRY.counter("decibel_late_packets_total", "Pachete sosite in afara ordinii (ignorate)")
+        self.m_samples = REGISTRY.counter("decibel_samples_total", "Esantioane dB receptionate")
+        self.m_datagram = REGISTRY.histogram("decibel_datagram_seconds", "Timp de procesare per datagram")
+        REGISTRY.counter("decibel_ai_queue_dropped_total", "Esantioane eliminate din coada AI (coada plina)",
+                         fn=lambda: self.ai_queue.dropped)
+        REGISTRY.counter("decibel_ai_queue_coalesced_total", "Esantioane comasate in medii pe secunda",
+                         fn=lambda: self.ai_queue.coalesced)
+        self.m_ai_batch = REGISTRY.histogram("decibel_ai_batch_seconds", "Timp de procesare per lot in worker-ul AI")
+        self.m_ai_batch_size = REGISTRY.histogram("decibel_ai_batch_size", "Esantioane per lot predat PatternAI",
+                                                  buckets=(1, 10, 100, 1000, 10000))
+        self.m_predictions = REGISTRY.counter("decibel_predictions_total", "Predictii PatternAI calculate")
+        self.m_prediction_errors = REGISTRY.counter("decibel_prediction_errors_total", "Predictii PatternAI esuate")
+        self.m_ai_errors = REGISTRY.counter("decibel_ai_errors_total",
+                                            "Loturi PatternAI esuate (incarcare model, jurnal, backend)")
+        REGISTRY.gauge("decibel_cpu_percent", "Incarcarea CPU netezita vazuta de guvernator",
+                       fn=lambda: self.governor.cpu or 0.0)
+        REGISTRY.gauge("decibel_governor_scale", "Factorul de calitate al guvernatorului CPU (1 = fara limitare)",
+                       fn=lambda: self.governor.scale)
+        REGISTRY.gauge("decibel_ai_queue_depth", "Esantioane in asteptare pentru PatternAI", fn=self.ai_queue.qsize)
+        REGISTRY.gauge("decibel_ai_prediction_enabled", "1 daca predictiile sunt active (CPU sub prag)",
+                       fn=lambda: int(self.ai_prediction_enabled))
+        REGISTRY.gauge("decibel_sensors", "Senzori activi", fn=lambda: len(self.sensors))
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def _emit(self, *event):
+        for callback in self.subscribers:
+            callback(event)
+
+    def preload_ai(self):
+        """Incarcarea in fundal a modelului primului senzor; la final evenimentul ("ai_ready", ai | None)."""
+        future = self.sensors.preload()
+        if future is None:
+            return
+        self._emit("ai_loading", None)
+        future.add_done_callback(lambda f: self._emit("ai_ready", None if f.exception() else f.result()))
+
+    # Pornire in fundal (GUI) - bucla asyncio proprie, pe un thread separat
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    # Pornire blocanta (daemon)
+    def run(self):
+        self.running = True
+        try:
+            asyncio.run(self.serve())
+        finally:
+            self.running = False
+
+    def stop(self, wait=False, timeout=5.0):
+        """Oprirea receptiei; wait=True asteapta iesirea din serve() - dupa aceea nu mai sosesc datagrame."""
+        self.running = False
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def stop_ai(self, timeout=5.0):
+        """Opreste worker-ul AI dupa ce a predat modelelor ce era in coada (la inchidere, inainte de save_all)."""
+        thread = self.ai_thread
+        if thread is None:
+            return
+        self._ai_stop.set()
+        thread.join(timeout)
+        self.ai_thread = None
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._start_ai_worker()
+        try:
+            transport, _ = await self._loop.create_datagram_endpoint(
+                lambda: _UdpProtocol(self), local_addr=(self.ip, self.port))
+        except OSError as e:
+            self._emit("error", f"Nu se poate asculta pe {self.ip}:{self.port} - {e}")
+            return
+
+        self.start_time = time.time()
+        self.last_packet = time.time()
+        self.connected = False
+        if self.capture_path and self.capture is None:
+            try:
+                self.capture = CaptureWriter(self.capture_path, start=self.start_time)
+                print(f"Captura UDP: {self.capture.path}")
+            except OSError as e:
+                # Receptia continua si fara captura
+                print(f"Captura UDP nu poate fi scrisa in {self.capture_path} - {e}")
+                self.capture_path = None
+        try:
+            # Watchdog timeout - verificat de cateva ori pe secunda
+            while not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=0.25)
+                except asyncio.TimeoutError:
+                    pass
+                if time.time() - self.last_packet > self.timeout:
+                    if self.connected or self.stop_on_timeout:
+                        self._emit("timeout")
+                    self.connected = False
+                    self.last_packet = time.time()
+                    if self.stop_on_timeout:
+                        break
+        finally:
+            transport.close()
+            self._loop = None
+
+    # Decodare pachet - node id-ul din pachet (sau adresa expeditorului) identifica senzorul
+    # arrival: timpul sosirii (Unix); implicit acum, la reluare cel din captura
+    def datagram_received(self, data, addr, arrival=None):
+        start = time.perf_counter()
+        self._datagram_received(data, addr, time.time() if arrival is None else arrival)
+        self.m_datagram.observe(time.perf_counter() - start)
+
+    def _datagram_received(self, data, addr, arrival):
+        if self.capture is not None:
+            self.capture.write(arrival, data, addr)
+        self.last_packet = arrival
+        self.m_packets.inc()
+        if not self.connected:
+            self.connected = True
+            self._emit("connected")
+
+        packet = decode(data)
+        # Pachet invalid - ignora pachetul fara sa opresti programul
+        if packet is None:
+            self.bad_packets += 1
+            self.m_bad_packets.inc()
+            return
+        sensor = self.sensors.get(addr, packet.node_id)
+        if sensor.packets == 1:
+            self._register_sensor_metrics(sensor)
+            self._emit("sensor", sensor)
+
+        # Pachetele intarziate (reordonate) doar se contorizeaza - graficul ramane ordonat in timp
+        if packet.seq is not None and not sensor.sequence.update(packet.seq):
+            self.m_late_packets.inc()
+            return
+
+        # Reset remote
+        if packet.reset:
+            if self.remote_reset:
+                sensor.reset()
+            self._emit("reset", sensor)
+        if not len(packet.values):
+            return
+
+        # Pachet legacy: timestamp la sosire; pachet binar: timpul placii, cate un pas interval_ms per valoare
+        if packet.millis is None:
+            t0, step = arrival, 0.0
+        else:
+            t0, step = sensor.clock.to_local(packet.millis, arrival), packet.interval_ms / 1000.0
+        self.add_samples(sensor, t0 - self.start_time, step, packet.values.tolist())
+
+    def add_samples(self, sensor, t0, step, values):
+        elapsed = t0
+        for i, value in enumerate(values):
+            # Timpul nu poate merge inapoi in buffer-ul plot-ului (resincronizare ceas)
+            elapsed = max(t0 + i * step, sensor.last_time)
+            sensor.add(elapsed, value)
+            if self.store is not None:
+                self.store.append(sensor.id, self.start_time + elapsed, value)
+            if self.alerts is not None:
+                transition = self.alerts.update(sensor.id, self.start_time + elapsed, value)
+                if transition is not None:
+                    self._emit(transition[0], sensor, transition[1])
+
+            # Invatare & predictie AI (non-blocking) - coada plina: politica cozii decide ce se pierde
+            self.ai_queue.put(sensor, self.start_time + elapsed, value)
+        self.ingest_count += len(values)
+        self.m_samples.inc(len(values))
+        self._emit("sample", sensor, elapsed, values[-1])
+
+    # Reset cerut din afara motorului (ex. butonul din GUI) - executat pe thread-ul motorului
+    def reset(self, sensors):
+        def _do():
+            for sensor in sensors:
+                sensor.reset()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(_do)
+        else:
+            _do()
+
+    # Pierderi / reordonari / numar esantioane per senzor - citite din starea senzorului la export
+    @staticmethod
+    def _register_sensor_metrics(sensor):
+        seq = sensor.sequence
+        REGISTRY.gauge("decibel_sensor_lost_packets", "Pachete pierdute (dupa numerele de secventa)",
+                       fn=lambda: seq.lost, sensor=sensor.id)
+        REGISTRY.gauge("decibel_sensor_reordered_packets", "Pachete sosite in afara ordinii",
+                       fn=lambda: seq.reordered, sensor=sensor.id)
+        REGISTRY.gauge("decibel_sensor_samples", "Esantioane de la ultimul reset",
+                       fn=lambda: sensor.count, sensor=sensor.id)
+        REGISTRY.gauge("decibel_ai_train_samples", "Observatii folosite la ultima reantrenare PatternAI",
+                       fn=lambda: sensor.ai.train_samples if sensor.ai is not None else 0, sensor=sensor.id)
+        REGISTRY.gauge("decibel_ai_model_bytes", "Marimea checkpoint-ului PatternAI (octeti)",
+                       fn=lambda: sensor.ai.model_bytes if sensor.ai is not None else 0, sensor=sensor.id)
+
+    def _start_ai_worker(self):
+        if self.ai_thread is None:
+            self._ai_stop.clear()
+            self.ai_thread = threading.Thread(target=self._ai_worker, daemon=True)
+            self.ai_thread.start()
+
+    def _ai_worker(self):
+        while not (self._ai_stop.is_set() and not self.ai_queue.qsize()):
+            self.ai_cycles += 1
+            # Tot ce s-a adunat (pana la ai_batch esantioane), grupat per senzor; timeout-ul lasa
+            # guvernatorul sa-si revina si cand nu sosesc date
+            batch = self.ai_queue.get_batch(self.ai_batch, timeout=1.0)
+            start = time.perf_counter()
+
+            # Citire CPU non-blocanta; limitele noi ajung la modele inainte de urmatoarea reantrenare
+            if self.governor.sample():
+                for sensor in self.sensors:
+                    if sensor.ai is not None:
+                        self.governor.apply(sensor.ai)
+
+            for sensor, (times, values) in batch.items():
+                if sensor.id in self._ai_failed:
+                    continue
+                # Eroarea unui senzor nu opreste worker-ul - ceilalti senzori (si loturile urmatoare) continua
+                try:
+                    # Modelul senzorului se incarca la prima observatie
+                    if sensor.ai is None:
+                        self._emit("ai_loading", sensor)
+                        self.sensors.ai_for(sensor)
+                        self.governor.apply(sensor.ai)
+                        self._emit("ai_loaded", sensor)
+                    # Always save data for training - un singur apel per lot
+                    sensor.ai.add_observations_bulk(times, values, refit=False)
+                    self.m_ai_batch_size.observe(len(values))
+                except Exception as e:
+                    self.m_ai_errors.inc()
+                    if repr(e) != self._last_ai_error:
+                        self._last_ai_error = repr(e)
+                        print(f"[PatternAI] Lot esuat pentru {sensor.id}: {e!r}")
+                    # Un model care nu se incarca nu se mai reincearca la fiecare lot
+                    if sensor.ai is None:
+                        self._ai_failed.add(sensor.id)
+                        self._emit("ai_ready", None)
+
+            if not batch:
+                continue
+            for sensor in batch:
+                if sensor.ai is not None:
+                    self._predict(sensor)
+            self.m_ai_batch.observe(time.perf_counter() - start)
+
+    # Predictiile se opresc doar cand guvernatorul a ajuns la limita minima
+    @property
+    def ai_prediction_enabled(self):
+        return not self.governor.saturated
+
+    def _predict(self, sensor):
+        ai = sensor.ai
+        # Only predict if enabled and model is trained
+        # Predictia este o citire din grila - se reface doar la minut nou sau grila noua,
+        # dar nu mai des decat permite guvernatorul
+        now = time.time()
+        key = (int(now // 60), ai.grid_version, ai.forecast_version)
+        if (self.ai_prediction_enabled and ai.initialized and len(ai.history) >= 50
+                and key != sensor.ai_pred_key
+                and now - sensor.ai_pred_time >= self.governor.prediction_interval()):
+            try:
+                pred = ai.predict_current_pattern()
+                sensor.ai_pred = pred
+                sensor.ai_forecast = ai.forecast()
+                sensor.ai_pred_key = key
+                sensor.ai_pred_time = now
+                self.m_predictions.inc()
+            except Exception as e:
+                # Predictia ramane optionala, dar eroarea se contorizeaza si se afiseaza (o data per tip de eroare)
+                self.m_prediction_errors.inc()
+                if repr(e) != self._last_prediction_error:
+                    self._last_prediction_error = repr(e)
+                    print(f"[PatternAI] Predictie esuata pentru {sensor.id}: {e!r}")
+
+    # Reluare fara socket (misc/replay.py): datagramele vin prin datagram_received(..., arrival) de pe
+    # thread-ul apelantului; timpii relativi (plot, statistici) pornesc de la start_time
+    def start_offline(self, start_time, ai=True):
+        self.start_time = start_time
+        self.last_packet = start_time
+        self.running = True
+        if ai:
+            self._start_ai_worker()
+
+    def drain_ai(self, timeout=None):
+        """Asteapta pana cand worker-ul AI a procesat tot ce este in coada. False la expirarea timeout-ului."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.ai_queue.qsize():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        # Ultimul lot poate fi inca in lucru - o iteratie noua a worker-ului inseamna ca s-a incheiat
+        cycle = self.ai_cycles
+        while self.ai_cycles == cycle:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close_store(self):
+        if self.store is not None:
+            self.store.close()
+
+    def close_capture(self):
+        if self.capture is not None:
+            self.capture.close()
+            print(f"Captura UDP: {self.capture.datagrams} datagrame, {self.capture.bytes / 1024:.0f} KB "
+                  f"in {self.capture.path}")
+
+    def save_all(self, timeout=60):
+        """Salvarea finala a tuturor modelelor - cerute impreuna, scrise de thread-ul de checkpoint."""
+        saved = [sensor.ai for sensor in self.sensors if sensor.ai is not None]
+        # Checkpoint-urile la zi nu se rescriu
+        for ai in saved:
+            if ai.unsaved:
+                ai.checkpoint()
+        if saved:
+            from checkpoint import CHECKPOINTS
+            if not CHECKPOINTS.wait(timeout):
+                print(f"[PatternAI] Salvarea nu s-a incheiat in {timeout} s")
+                return []
+        for ai in saved:
+            print(f"[PatternAI] State saved to {ai.save_path}")
+        return saved
+
+
+def make_registry(capacity, window=None, backend="forest", profile=None, forecast_horizon=60, checkpoint=None,
+                  state_dir=None):
+    # PatternAI (si sklearn) se importa doar cand primul senzor are nevoie de model
+    # profile: dict cu campurile TrainingProfile (ex. settings.AI_PROFILE); None = valorile implicite
+    # checkpoint: parametrii de salvare PatternAI (ex. settings.AI_CHECKPOINT)
+    # state_dir: directorul starilor PatternAI (implicit langa aplicatie)
+    def ai_factory(path):
+        from pattern_ai import PatternAI
+        from ai_backends import TrainingProfile
+        return PatternAI(save_path=path, backend=backend,
+                         profile=TrainingProfile(**profile) if profile is not None else None,
+                         forecast_horizon=forecast_horizon, **(checkpoint or {}))
+    return SensorRegistry(capacity, window=window, state_dir=state_dir, ai_factory=ai_factory)
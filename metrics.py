@@ -0,0 +1,278 @@
+# Instrumentare: contoare, gauge-uri si histograme cu cost redus, exportate in format text Prometheus
+#
+#   from metrics import REGISTRY
+#   packets = REGISTRY.counter("decibel_packets_total", "Pachete UDP primite")
+#   packets.inc()
+#
+# Cost: inc() / set() = o adunare / atribuire, observe() = o cautare binara in limitele bucket-urilor.
+# Valorile sunt scrise fara lock (fiecare metrica are, in practica, un singur thread care o scrie);
+# la citire se accepta o imagine usor decalata intre metrici.
+
+import bisect
+import http.server
+import math
+import threading
+import time
+from collections import deque
+
+
+# Limitele implicite ale histogramelor (secunde) - de la 10 us la 60 s
+DEFAULT_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _labels_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _fmt(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Valoare crescatoare - incrementata explicit sau citita la export dintr-un contor existent (fn)."""
+
+    kind = "counter"
+
+    def __init__(self, name, help="", labels=None, fn=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.fn = fn
+        self._value = 0
+
+    def inc(self, n=1):
+        self._value += n
+
+    @property
+    def value(self):
+        return self.fn() if self.fn is not None else self._value
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Gauge:
+    """Valoare curenta - setata explicit sau citita la export dintr-o functie (ex. adancimea unei cozi)."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help="", labels=None, fn=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.fn = fn
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, n=1):
+        self._value += n
+
+    @property
+    def value(self):
+        return self.fn() if self.fn is not None else self._value
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Histogram:
+    """Distributie pe bucket-uri fixe + ultimele `recent` observatii (pentru afisaje de tip Δt)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help="", labels=None, buckets=DEFAULT_BUCKETS, recent=0):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=recent) if recent else None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        if self.recent is not None:
+            self.recent.append(value)
+
+    def time(self):
+        """Context manager: observa durata blocului (secunde)."""
+        return _Timer(self)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Aproximare din bucket-uri (limita superioara a bucket-ului care contine percentila)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cum = 0
+        for bound, n in zip(self.bounds + (math.inf,), self.counts):
+            cum += n
+            if cum >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        if self.recent is not None:
+            self.recent.clear()
+
+    def samples(self):
+        cum = 0
+        for bound, n in zip(self.bounds + (math.inf,), self.counts):
+            cum += n
+            yield self.name + "_bucket", {**self.labels, "le": _fmt(bound)}, cum
+        yield self.name + "_sum", self.labels, self.sum
+        yield self.name + "_count", self.labels, self.count
+
+
+class _Timer:
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Registry:
+    """Toate metricile procesului, indexate dupa (nume, etichete). Crearea repetata intoarce aceeasi metrica."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(name, help, labels, **kwargs)
+        return metric
+
+    def counter(self, name, help="", fn=None, **labels):
+        counter = self._get(Counter, name, help, labels)
+        if fn is not None:
+            counter.fn = fn
+        return counter
+
+    def gauge(self, name, help="", fn=None, **labels):
+        gauge = self._get(Gauge, name, help, labels)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS, recent=0, **labels):
+        return self._get(Histogram, name, help, labels, buckets=buckets, recent=recent)
+
+    def get(self, name, **labels):
+        return self._metrics.get((name, tuple(sorted(labels.items()))))
+
+    def remove(self, name, **labels):
+        with self._lock:
+            self._metrics.pop((name, tuple(sorted(labels.items()))), None)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._metrics.values()))
+
+    def render(self):
+        """Export in formatul text Prometheus (version 0.0.4)."""
+        lines = []
+        described = set()
+        for metric in sorted(self, key=lambda m: m.name):
+            if metric.name not in described:
+                described.add(metric.name)
+                if metric.help:
+                    lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{_labels_text(labels)} {_fmt(value)}")
+            except Exception:
+                # Un gauge calculat care esueaza nu strica restul exportului
+                continue
+        return "\n".join(lines) + "\n"
+
+    def summary_line(self):
+        """Rezumat de o linie pentru jurnalul periodic: contoare / gauge-uri si p50/p99/max pentru histograme."""
+        parts = []
+        for metric in sorted(self, key=lambda m: (m.name, sorted(m.labels.items()))):
+            label = ",".join(f"{v}" for _, v in sorted(metric.labels.items()))
+            name = metric.name.removeprefix("decibel_") + (f"[{label}]" if label else "")
+            try:
+                if metric.kind == "histogram":
+                    if metric.count:
+                        parts.append(f"{name}=n{metric.count}/p50 {_short(metric.quantile(0.5))}"
+                                     f"/p99 {_short(metric.quantile(0.99))}/max {_short(metric.max)}")
+                else:
+                    parts.append(f"{name}={_short(metric.value)}")
+            except Exception:
+                continue
+        return " ".join(parts)
+
+
+def _short(value):
+    if isinstance(value, float):
+        return f"{value:.3g}"
+    return str(value)
+
+
+# Registrul implicit al procesului
+REGISTRY = Registry()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrape-urile periodice nu au ce cauta in consola
+        pass
+
+
+def serve(port, host="127.0.0.1", registry=REGISTRY):
+    """Porneste endpoint-ul HTTP /metrics pe un thread de fundal. Returneaza serverul (server.shutdown() il opreste)."""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
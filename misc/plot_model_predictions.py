@@ -1,42 +1,36 @@
-import pickle
+import os
+import sys
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
-# Load the trained PatternAI state (as saved by pattern_ai.py)
-with open("patternai_state.pkl", "rb") as f:
-    state = pickle.load(f)
+# Modulele aplicatiei se afla in directorul parinte
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pattern_ai import PatternAI
 
-# Extract model and check initialization
-model = state["model"]
-initialized = state.get("initialized", False)
-history = state.get("history", [])
+# Load the trained PatternAI state (as saved by pattern_ai.py)
+ai = PatternAI(save_path=os.path.abspath("patternai_state.pkl"))
 
-# Check if model is actually trained (has estimators)
-if not initialized or not hasattr(model, 'estimators_') or len(model.estimators_) == 0:
-    print(f"Modelul nu este antrenat, dar există {len(history)} observații în istoric.")
+# Check if model is actually trained
+if not ai.initialized:
+    print(f"Modelul nu este antrenat, dar există {len(ai.history)} observații în istoric.")
     
-    if len(history) < 50:
+    if len(ai.history) < 50:
         print(f"Se necesită cel puțin 50 de observații pentru antrenare.")
         exit()
     
     # Train the model with existing data
     print("Se antrenează modelul cu datele existente...")
-    X = np.array([[d, h] for d, h, _ in history])
-    y = np.array([v for _, _, v in history])
-    model.fit(X, y)
-    print(f"Modelul a fost antrenat cu succes folosind {len(history)} observații!")
+    ai._retrain_model()
+    print(f"Modelul a fost antrenat cu succes folosind {len(ai.history)} observații!")
 
 # Prepare grid of days (0-6) and hours (0-23)
 days = list(range(7))
 hours = list(range(24))
 
-# Generate predictions
-pred_matrix = np.zeros((7, 24))
-for d in days:
-    for h in hours:
-        X = np.array([[d, h]])
-        pred_matrix[d, h] = model.predict(X)[0]
+# Generate predictions - un singur apel vectorizat pentru toata grila 7 x 24
+dd, hh = np.meshgrid(days, hours, indexing="ij")
+pred_matrix = ai.predict_many(dd, hh).reshape(7, 24)
 
 # Create DataFrame for display
 df = pd.DataFrame(pred_matrix, index=[f"Ziua {d}" for d in days],
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# Reluarea capturilor UDP (.dbcap, scrise cu --capture / UDP_CAPTURE) prin același lanț de recepție
+#
+#   python misc/replay.py captures/capture_20251224_220000.dbcap                 # cât de repede se poate
+#   python misc/replay.py captures/*.dbcap --speed 1 --state-dir /tmp/ai         # ritmul original, modele păstrate
+#   AI_BACKEND=hgb ALERT_THRESHOLD=50 python misc/replay.py noapte.dbcap          # alte setări, același trafic
+#   python misc/replay.py noapte.dbcap --speed 10 --send 127.0.0.1:5005          # către o instanță pornită (GUI)
+#
+# Datagramele trec prin IngestEngine.datagram_received cu timpii de sosire din captură: decodare, senzori,
+# statistici, alerte, istoric (opțional) și PatternAI. Setările vin din .env, ca la aplicație.
+# Fără pauze (--speed 0), rezultatul este și un test de throughput pentru tot lanțul.
+
+import argparse
+import glob
+import os
+import socket
+import sys
+import tempfile
+import time
+
+# Modulele aplicației se află în directorul părinte
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import settings
+from alerts import AlertEngine
+from capture import CaptureReader, paced, replay
+from ingest_engine import IngestEngine, make_registry
+from window_stats import format_summary, window_label
+
+
+def expand(patterns):
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    return paths
+
+
+def records(readers):
+    for reader in readers:
+        yield from reader
+
+
+def send(readers, target, speed):
+    """Trimite datagramele prin UDP - timpii de sosire devin cei ai receptorului."""
+    host, _, port = target.rpartition(":")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.perf_counter()
+    count = 0
+    for _, data, _ in paced(records(readers), speed, readers[0].start):
+        sock.sendto(data, (host, int(port)))
+        count += 1
+    sock.close()
+    print(f"{count} datagrame trimise către {target} în {time.perf_counter() - start:.1f} s")
+
+
+def report(engine, finished, seconds, drain):
+    duration = engine.last_packet - engine.start_time
+    print(f"{engine.m_packets.value:.0f} datagrame, {engine.ingest_count} eșantioane, "
+          f"{engine.bad_packets} invalide - {duration / 3600:.2f} h de trafic în {seconds:.2f} s "
+          f"({duration / seconds if seconds else 0:.0f}x)")
+    print(f"Throughput: {engine.m_packets.value / seconds:.0f} datagrame/s, {engine.ingest_count / seconds:.0f} "
+          f"eșantioane/s; {engine.m_datagram.mean * 1e6:.1f} µs / datagramă")
+    if drain is not None:
+        print(f"PatternAI: coada golită în {drain:.2f} s după ultima datagramă, "
+              f"{engine.ai_queue.dropped} observații pierdute")
+    for sensor in engine.sensors:
+        if not sensor.count:
+            continue
+        seq = sensor.sequence
+        loss = f" loss={seq.loss_ratio:.1%} reord={seq.reordered}" if seq.received else ""
+        pred = f" pred={sensor.ai_pred:.1f}" if sensor.ai_pred is not None else ""
+        print(f"  {sensor.id}: n={sensor.count} avg={sensor.avg:.1f} min={sensor.min:.1f} "
+              f"max={sensor.max:.1f}{pred}{loss}")
+        for span, summary in sensor.stats.summary(sensor.last_time).items():
+            print(f"      {window_label(span)}: {format_summary(summary)}")
+    print(f"Alerte: {len(finished)}")
+    for alert in finished:
+        print(f"  {time.strftime('%d.%m %H:%M:%S', time.localtime(alert.start))} {alert.sensor_id}: "
+              f"{alert.end - alert.start:.1f} s, max {alert.peak:.1f} dB, Leq {alert.leq:.1f} dB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reluarea capturilor UDP prin lanțul de recepție")
+    parser.add_argument("paths", nargs="+", help="fișiere .dbcap (reluate în ordinea începutului capturii)")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="1 = ritmul original, N = de N ori mai repede, 0 = fără pauze (implicit)")
+    parser.add_argument("--send", default=None, metavar="HOST:PORT",
+                        help="trimite datagramele prin UDP în loc de procesarea locală")
+    parser.add_argument("--state-dir", default=None,
+                        help="directorul stărilor PatternAI (implicit unul temporar, șters la final)")
+    parser.add_argument("--no-ai", action="store_true", help="fără PatternAI (doar recepție, statistici, alerte)")
+    parser.add_argument("--no-backpressure", action="store_true",
+                        help="nu aștepta worker-ul AI - coada plină pierde observații, ca la recepția live")
+    parser.add_argument("--store", default=None, help="scrie și istoricul pe termen lung în acest director")
+    parser.add_argument("--alert-log", default=None, help="jurnalul alertelor (implicit niciunul)")
+    args = parser.parse_args(argv)
+
+    readers = sorted((CaptureReader(p) for p in expand(args.paths)), key=lambda r: r.start)
+    if not readers:
+        parser.error("nicio captură găsită")
+    if args.send:
+        send(readers, args.send, args.speed)
+        return
+
+    temp = None
+    state_dir = args.state_dir
+    if state_dir is None and not args.no_ai:
+        temp = tempfile.TemporaryDirectory(prefix="replay_ai_")
+        state_dir = temp.name
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+
+    store = None
+    if args.store:
+        from timeseries import TimeSeriesStore
+        store = TimeSeriesStore(args.store)
+    sensors = make_registry(settings.PLOT_CAPACITY, window=settings.PLOT_WINDOW, backend=settings.AI_BACKEND,
+                            profile=settings.AI_PROFILE, forecast_horizon=settings.AI_FORECAST_HORIZON,
+                            checkpoint=settings.AI_CHECKPOINT, state_dir=state_dir)
+    alerts = AlertEngine(settings.ALERT_THRESHOLD, settings.ALERT_HYSTERESIS, settings.ALERT_MIN_DURATION,
+                         settings.ALERT_COOLDOWN, log_path=args.alert_log)
+    engine = IngestEngine(settings.UDP_IP, 0, sensors, alerts=alerts, ai_queue_size=settings.AI_QUEUE_SIZE,
+                          ai_queue_policy=settings.AI_QUEUE_POLICY, ai_batch=settings.AI_BATCH,
+                          cpu_budget=settings.CPU_BUDGET, store=store)
+
+    # Alertele incheiate, cu timpii din captura
+    finished = []
+    engine.subscribe(lambda event: finished.append(event[2]) if event[0] == "alert_end" else None)
+
+    engine.start_offline(readers[0].start, ai=not args.no_ai)
+    start = time.perf_counter()
+    try:
+        replay(engine, paced(records(readers), args.speed, readers[0].start), backpressure=not args.no_backpressure)
+    except KeyboardInterrupt:
+        print("Reluare întreruptă")
+    seconds = time.perf_counter() - start
+    drain = None
+    if not args.no_ai:
+        drain_start = time.perf_counter()
+        engine.drain_ai()
+        drain = time.perf_counter() - drain_start
+    report(engine, finished, seconds, drain)
+
+    if args.state_dir:
+        engine.save_all()
+    engine.close_store()
+    alerts.close()
+    if temp is not None:
+        for sensor in engine.sensors:
+            if sensor.ai is not None:
+                sensor.ai.close()
+        temp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
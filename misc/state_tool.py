@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# Migrare și unificare a stărilor PatternAI (states*/, patternai_state*.pkl)
+#
+#   python misc/state_tool.py info states*/*.pkl
+#   python misc/state_tool.py convert states_v2_2/*.pkl --out-dir states_npz
+#   python misc/state_tool.py merge states*/*.pkl -o patternai_state.npz --model-from states_v2_2/patternai_state_251225.pkl
+#
+# Formatul nou (.npz): istoricul ca array structurat (zi u1, oră f4, dB f4) + modelul serializat separat -
+# se încarcă dintr-o singură citire. PatternAI acceptă direct fișierul .npz ca save_path; la prima pornire
+# istoricul din el se mută în jurnalul .obs.
+
+import argparse
+import glob
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+# Modulele aplicației se află în directorul părinte
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from observation_log import ObservationLog, RECORD_DTYPE
+from state_file import CorruptStateError, read_state, write_state, salvage_history
+
+
+def load_any(path):
+    """Încarcă orice format de stare. Returnează (stare, notă); istoricul lipsă devine un array gol.
+
+    Pickle-urile trunchiate (scriere întreruptă) nu se pot încărca - din ele se recuperează doar istoricul.
+    """
+    note = ""
+    try:
+        state = read_state(path)
+    except (CorruptStateError, EOFError, pickle.UnpicklingError) as e:
+        state = {"backend": None, "model": None, "scaler": None, "initialized": False,
+                 "history": salvage_history(path)}
+        note = f"trunchiat ({e}), istoric recuperat"
+    # Checkpoint în formatul curent - istoricul stă în jurnalul .obs alăturat
+    obs = os.path.splitext(path)[0] + ".obs"
+    if state["history"] is None and os.path.exists(obs):
+        log = ObservationLog(obs)
+        state["history"] = np.array(log.records())
+        log.close()
+        note = note or "istoric din " + os.path.basename(obs)
+    if state["history"] is None:
+        state["history"] = np.empty(0, dtype=RECORD_DTYPE)
+    return state, note
+
+
+def backend_model(state):
+    """(nume backend, model) - modelele din formatele vechi se împachetează în backend-ul echivalent."""
+    model = state["model"]
+    if model is None:
+        return None, None
+    if state["backend"] is None:
+        from ai_backends import wrap_legacy_model
+        model = wrap_legacy_model(state)
+        return model.name, model
+    return state["backend"], model
+
+
+def describe_format(state):
+    if state["backend"] is not None:
+        return state["backend"]
+    if state["scaler"] is not None:
+        return "vechi (scaler + SGD)"
+    if state["model"] is not None:
+        return f"vechi ({type(state['model']).__name__})"
+    return "doar istoric"
+
+
+def dedupe(histories, mode="prefix"):
+    """Elimină istoricele duplicate.
+
+    prefix - un istoric care este începutul altuia (instantanee succesive ale aceleiași rulări) se elimină
+    rows   - în plus, rândurile identice se păstrează o singură dată (atenție: rândurile nu au timestamp
+             absolut, deci două măsurători egale din același minut devin una)
+    none   - simpla concatenare
+    """
+    histories = [h for h in histories if len(h)]
+    if mode != "none":
+        kept = []
+        for h in sorted(histories, key=len, reverse=True):
+            raw = h.tobytes()
+            if not any(k.tobytes().startswith(raw) for k in kept):
+                kept.append(h)
+        # Ordinea inițială a fișierelor
+        histories = [h for h in histories if any(h is k for k in kept)]
+    merged = np.concatenate(histories) if histories else np.empty(0, dtype=RECORD_DTYPE)
+    if mode == "rows" and len(merged):
+        _, first = np.unique(merged.view(np.dtype((np.void, RECORD_DTYPE.itemsize))), return_index=True)
+        merged = merged[np.sort(first)]
+    return merged
+
+
+def expand(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(m for m in matches if os.path.isfile(m))
+    return paths
+
+
+def cmd_info(args):
+    for path in expand(args.paths):
+        start = time.perf_counter()
+        try:
+            state, note = load_any(path)
+        except Exception as e:
+            print(f"{path}: eroare - {e}")
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{path}: {describe_format(state)}, {len(state['history'])} observații, "
+              f"{os.path.getsize(path) / 1024:.0f} KB, încărcat în {elapsed:.0f} ms"
+              + (f" - {note}" if note else ""))
+
+
+def cmd_convert(args):
+    for path in expand(args.paths):
+        state, note = load_any(path)
+        backend, model = (None, None) if args.no_model else backend_model(state)
+        out_dir = args.out_dir or os.path.dirname(path)
+        os.makedirs(out_dir or ".", exist_ok=True)
+        out = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".npz")
+        write_state(out, backend, model, state["initialized"] and model is not None, state["history"],
+                    compress=True)
+        print(f"{path} -> {out}: {len(state['history'])} observații, "
+              f"{os.path.getsize(path) / 1024:.0f} KB -> {os.path.getsize(out) / 1024:.0f} KB"
+              + (f" ({note})" if note else ""))
+
+
+def cmd_merge(args):
+    paths = expand(args.paths)
+    states = []
+    for path in paths:
+        state, note = load_any(path)
+        states.append(state)
+        print(f"  {path}: {len(state['history'])} observații" + (f" ({note})" if note else ""))
+    merged = dedupe([s["history"] for s in states], args.dedupe)
+    total = sum(len(s["history"]) for s in states)
+
+    # Modelul se păstrează doar la cerere - antrenat pe alt istoric decât cel unificat
+    backend, model, initialized = None, None, False
+    if args.model_from:
+        state, _ = load_any(args.model_from)
+        backend, model = backend_model(state)
+        initialized = state["initialized"] and model is not None
+    write_state(args.output, backend, model, initialized, merged, compress=True)
+    print(f"{len(paths)} fișiere, {total} observații -> {len(merged)} după deduplicare ({args.dedupe}), "
+          f"salvat în {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrare / unificare stări PatternAI")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("info", help="format, număr de observații și timp de încărcare")
+    p.add_argument("paths", nargs="+")
+    p.set_defaults(func=cmd_info)
+
+    p = sub.add_parser("convert", help="convertește fiecare fișier în .npz")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--out-dir", default=None, help="directorul rezultatelor (implicit lângă sursă)")
+    p.add_argument("--no-model", action="store_true", help="doar istoricul (modelul se reantrenează la pornire)")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("merge", help="unifică istoricele într-un singur .npz")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--dedupe", choices=("prefix", "rows", "none"), default="prefix")
+    p.add_argument("--model-from", default=None, help="fișierul din care se preia modelul (implicit niciunul)")
+    p.set_defaults(func=cmd_merge)
+
+    args = parser.parse_args(argv)
+    if args.command == "merge" and not args.output.lower().endswith(".npz"):
+        parser.error("fișierul rezultat trebuie să aibă extensia .npz")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,26 @@ import tempfile
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk  # <-- Add this import
-from datetime import datetime, timedelta
+from datetime import datetime
 import soundfile as sf
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pickle
 import threading
 import concurrent.futures
 import tkinter.simpledialog
+import argparse
+import glob
+import json
 
 from sklearn.linear_model import SGDRegressor
 from sklearn.preprocessing import StandardScaler
 
+# Modulele aplicației se află în directorul părinte
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from observation_log import week_hours
+
 # ---- Clasa PatternAI (combinată) ----
 class PatternAI:
     def __init__(self, save_path="patternai_state.pkl"):
@@ -42,6 +51,27 @@ class PatternAI:
             self.model.partial_fit(Xs_new, [value])
         self._save_state()
 
+    def add_observations_bulk(self, timestamps, values, save=True):
+        """Adaugă un lot de observații: conversie vectorizată timestamp -> (zi, oră),
+        un singur partial_fit pe tot lotul și (opțional) o singură salvare."""
+        y = np.asarray(values, dtype=np.float64).ravel()
+        if not len(y):
+            return
+        week_days, hours = week_hours(timestamps)
+        X_new = np.column_stack([week_days, hours]).astype(np.float64)
+        self.history.extend(zip(week_days.tolist(), hours.tolist(), y.tolist()))
+        # Primul batch - scaler-ul se potrivește pe tot istoricul disponibil
+        if not self.initialized and len(self.history) >= 100:
+            X = np.array([[d, h] for d,h,_ in self.history])
+            Xs = self.scaler.fit_transform(X)
+            self.model.partial_fit(Xs, np.array([v for _,_,v in self.history]))
+            self.initialized = True
+        # Învățare online
+        elif self.initialized:
+            self.model.partial_fit(self.scaler.transform(X_new), y)
+        if save:
+            self._save_state()
+
     def predict_current_pattern(self):
         if not self.initialized:
             return None
@@ -90,40 +120,84 @@ def ffprobe_start_time(video_path):
     # uneori apare în secunde zecimale
     return datetime.fromtimestamp(float(out))
 
-def extract_audio_tracks(video_path, out_dir):
-    """Extrage fiecare pistă audio într-un WAV separat; returnează lista de căi."""
-    # află numărul de piste cu ffprobe
+def probe_video(video_path):
+    """Un singur apel ffprobe: returnează (start_time, număr de piste audio)."""
     cmd = [
         "ffprobe", "-v", "error",
         "-select_streams", "a",
-        "-show_entries", "stream=index",
-        "-of", "csv=p=0",
+        "-show_entries", "format=start_time:stream=index",
+        "-of", "json",
         video_path
     ]
-    streams = subprocess.check_output(cmd).decode().strip().splitlines()
-    paths = []
-    for idx, s in enumerate(streams):
-        out = os.path.join(out_dir, f"track_{idx}.wav")
-        subprocess.check_call([
-            "ffmpeg", "-y", "-i", video_path,
-            "-map", f"0:a:{idx}", out
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        paths.append(out)
-    return paths
-
-def compute_db_levels(wav_path, interval_ms=100):
-    """Împarte WAV în ferestre și returnează lista de dB pozitivi (0=silence, max~40-60)."""
-    data, sr = sf.read(wav_path)
-    hop = int(sr * interval_ms / 1000)
-    dbs = []
-    for i in range(0, len(data), hop):
-        seg = data[i:i+hop]
-        if seg.size == 0: break
-        rms = np.sqrt(np.mean(seg**2))
-        # Invert the sign so silence is 0, loud is positive
-        db = -20 * np.log10(rms + 1e-12)
-        dbs.append(db)
-    return dbs
+    info = json.loads(subprocess.check_output(cmd).decode())
+    start = datetime.fromtimestamp(float(info.get("format", {}).get("start_time", 0)))
+    return start, len(info.get("streams", []))
+
+def extract_audio_track(video_path, track_index, out_path):
+    """Extrage o singură pistă audio într-un WAV (fluxul video nu este decodat)."""
+    subprocess.check_call([
+        "ffmpeg", "-y", "-i", video_path,
+        "-map", f"0:a:{track_index}", "-vn", out_path
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return out_path
+
+def extract_audio_tracks(video_path, out_dir, num_tracks=None):
+    """Extrage fiecare pistă audio într-un WAV separat; returnează lista de căi."""
+    # află numărul de piste cu ffprobe (dacă nu este deja cunoscut)
+    if num_tracks is None:
+        _, num_tracks = probe_video(video_path)
+    return [extract_audio_track(video_path, idx, os.path.join(out_dir, f"track_{idx}.wav"))
+            for idx in range(num_tracks)]
+
+def _window_energy(buf, win, hop, n, per_channel):
+    """Energia medie (media pătratelor) pentru n ferestre consecutive din buf (cadre x canale)."""
+    if hop == win:
+        # Ferestre adiacente - simplu reshape, fără copiere
+        frames = buf[:n * win].reshape(n, win, buf.shape[1])
+        energy = np.einsum('iwc,iwc->ic', frames, frames) / win
+    else:
+        # Ferestre suprapuse / cu pauze - vedere strided (n, canale, win)
+        frames = sliding_window_view(buf, win, axis=0)[::hop][:n]
+        energy = np.einsum('icw,icw->ic', frames, frames) / win
+    return energy if per_channel else energy.mean(axis=1)
+
+def compute_db_levels(wav_path, interval_ms=100, hop_ms=None, per_channel=False, block_windows=512):
+    """Împarte WAV în ferestre și returnează array-ul de dB pozitivi (0=silence, max~40-60).
+
+    Fișierul este citit în blocuri (memorie constantă); toate ferestrele unui bloc se calculează
+    vectorizat. hop_ms (implicit = interval_ms) permite ferestre suprapuse. Pentru piste
+    multicanal se returnează nivelul energiei combinate sau, cu per_channel=True, un array
+    (ferestre x canale).
+    """
+    with sf.SoundFile(wav_path) as f:
+        sr = f.samplerate
+        win = max(int(sr * interval_ms / 1000), 1)
+        hop = max(int(sr * (hop_ms or interval_ms) / 1000), 1)
+        # WAV-urile extrase de ffmpeg sunt PCM 16 biți - citirea nativă int16 este mult mai rapidă
+        dtype, scale = ('int16', 1 / 32768) if f.subtype == 'PCM_16' else ('float32', 1.0)
+        chunks = []
+        carry = None
+        for block in f.blocks(blocksize=hop * block_windows, dtype=dtype, always_2d=True):
+            block = block.astype(np.float64)
+            buf = block if carry is None or not len(carry) else np.concatenate([carry, block])
+            n = (len(buf) - win) // hop + 1 if len(buf) >= win else 0
+            if n > 0:
+                chunks.append(_window_energy(buf, win, hop, n, per_channel))
+            # Eșantioanele necesare ferestrelor următoare trec în blocul următor
+            carry = buf[n * hop:]
+
+    # Ferestrele incomplete de la final (ca în varianta inițială, ultima fereastră poate fi mai scurtă)
+    if carry is not None:
+        for i in range(0, len(carry), hop):
+            seg = carry[i:i + win]
+            energy = np.mean(np.square(seg), axis=0)
+            chunks.append((energy if per_channel else energy.mean())[np.newaxis])
+
+    if not chunks:
+        return np.empty((0, 1) if per_channel else 0)
+    rms = np.sqrt(np.concatenate(chunks)) * scale
+    # Invert the sign so silence is 0, loud is positive
+    return -20 * np.log10(rms + 1e-12)
 
 # ---- GUI minimal pentru selecție și procesare ----
 
@@ -151,11 +225,9 @@ class TrainerApp(tk.Tk):
         if not vp:
             return
 
-        # Detect number of tracks
+        # Detect number of tracks - doar ffprobe, fără extragere
         try:
-            with tempfile.TemporaryDirectory() as tmp:
-                tracks = extract_audio_tracks(vp, tmp)
-                num_tracks = len(tracks)
+            _, num_tracks = probe_video(vp)
         except Exception as e:
             self.log_msg(f"Eroare la detectarea pistelor audio: {e}")
             return
@@ -186,34 +258,115 @@ class TrainerApp(tk.Tk):
             return
 
         with tempfile.TemporaryDirectory() as tmp:
+            # Only process the selected track - se extrage doar pista aleasă
             try:
-                tracks = extract_audio_tracks(video_path, tmp)
+                track = extract_audio_track(video_path, track_index, os.path.join(tmp, f"track_{track_index}.wav"))
             except Exception as e:
                 self.log_msg(f"Eroare ffmpeg: {e}")
                 return
 
-            # Only process the selected track
-            if track_index < 0 or track_index >= len(tracks):
-                self.log_msg(f"Track index {track_index} invalid. Număr de piste: {len(tracks)}")
-                return
-
-            track = tracks[track_index]
             self.log_msg(f"Procesare pistă: {os.path.basename(track)}")
             dbs = compute_db_levels(track)
             total_dbs = len(dbs)
             self.after(0, lambda: self.progress.config(maximum=total_dbs, value=0))
 
-            for idx, db in enumerate(dbs):
-                ts = start_dt + timedelta(milliseconds=(idx)*100)
-                wd = ts.weekday()
-                hr = ts.hour + ts.minute/60 + ts.second/3600
-                self.ai.add_observation(wd, hr, db)
-                self.after(0, lambda v=idx+1: self.progress.config(value=v))
+            # Timestamp-uri pentru toate ferestrele de 100 ms, calculate vectorizat
+            stamps = np.datetime64(start_dt, 'ms') + np.arange(total_dbs) * np.timedelta64(100, 'ms')
+            # Loturi mari - progresul se actualizează de cel mult ~100 de ori, salvarea o singură dată
+            chunk = max(total_dbs // 100, 1000)
+            for i in range(0, total_dbs, chunk):
+                self.ai.add_observations_bulk(stamps[i:i+chunk], dbs[i:i+chunk], save=False)
+                self.after(0, lambda v=min(i+chunk, total_dbs): self.progress.config(value=v))
             self.log_msg(f"Observații adăugate: {total_dbs}")
             self.after(0, lambda: messagebox.showinfo("Gata", f"{total_dbs} observații adăugate în PatternAI."))
             self.after(0, lambda: self.progress.config(value=0))
         self.ai._save_state()
 
+# ---- Procesare în lot (fără GUI) ----
+
+VIDEO_EXTS = (".mp4", ".mkv", ".mov", ".avi", ".m4v")
+
+def find_recordings(patterns):
+    """Directoare (recursiv, după extensie) sau glob-uri -> listă sortată de fișiere."""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.update(os.path.join(root, n) for n in names if n.lower().endswith(VIDEO_EXTS))
+        else:
+            files.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+    return sorted(files)
+
+def analyse_track(video_path, track_index, interval_ms=100):
+    """Rulează într-un proces separat: extrage o pistă și returnează nivelurile dB (float32)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = extract_audio_track(video_path, track_index, os.path.join(tmp, "track.wav"))
+        return compute_db_levels(wav, interval_ms=interval_ms).astype(np.float32)
+
+def run_batch(patterns, state_path="patternai_state.pkl", tracks=None, workers=None, interval_ms=100):
+    videos = find_recordings(patterns)
+    if not videos:
+        print("Nu s-au găsit înregistrări.")
+        return 0
+
+    # Un singur ffprobe per fișier: ora de start + numărul de piste
+    jobs = []
+    for vp in videos:
+        try:
+            start_dt, num_tracks = probe_video(vp)
+        except Exception as e:
+            print(f"Eroare ffprobe {vp}: {e}")
+            continue
+        for idx in range(num_tracks):
+            if tracks is None or idx in tracks:
+                jobs.append((vp, idx, start_dt))
+    print(f"{len(videos)} fișiere, {len(jobs)} piste de procesat")
+
+    # Extragere + analiză în paralel; rezultatele se adună în memorie
+    stamps, values = [], []
+    step = np.timedelta64(interval_ms, 'ms')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyse_track, vp, idx, interval_ms): (vp, idx, start_dt)
+                   for vp, idx, start_dt in jobs}
+        for done, fut in enumerate(concurrent.futures.as_completed(futures), 1):
+            vp, idx, start_dt = futures[fut]
+            try:
+                dbs = fut.result()
+            except Exception as e:
+                print(f"[{done}/{len(jobs)}] Eroare {os.path.basename(vp)} pista {idx}: {e}")
+                continue
+            stamps.append(np.datetime64(start_dt, 'ms') + np.arange(len(dbs)) * step)
+            values.append(dbs)
+            print(f"[{done}/{len(jobs)}] {os.path.basename(vp)} pista {idx}: {len(dbs)} observații")
+
+    if not values:
+        return 0
+    # Toate observațiile intră în PatternAI într-un singur lot, cu o singură scriere
+    stamps = np.concatenate(stamps)
+    values = np.concatenate(values)
+    order = np.argsort(stamps, kind="stable")
+    ai = PatternAI(save_path=state_path)
+    ai.add_observations_bulk(stamps[order], values[order], save=False)
+    ai._save_state()
+    print(f"{len(values)} observații adăugate în {state_path}")
+    return len(values)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Video → PatternAI Trainer")
+    parser.add_argument("--batch", nargs="+", metavar="DIR_SAU_GLOB",
+                        help="procesează fără GUI toate înregistrările din directoare / glob-uri")
+    parser.add_argument("--state", default="patternai_state.pkl", help="fișierul de stare PatternAI")
+    parser.add_argument("--tracks", help="indecșii pistelor de procesat, ex. 0,2 (implicit toate)")
+    parser.add_argument("--workers", type=int, default=None, help="număr de procese (implicit nr. de nuclee)")
+    parser.add_argument("--interval-ms", type=int, default=100, help="lungimea ferestrei dB")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        tracks = {int(t) for t in args.tracks.split(",")} if args.tracks else None
+        run_batch(args.batch, args.state, tracks, args.workers, args.interval_ms)
+    else:
+        app = TrainerApp()
+        app.mainloop()
+
 if __name__ == "__main__":
-    app = TrainerApp()
-    app.mainloop()
+    main()
@@ -0,0 +1,141 @@
+# Librarii
+
+# Acces concurent (worker AI + thread reantrenare)
+import threading
+
+# Conversie timestamp -> ora locala
+import datetime
+
+# Header fisier
+import struct
+
+import os
+
+# Citire prin memory-map
+import numpy as np
+
+
+# Format inregistrare: ziua (uint8), ora fractionara (float32), nivel dB (float32)
+# Inregistrari de latime fixa, fara padding => 9 octeti / observatie
+RECORD_DTYPE = np.dtype([("weekday", "<u1"), ("hour", "<f4"), ("value", "<f4")])
+_RECORD = struct.Struct("<Bff")
+
+# Header: magic + versiune format + dimensiune inregistrare
+_MAGIC = b"PAIL"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+HEADER_SIZE = _HEADER.size
+
+
+def week_hours(timestamps):
+    """Converteste timestamp-uri in (weekday, ora fractionara) locale, vectorizat.
+
+    Accepta datetime / numpy.datetime64 (ora locala, fara fus orar) sau secunde Unix.
+    """
+    ts = np.asarray(timestamps)
+    if ts.dtype.kind in "iuf":
+        secs = ts.astype(np.float64)
+        # Offset-ul fusului orar se calculeaza o singura data per ora distincta (corect si la schimbarea DST)
+        epoch_hours = np.floor(secs / 3600).astype(np.int64)
+        uniq, inverse = np.unique(epoch_hours, return_inverse=True)
+        offsets = np.array([datetime.datetime.fromtimestamp(int(h) * 3600).astimezone().utcoffset().total_seconds()
+                            for h in uniq])
+        local = secs + offsets[inverse.ravel()]
+    else:
+        local = ts.astype("datetime64[us]").astype(np.int64) / 1e6
+    days = np.floor(local / 86400).astype(np.int64)
+    # 1 ianuarie 1970 a fost joi (weekday 3)
+    week_days = ((days + 3) % 7).astype(np.uint8)
+    hours = (local - days * 86400) / 3600
+    return week_days, hours
+
+
+def local_to_unix(timestamps):
+    """datetime / numpy.datetime64 fara fus orar (ora locala) -> secunde Unix, vectorizat."""
+    local = np.asarray(timestamps).astype("datetime64[us]").astype(np.int64) / 1e6
+    # Ca in week_hours: offset-ul se calculeaza o singura data per ora locala distincta
+    local_hours = np.floor(local / 3600).astype(np.int64)
+    uniq, inverse = np.unique(local_hours, return_inverse=True)
+    epoch = datetime.datetime(1970, 1, 1)
+    offsets = np.array([(epoch + datetime.timedelta(hours=int(h))).timestamp() - int(h) * 3600 for h in uniq],
+                       dtype=np.float64)
+    return local + offsets[inverse.ravel()]
+
+
+class ObservationLog:
+    """Jurnal binar append-only de observatii (weekday, hour, dB), citit prin numpy.memmap."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mm = None
+        self._mm_count = 0
+        self._open()
+
+    def _open(self):
+        # Fisier nou - se scrie header-ul
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER_SIZE:
+            with open(self.path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, RECORD_DTYPE.itemsize))
+        else:
+            with open(self.path, "rb") as f:
+                magic, version, size = _HEADER.unpack(f.read(HEADER_SIZE))
+            if magic != _MAGIC or version != _VERSION or size != RECORD_DTYPE.itemsize:
+                raise ValueError(f"{self.path} nu este un jurnal de observatii valid")
+
+        self._file = open(self.path, "r+b")
+        # O scriere intrerupta poate lasa o inregistrare incompleta la final - se trunchiaza
+        body = os.path.getsize(self.path) - HEADER_SIZE
+        self._count = body // RECORD_DTYPE.itemsize
+        end = HEADER_SIZE + self._count * RECORD_DTYPE.itemsize
+        if end != HEADER_SIZE + body:
+            self._file.truncate(end)
+        self._file.seek(end)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, week_day, hour, value):
+        # Cost O(1): o singura inregistrare de 9 octeti la finalul fisierului
+        with self._lock:
+            self._file.write(_RECORD.pack(week_day, hour, value))
+            self._count += 1
+
+    def extend(self, week_days, hours, values):
+        records = np.empty(len(values), dtype=RECORD_DTYPE)
+        records["weekday"] = week_days
+        records["hour"] = hours
+        records["value"] = values
+        with self._lock:
+            self._file.write(records.tobytes())
+            self._count += len(records)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def records(self):
+        """Returneaza o vedere memmap (read-only) peste toate inregistrarile scrise."""
+        with self._lock:
+            self._file.flush()
+            if self._count == 0:
+                return np.empty(0, dtype=RECORD_DTYPE)
+            # Se remapeaza doar daca s-au adaugat inregistrari de la ultima citire
+            if self._mm is None or self._mm_count != self._count:
+                self._mm = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r",
+                                     offset=HEADER_SIZE, shape=(self._count,))
+                self._mm_count = self._count
+            return self._mm
+
+    def arrays(self):
+        """Returneaza (X, y) pregatite pentru antrenare: X = [[weekday, hour]], y = dB."""
+        rec = self.records()
+        X = np.empty((len(rec), 2), dtype=np.float64)
+        X[:, 0] = rec["weekday"]
+        X[:, 1] = rec["hour"]
+        return X, np.asarray(rec["value"], dtype=np.float64)
+
+    def close(self):
+        with self._lock:
+            self._mm = None
+            self._file.close()
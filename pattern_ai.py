@@ -1,85 +1,391 @@
 # Librarii
 
 # Ziua si ora colectarii esantionului
+import copy
 import datetime
 import threading
+import time
 
 # Array-uri
 import numpy as np
 
-# Serializare si deserializare
-import pickle
-
 # Path model antrenat
 import os
+import shutil
+
+# Modele predictie (forest / bins / sgd)
+from ai_backends import TrainingProfile, make_backend, profile_options, subsample, wrap_legacy_model
+
+# Istoric observatii - jurnal binar append-only
+from observation_log import ObservationLog, local_to_unix, week_hours
+
+# Prognoza pe orizont: caracteristici ciclice + semnalul recent, peste grila sezoniera
+from forecast import Forecaster, MinuteSignal, WEEK_MINUTES, minute_of_week, minute_series
+
+# Checkpoint model: pickle (vechi / curent) sau .npz, scris atomic pe thread-ul de checkpoint
+from state_file import CORRUPT_ERRORS, read_state, write_state
+from checkpoint import CHECKPOINTS, generation_path, generations, prune
 
-from sklearn.ensemble import RandomForestRegressor
+# Durata reantrenarilor / salvarilor
+from metrics import REGISTRY
 
 
 
 class PatternAI:
-    def __init__(self, save_path=None):
+    # backend: "forest" (RandomForest, reantrenat complet conform politicii de mai jos),
+    #          "bins" sau "sgd" (incrementale, O(1) per esantion)
+    # refit_every / refit_interval: reantrenare completa (sau doar checkpoint, pentru backend-urile
+    #          incrementale) la fiecare N esantioane noi sau la fiecare T secunde, care vine prima
+    # grid_minutes: rezolutia grilei de predictii (zi x minut), recalculata dupa fiecare reantrenare
+    # forecast_horizon: minutele prognozate de forecast() (0 = fara prognoza, doar grila sezoniera)
+    # checkpoint_interval / checkpoint_every: salvare in fundal cel mult la T secunde sau N esantioane noi
+    #          (si dupa fiecare reantrenare completa); keep_generations: generatii zilnice pastrate
+    #          (0 = fara generatii) in generation_dir (implicit checkpoints/ langa save_path)
+    # profile: TrainingProfile - parametrii modelului (forest / hgb) si plafonul istoricului la reantrenare
+    # refit_scale / governor_options: ajustate din afara (guvernatorul CPU) - rarirea reantrenarilor si
+    #          limitele aplicate peste profil la urmatoarea reantrenare completa
+    def __init__(self, save_path=None, backend="forest", refit_every=5000, refit_interval=30*60,
+                 grid_minutes=1, profile=None, forecast_horizon=60, checkpoint_interval=5*60,
+                 checkpoint_every=50000, keep_generations=7, generation_dir=None):
+        if (24 * 60) % grid_minutes:
+            raise ValueError("grid_minutes trebuie sa divida 1440")
         self._retrain_lock = threading.Lock()
+        # O singura reantrenare odata - reantrenarea sincrona (add_observations_bulk cu refit=True) asteapta
+        # una pornita in fundal; _retrain_lock ramane doar pentru inlocuirea modelului / predictii
+        self._fit_lock = threading.Lock()
         self._retrain_thread = None
+        self.refit_every = refit_every
+        self.refit_interval = refit_interval
+        self.refit_scale = 1.0
+        self.profile = profile if profile is not None else TrainingProfile()
+        self.backend_options = profile_options(backend, self.profile)
+        self.governor_options = {}
+        # Ultima reantrenare: observatii folosite si marimea checkpoint-ului (octeti)
+        self.train_samples = 0
+        self.model_bytes = 0
+        self._since_refit = 0
+        self._last_refit = time.monotonic()
+        self.grid_minutes = grid_minutes
+        self.grid = None
+        self.grid_version = 0
+        # Mediile pe minut ale fluxului live si modelul abaterii fata de grila (antrenat la reantrenare)
+        self.signal = MinuteSignal()
+        self.forecast_horizon = forecast_horizon
+        self.forecaster = None
+        self.forecast_version = 0
+        self._forecast_cache = None
         if save_path is None:
             save_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patternai_state.pkl")
+        # save_path pastreaza doar checkpoint-ul modelului (.pkl sau .npz); istoricul sta in jurnalul .obs alaturat
         self.save_path = save_path
-        self.history = []
-        self.model = RandomForestRegressor(n_estimators=100)
+        self.log_path = os.path.splitext(save_path)[0] + ".obs"
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_every = checkpoint_every
+        self.keep_generations = keep_generations
+        self.generation_dir = generation_dir
+        self.checkpoint_requested = False
+        self._since_save = 0
+        self._last_save = time.monotonic()
+        self._saved_model = None
+        self.history = ObservationLog(self.log_path)
+        self.backend = backend
+        self.model = make_backend(backend, **self.backend_options)
         self.initialized = False
+        self.m_retrain = REGISTRY.histogram("decibel_ai_retrain_seconds", "Durata reantrenarii PatternAI",
+                                            backend=backend)
+        self.m_save = REGISTRY.histogram("decibel_ai_save_seconds", "Durata salvarii starii PatternAI",
+                                         backend=backend)
         self._load_state()
+        CHECKPOINTS.register(self)
 
     def add_observation(self, value: float):
         now = datetime.datetime.now()
         week_day = now.weekday()
         hour = now.hour + now.minute/60
-        self.history.append((week_day, hour, value))
-        # Start retraining in background if enough data and not already running
-        if len(self.history) >= 50:
+        # Se salveaza progresul - o singura inregistrare adaugata la jurnal, O(1)
+        self.history.append(week_day, hour, value)
+        self._since_save += 1
+        self.signal.add(int(time.time() // 60), week_day * 24 * 60 + now.hour * 60 + now.minute, value)
+        # Backend incremental - actualizare O(1)
+        if self.model.incremental:
+            with self._retrain_lock:
+                self.model.partial_fit(np.array([[week_day, hour]]), np.array([value]))
+                ready = self.model.ready
+            # Prima data cand modelul devine utilizabil se calculeaza grila
+            if ready and not self.initialized:
+                self.initialized = True
+                self._update_grid()
+        self._since_refit += 1
+        # Start retraining in background if due and not already running
+        if self._refit_due():
+            if not self._retrain_thread or not self._retrain_thread.is_alive():
+                self._retrain_thread = threading.Thread(target=self._retrain_model, daemon=True)
+                self._retrain_thread.start()
+
+    def add_observations_bulk(self, timestamps, values, refit=True):
+        """Adauga un lot de observatii (timestamp-uri + dB) dintr-o singura data.
+
+        Cu refit=True urmeaza o singura antrenare (sau partial_fit pe tot lotul) si o singura salvare;
+        altfel se aplica politica obisnuita de reantrenare.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        week_days, hours = week_hours(timestamps)
+        self.history.extend(week_days, hours, values)
+        self._since_save += len(values)
+        self.signal.extend(_epoch_minutes(timestamps), minute_of_week(week_days, hours), values)
+        self._since_refit += len(values)
+        if self.model.incremental:
+            with self._retrain_lock:
+                self.model.partial_fit(np.column_stack([week_days, hours]), values)
+                ready = self.model.ready
+            if ready and not self.initialized:
+                self.initialized = True
+                self._update_grid()
+        if refit:
+            if len(self.history) >= 50:
+                self._retrain_model()
+            else:
+                self.checkpoint()
+        elif self._refit_due():
             if not self._retrain_thread or not self._retrain_thread.is_alive():
                 self._retrain_thread = threading.Thread(target=self._retrain_model, daemon=True)
                 self._retrain_thread.start()
-        # Se salveaza progresul
-        self._save_state()
+
+    def _refit_due(self):
+        if len(self.history) < 50:
+            return False
+        if not self.initialized and not self.model.incremental:
+            return True
+        return (self._since_refit >= self.refit_every * self.refit_scale
+                or time.monotonic() - self._last_refit >= self.refit_interval * self.refit_scale)
 
     def _retrain_model(self):
+        with self._fit_lock, self.m_retrain.time():
+            self._retrain()
+
+    def _retrain(self):
+        self._since_refit = 0
+        self._last_refit = time.monotonic()
+        if not self.model.incremental:
+            X, y = self.history.arrays()
+            total = len(y)
+            X, y = subsample(X, y, self.profile.max_samples, self.profile.sampling)
+            self.train_samples = len(y)
+            # Modelul nou se antreneaza separat si se inlocuieste la final - predictiile continua intre timp
+            model = make_backend(self.backend, **{**self.backend_options, **self.governor_options})
+            start = time.perf_counter()
+            model.fit(X, y)
+            elapsed = time.perf_counter() - start
+            with self._retrain_lock:
+                self.model = model
+                self.initialized = True
+        if self.initialized:
+            self._update_grid()
+            self._fit_forecaster()
+        if not self.model.incremental:
+            print(f"[PatternAI] Retrained {self.backend} on {self.train_samples}/{total} observations "
+                  f"in {elapsed:.1f} s")
+            # Model nou - salvat imediat (in fundal); backend-urile incrementale urmeaza limitarea de rata
+            self.checkpoint()
+
+    def predict_many(self, week_days, hours):
+        """Predictii pentru perechi (zi, ora fractionara) intr-un singur apel vectorizat."""
+        X = np.column_stack([np.asarray(week_days, dtype=np.float64).ravel(),
+                             np.asarray(hours, dtype=np.float64).ravel()])
         with self._retrain_lock:
-            X = np.array([[d, h] for d, h, _ in self.history])
-            y = np.array([v for _, _, v in self.history])
-            self.model.fit(X, y)
-            self.initialized = True
-            # Save state after retraining
-            self._save_state()
+            return self.model.predict(X)
+
+    def _update_grid(self):
+        # Grila 7 x (1440 / grid_minutes) - o singura predictie in lot, dupa fiecare reantrenare
+        slots = (24 * 60) // self.grid_minutes
+        days = np.repeat(np.arange(7), slots)
+        hours = np.tile(np.arange(slots) * self.grid_minutes / 60, 7)
+        self.grid = self.predict_many(days, hours).reshape(7, slots)
+        self.grid_version += 1
+
+    def _seasonal(self, week_minutes):
+        return self.grid.flat[np.asarray(week_minutes) // self.grid_minutes]
+
+    def _fit_forecaster(self):
+        # Antrenat pe mediile per minut ale istoricului - mult mai putine randuri decat observatiile
+        if not self.forecast_horizon or self.grid is None:
+            return
+        X, y = self.history.arrays()
+        minutes, means, breaks = minute_series(X[:, 0], X[:, 1], y)
+        forecaster = Forecaster(self.forecast_horizon)
+        if forecaster.fit(minutes, means, breaks, self._seasonal(minutes)):
+            self.forecaster = forecaster
+            self.forecast_version += 1
+
+    def forecast(self):
+        """Prognoza pentru minutul curent si urmatoarele forecast_horizon minute, dintr-un singur predict().
+
+        Returneaza (t0, valori): t0 = inceputul minutului curent (timestamp Unix), valori[k] = minutul t0 + k * 60.
+        Rezultatul ramane in cache pana la un minut nou incheiat in fluxul live, un minut nou sau un model nou.
+        Fara model de abatere (istoric prea scurt) prognoza este grila sezoniera.
+        """
+        grid = self.grid
+        if not self.initialized or grid is None or not self.forecast_horizon:
+            return None
+        epoch_minute = int(time.time() // 60)
+        key = (epoch_minute, self.grid_version, self.forecast_version, self.signal.version)
+        cache = self._forecast_cache
+        if cache is not None and cache[0] == key:
+            return cache[1]
+        offsets = np.arange(self.forecast_horizon + 1)
+        now = datetime.datetime.fromtimestamp(epoch_minute * 60)
+        targets = (now.weekday() * 24 * 60 + now.hour * 60 + now.minute + offsets) % WEEK_MINUTES
+        values = self._seasonal(targets)
+        recent = list(self.signal.minutes)
+        forecaster = self.forecaster
+        # Semnalul recent conteaza doar daca ultimul minut incheiat este in orizont
+        if forecaster is not None and recent and epoch_minute - recent[-1][0] <= self.forecast_horizon:
+            week_minutes = np.array([m[1] for m in recent])
+            residuals = np.array([m[2] for m in recent]) - self._seasonal(week_minutes)
+            h = np.minimum(epoch_minute + offsets - recent[-1][0], self.forecast_horizon)
+            values = values + forecaster.predict(targets, h, residuals)
+        result = (epoch_minute * 60.0, values)
+        self._forecast_cache = (key, result)
+        return result
 
     def predict_current_pattern(self, ahead_minutes=0):
-        if not self.initialized:
+        grid = self.grid
+        if not self.initialized or grid is None:
             return None
         now = datetime.datetime.now()
-        week_day = now.weekday()
-        hour = now.hour + now.minute/60 + ahead_minutes/60
-        X_pred = np.array([[week_day, hour]])
-        return float(self.model.predict(X_pred)[0])
-
-    def _save_state(self):
-        with open(self.save_path, "wb") as f:
-            pickle.dump({
-                "history": self.history,
-                "model": self.model,
-                "initialized": self.initialized
-            }, f)
+        # Minutul din saptamana - trecerea peste miezul noptii continua in ziua urmatoare
+        minute = (now.weekday() * 24 * 60 + now.hour * 60 + now.minute + int(ahead_minutes)) % (7 * 24 * 60)
+        return float(grid.flat[minute // self.grid_minutes])
+
+    def checkpoint(self, wait=False):
+        """Cere o salvare pe thread-ul de checkpoint; wait=True asteapta scrierea (ex. la inchidere)."""
+        CHECKPOINTS.request(self)
+        if wait:
+            CHECKPOINTS.wait()
+
+    def checkpoint_due(self, now):
+        if self.checkpoint_requested:
+            return True
+        return self._since_save > 0 and (self._since_save >= self.checkpoint_every
+                                         or now - self._last_save >= self.checkpoint_interval)
+
+    def write_checkpoint(self):
+        """Apelat de thread-ul de checkpoint: snapshot sub lock, scriere atomica in afara lui."""
+        with self.m_save.time():
+            self.checkpoint_requested = False
+            self._since_save = 0
+            self._last_save = time.monotonic()
+            self.history.flush()
+            # Modelele complete sunt inlocuite, nu modificate, la reantrenare - ajunge referinta;
+            # cele incrementale se modifica pe loc (partial_fit), deci se copiaza
+            with self._retrain_lock:
+                live = self.model
+                model = copy.deepcopy(live) if live.incremental else live
+                initialized = self.initialized
+            write_state(self.save_path, self.backend, model, initialized)
+            self.model_bytes = os.path.getsize(self.save_path)
+            if live is not self._saved_model and not live.incremental:
+                print(f"[PatternAI] Checkpoint {self.save_path}: {self.model_bytes / 1024:.0f} KB")
+            self._saved_model = live
+            self._write_generation(model, initialized)
+
+    def _write_generation(self, model, initialized):
+        # Prima salvare din fiecare zi pastreaza si o generatie completa (model + istoric)
+        if not self.keep_generations:
+            return
+        path = generation_path(self.save_path, datetime.date.today(), self.generation_dir)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_state(path, self.backend, model, initialized, np.array(self.history.records()), compress=True)
+        prune(self.save_path, self.keep_generations, self.generation_dir)
+
+    @property
+    def unsaved(self):
+        """Observatii noi sau alt model fata de ultimul checkpoint scris (sau incarcat)."""
+        return bool(self._since_save) or self.checkpoint_requested or self.model is not self._saved_model
+
+    def close(self):
+        """Salvare finala (doar daca s-a schimbat ceva) si inchiderea jurnalului."""
+        # Scrierea in curs se incheie intai - altfel modelul ei ar parea inca nesalvat
+        CHECKPOINTS.wait()
+        if self.unsaved:
+            self.checkpoint(wait=True)
+        self.history.close()
 
     def _load_state(self):
         if os.path.exists(self.save_path):
             try:
-                with open(self.save_path, "rb") as f:
-                    state = pickle.load(f)
-                    self.history = state.get("history", [])
-                    self.model = state.get("model", RandomForestRegressor(n_estimators=100))
-                    self.initialized = state.get("initialized", False)
+                self._apply_state(read_state(self.save_path))
+                self.model_bytes = os.path.getsize(self.save_path)
+                self._saved_model = self.model
                 print(f"[PatternAI] State loaded from {self.save_path}")
-            # Daca modelul nu poate fi incarcat/gasit, se incepe de la zero
-            except Exception:
-                self.history = []
-                self.model = RandomForestRegressor(n_estimators=100)
+            except CORRUPT_ERRORS as e:
+                # Checkpoint-ul deteriorat se muta deoparte (nu se suprascrie) si se incearca ultima generatie
+                self.model = make_backend(self.backend, **self.backend_options)
                 self.initialized = False
-                print(f"[PatternAI] Failed to load state from {self.save_path}, starting fresh.")
+                corrupt = self.save_path + ".corrupt"
+                os.replace(self.save_path, corrupt)
+                print(f"[PatternAI] Failed to load state from {self.save_path} ({e!r}), moved to {corrupt}")
+                self._load_generation()
+            except Exception as e:
+                # Eroare de mediu (alta versiune sklearn, memorie, cod) - fisierul nu este deteriorat: ramane pe loc,
+                # cu o copie pe care checkpoint-urile noi nu o suprascriu; modelul se reface din istoric
+                self.model = make_backend(self.backend, **self.backend_options)
+                self.initialized = False
+                kept = self.save_path + ".unloaded"
+                if not os.path.exists(kept):
+                    shutil.copy2(self.save_path, kept)
+                print(f"[PatternAI] Failed to load state from {self.save_path} ({e!r}), "
+                      f"starting fresh (copy kept in {kept})")
+        # Backend incremental fara checkpoint - se reface dintr-o singura trecere vectorizata prin istoric
+        if self.model.incremental and not self.initialized and len(self.history):
+            X, y = self.history.arrays()
+            self.model.fit(X, y)
+            self.initialized = self.model.ready
+            self._saved_model = None
+        if self.initialized:
+            self._update_grid()
+            self._fit_forecaster()
+
+    def _apply_state(self, state):
+        model = state["model"]
+        # Format vechi: modelul sklearn salvat direct
+        if state["backend"] is None and model is not None:
+            model = wrap_legacy_model(state)
+        # Checkpoint-ul altui backend nu se poate folosi - se reconstruieste din istoric
+        if model is not None and model.name == self.backend:
+            self.model = model
+            self.initialized = state["initialized"] and model.ready
+        # Format vechi / snapshot .npz: istoricul inclus in fisier se muta o singura data in jurnal
+        history = state["history"]
+        if history is not None and len(history) and len(self.history) == 0:
+            self._import_history(history)
+            self.checkpoint()
+
+    def _load_generation(self):
+        for path in generations(self.save_path, self.generation_dir):
+            try:
+                self._apply_state(read_state(path))
+            except Exception as e:
+                print(f"[PatternAI] Generation {path} unreadable ({e!r})")
+                continue
+            print(f"[PatternAI] State recovered from {path}")
+            self.checkpoint()
+            return
+        print("[PatternAI] No usable checkpoint generation, starting fresh.")
+
+    def _import_history(self, records):
+        self.history.extend(records["weekday"], records["hour"], records["value"])
+        self.history.flush()
+        print(f"[PatternAI] Migrated {len(records)} observations to {self.log_path}")
+
+
+def _epoch_minutes(timestamps):
+    """Minutul absolut (continuu) al fiecarui timestamp - secunde Unix sau datetime (ora locala)."""
+    ts = np.asarray(timestamps)
+    # Datetime-urile fara fus orar sunt ora locala - aduse la secunde Unix, ca esantioanele live
+    secs = ts.astype(np.float64) if ts.dtype.kind in "iuf" else local_to_unix(ts)
+    return np.floor(secs / 60).astype(np.int64)
@@ -5,6 +5,20 @@
 
 ////////////////////////////////////////// Macro DEBUG
 
+////////////////////////////////////////// Format pachete
+
+// Binar (v1): mai multe valori per pachet + numar de secventa + millis()
+// Comenteaza pentru formatul ASCII vechi ("%.2f" / "reset"), un pachet per valoare
+                                          #define BINARY_PROTOCOL
+
+// Identificatorul nodului - unic pentru fiecare placa din retea
+#define NODE_ID     1
+
+// Numarul de valori trimise intr-un pachet
+#define BATCH_SIZE  10
+
+////////////////////////////////////////// Format pachete
+
 
   // Librarii
 
@@ -53,6 +67,31 @@ WiFiUDP udp;
 
 char buffer[255];
 
+#ifdef BINARY_PROTOCOL
+// Header pachet binar - 18 octeti, little-endian (vezi wire_format.py)
+struct __attribute__((packed)) PacketHeader
+{
+  char      magic[2];     // "DB"
+  uint8_t   version;      // 1
+  uint8_t   flags;        // bit 0 = reset
+  uint16_t  node_id;
+  uint32_t  seq;          // creste cu 1 la fiecare pachet
+  uint32_t  millis;       // momentul primei valori din pachet
+  uint16_t  count;        // numarul de valori float32 de dupa header
+  uint16_t  interval_ms;  // distanta dintre valori
+};
+
+#define FLAG_RESET 0x01
+
+// Valorile acumulate pentru pachetul curent
+float batch[BATCH_SIZE];
+int batchCount            = 0;
+unsigned long batchStart  = 0;
+
+// Numarul de secventa al urmatorului pachet
+uint32_t seq              = 0;
+#endif
+
 
 
   // Variabile globale
@@ -70,7 +109,7 @@ int peak      = 0;
 int temp      = 0;
 
 // Timpul la care incepe perioada curenta de achizitie
-int start     = 0;
+unsigned long start = 0;
 
 // Peak senzor, in V
 float volts   = 0;
@@ -81,8 +120,12 @@ float dB      = 0;
 // Flag pentru efect-ul de blink al display-ului
 int flag      = 0;
 
-// Intervalul de achizitie
+// Intervalul de achizitie - in modul binar valorile se trimit grupate, deci intervalul poate fi mai mic
+#ifdef BINARY_PROTOCOL
+int interval  = 50;
+#else
 int interval  = 200;
+#endif
 
 
 
@@ -140,9 +183,37 @@ void setup()
   Serial.println(port);
   Serial.println("\nStarting connection to server...");
   udp.begin(port);
+
+  start = millis();
 }
 
 
+#ifdef BINARY_PROTOCOL
+// Trimite un pachet binar: header + count valori float32
+void sendPacket(uint8_t flags, const float* values, uint16_t count, uint32_t firstMillis)
+{
+  PacketHeader header;
+  header.magic[0]    = 'D';
+  header.magic[1]    = 'B';
+  header.version     = 1;
+  header.flags       = flags;
+  header.node_id     = NODE_ID;
+  header.seq         = seq++;
+  header.millis      = firstMillis;
+  header.count       = count;
+  header.interval_ms = interval;
+
+  udp.beginPacket(pcIP, port);
+  udp.write((uint8_t*)&header, sizeof(header));
+  if(count > 0)
+  {
+    udp.write((uint8_t*)values, count * sizeof(float));
+  }
+  udp.endPacket();
+}
+#endif
+
+
 void loop()
 {
   // Nou ciclu de achizitie date
@@ -150,8 +221,20 @@ void loop()
   temp = 0;
   //count = 0;
 
-  // Se inregistreaza timpul cand incepe achizitia
-  start = millis();
+  // Ferestrele de achizitie sunt consecutive (start += interval), deci valorile sunt la distanta fixa;
+  // daca bucla a ramas in urma, se reporneste de la momentul curent
+  if(millis() - start > (unsigned long)interval)
+  {
+    #ifdef BINARY_PROTOCOL
+    // Valorile din pachetul curent nu mai sunt la distanta "interval" de urmatoarele
+    if(batchCount > 0)
+    {
+      sendPacket(0, batch, batchCount, batchStart);
+      batchCount = 0;
+    }
+    #endif
+    start = millis();
+  }
 
   // Cat timp a trecut mai putin timp de la start-ul achizitiei
   // decat este definit prin "interval"
@@ -168,6 +251,8 @@ void loop()
     }
     //count++;
   }
+  unsigned long sampleStart = start;
+  start += interval;
 
   // Achizitia este gata - incepem conversia
   // Conversie semnal analog > volti > decibeli
@@ -180,6 +265,29 @@ void loop()
   Serial.println(dB);
   #endif
 
+  #ifdef BINARY_PROTOCOL
+  // Valoarea se adauga in pachetul curent; pachetul pleaca doar cand este plin
+  if(batchCount == 0)
+  {
+    batchStart = sampleStart;
+  }
+  batch[batchCount++] = dB;
+  if(batchCount < BATCH_SIZE)
+  {
+    return;
+  }
+  sendPacket(0, batch, batchCount, batchStart);
+  batchCount = 0;
+  Serial.println("Sent packet.");
+  Serial.println();
+
+  // Daca push-button-ul este apasat, reseteaza graficul din aplicatie
+  if(digitalRead(10) == HIGH)
+  {
+    sendPacket(FLAG_RESET, batch, 0, millis());
+    Serial.println("Requested reset.");
+  }
+  #else
   // Pregatire packet pentru transmitere
   int len = snprintf(buffer, sizeof(buffer), "%.2f", dB);
 
@@ -198,12 +306,13 @@ void loop()
     udp.endPacket();
     Serial.println("Requested reset.");
   }
+  #endif
 
 
   //Serial.print("  -- analog > ");   //DEBUG
   //Serial.println(peak);             //DEBUG
 
-  // Functie display
+  // Functie display - in modul binar o data per pachet, cu ultima valoare
   show(dB);
 
 
@@ -0,0 +1,223 @@
+# Librarii
+
+# Acces concurent: thread-ul de receptie scrie, GUI-ul citeste
+import threading
+
+# Array-uri
+import numpy as np
+
+
+class RingBuffer:
+    """Buffer circular preallocat pentru perechi (timp, valoare), stocat pe coloane.
+
+    Fiecare esantion este scris de doua ori (pozitia i si i + capacity), astfel incat
+    ultimele `capacity` esantioane formeaza mereu o felie contigua - view() nu copiaza nimic.
+    """
+
+    def __init__(self, capacity, window=None):
+        self.capacity = int(capacity)
+        # Fereastra de timp optionala (secunde) - esantioanele mai vechi nu mai apar in view()
+        self.window = window
+        # Rand 0 = timp, rand 1 = valoare
+        self._data = np.zeros((2, 2 * self.capacity), dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, t, value):
+        i = self._head
+        self._data[0, i] = self._data[0, i + self.capacity] = t
+        self._data[1, i] = self._data[1, i + self.capacity] = value
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def _bounds(self, windowed=True):
+        end = self._head if self._head >= self._size else self._head + self.capacity
+        start = end - self._size
+        if windowed and self.window is not None and self._size:
+            # Timpii sunt crescatori - cautare binara O(log n)
+            ts = self._data[0, start:end]
+            start += int(np.searchsorted(ts, ts[-1] - self.window, side="left"))
+        return start, end
+
+    def view(self, windowed=True):
+        """Returneaza (xs, ys) ca vederi numpy peste buffer (fara copiere); windowed=False ignora fereastra de timp."""
+        start, end = self._bounds(windowed)
+        return self._data[0, start:end], self._data[1, start:end]
+
+    def last(self):
+        if not self._size:
+            return None
+        i = (self._head - 1) % self.capacity
+        return self._data[0, i], self._data[1, i]
+
+
+class _Level:
+    """Intervale inchise ale unui nivel din piramida - coloane t_start, t_end, min, max, crescute prin dublare."""
+
+    def __init__(self, capacity=1024):
+        self._data = np.empty((4, capacity), dtype=np.float64)
+        self.n = 0
+
+    def append(self, t0, t1, lo, hi):
+        if self.n == self._data.shape[1]:
+            grown = np.empty((4, 2 * self.n), dtype=np.float64)
+            grown[:, :self.n] = self._data
+            self._data = grown
+        self._data[:, self.n] = (t0, t1, lo, hi)
+        self.n += 1
+
+    def columns(self):
+        return self._data[:, :self.n]
+
+
+class MinMaxPyramid:
+    """Istoricul complet al sesiunii ca piramida de intervale (min, max), pentru desenare la nivel de detaliu.
+
+    Baza sunt esantioanele brute din `raw` (RingBuffer - doar cele mai recente). Un interval din levels[k] acopera
+    `fanout` intervale din levels[k - 1], deci fanout^(k + 1) esantioane; levels pastreaza toata sesiunea
+    (~11 octeti / esantion pentru fanout 4). Cost amortizat O(1) per esantion.
+
+    view(x0, x1, max_points) alege nivelul cel mai fin care incape in max_points puncte pe intervalul cerut -
+    costul desenarii depinde de latimea ecranului, nu de durata sesiunii.
+
+    append / clear (thread-ul de receptie) si citirile (view, raw_start - thread-ul GUI) lucreaza sub acelasi lock;
+    citirile intorc copii, deci scrierile ulterioare nu mai modifica datele deja citite.
+    """
+
+    def __init__(self, raw, fanout=4):
+        self.raw = raw
+        self.fanout = int(fanout)
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.raw.clear()
+        self.levels = []
+        # Intervalul deschis al fiecarui nivel >= 1: [t_start, t_end, min, max, numar de elemente]
+        self._open = []
+        self.count = 0
+        self.first = None
+        # Intervalul deschis al primului nivel, in atribute separate - calea fiecarui esantion
+        self._pending = 0
+        self._t0 = 0.0
+        self._lo = float("inf")
+        self._hi = float("-inf")
+
+    def append(self, t, value):
+        with self._lock:
+            self.raw.append(t, value)
+            if self._pending == 0:
+                self._t0 = t
+                if self.count == 0:
+                    self.first = t
+            self.count += 1
+            if value < self._lo:
+                self._lo = value
+            if value > self._hi:
+                self._hi = value
+            self._pending += 1
+            if self._pending == self.fanout:
+                self._close(0, self._t0, t, self._lo, self._hi)
+                self._pending = 0
+                self._lo = float("inf")
+                self._hi = float("-inf")
+
+    def _close(self, k, t0, t1, lo, hi):
+        """Inchide un interval pe nivelul k si il adauga in intervalul deschis al nivelului k + 1."""
+        if k == len(self.levels):
+            self.levels.append(_Level())
+            self._open.append([t0, t1, lo, hi, 0])
+        self.levels[k].append(t0, t1, lo, hi)
+        bucket = self._open[k]
+        if bucket[4] == 0:
+            bucket[0], bucket[2], bucket[3] = t0, lo, hi
+        else:
+            if lo < bucket[2]:
+                bucket[2] = lo
+            if hi > bucket[3]:
+                bucket[3] = hi
+        bucket[1] = t1
+        bucket[4] += 1
+        if bucket[4] == self.fanout:
+            bucket[4] = 0
+            self._close(k + 1, bucket[0], bucket[1], bucket[2], bucket[3])
+
+    def _raw_range(self, x0, x1):
+        """Esantioanele brute din [x0, x1] plus cate un vecin de fiecare parte; None daca nu mai sunt in buffer."""
+        xs, ys = self.raw.view(windowed=False)
+        if not len(xs) or (xs[0] > x0 and len(xs) < self.count):
+            return None
+        i0 = max(int(np.searchsorted(xs, x0, side="left")) - 1, 0)
+        i1 = int(np.searchsorted(xs, x1, side="right")) + 1
+        return xs[i0:i1], ys[i0:i1]
+
+    def raw_start(self):
+        """Timpul primului esantion din fereastra live a buffer-ului brut; None daca buffer-ul este gol."""
+        with self._lock:
+            xs, _ = self.raw.view()
+            return float(xs[0]) if len(xs) else None
+
+    def view(self, x0, x1, max_points):
+        """(xs, ys) pentru intervalul [x0, x1], cel mult ~max_points puncte (copii, citite sub lock).
+
+        Intervalele devin perechi de puncte (t_start, min), (t_end, max). Pe marginea live, dupa ultimul interval
+        inchis al nivelului ales, se continua cu nivelurile mai fine si in final cu esantioanele brute.
+        """
+        with self._lock:
+            return self._view(x0, x1, max_points)
+
+    def _view(self, x0, x1, max_points):
+        raw = self._raw_range(x0, x1)
+        if raw is not None and len(raw[0]) <= max_points:
+            return raw[0].copy(), raw[1].copy()
+        # Nivelul cel mai fin cu cel mult max_points / 2 intervale in [x0, x1]
+        level = None
+        for k, lvl in enumerate(self.levels):
+            t0, t1 = lvl.columns()[:2]
+            n = int(np.searchsorted(t0, x1, side="right")) - int(np.searchsorted(t1, x0, side="left"))
+            level = k
+            if 2 * n <= max_points:
+                break
+        if level is None:
+            return (raw[0].copy(), raw[1].copy()) if raw is not None else (np.empty(0), np.empty(0))
+
+        xs, ys = [], []
+        # Sfarsitul ultimului interval folosit; None cat timp nivelurile nu au intervale in [x0, x1]
+        start = None
+        for k in range(level, -1, -1):
+            t0, t1, lo, hi = self.levels[k].columns()
+            if start is None:
+                i0 = max(int(np.searchsorted(t1, x0, side="left")) - 1, 0)
+            else:
+                i0 = int(np.searchsorted(t0, start, side="right"))
+            i1 = min(int(np.searchsorted(t0, x1, side="right")) + 1, len(t0))
+            if i1 > i0:
+                px = np.empty(2 * (i1 - i0))
+                py = np.empty(2 * (i1 - i0))
+                px[0::2], px[1::2] = t0[i0:i1], t1[i0:i1]
+                py[0::2], py[1::2] = lo[i0:i1], hi[i0:i1]
+                xs.append(px)
+                ys.append(py)
+                start = t1[i1 - 1]
+            if i1 < len(t0):
+                # Intervalul cerut se termina inaintea marginii live a nivelului - nivelurile fine nu mai adauga nimic
+                return np.concatenate(xs), np.concatenate(ys)
+        # Marginea live: esantioanele de dupa ultimul interval inchis (mai putin de fanout)
+        rx, ry = self.raw.view(windowed=False)
+        i0 = (int(np.searchsorted(rx, start, side="right")) if start is not None
+              else max(int(np.searchsorted(rx, x0, side="left")) - 1, 0))
+        xs.append(rx[i0:])
+        ys.append(ry[i0:])
+        return np.concatenate(xs), np.concatenate(ys)
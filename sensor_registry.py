@@ -0,0 +1,160 @@
+# Librarii
+
+import os
+import re
+import threading
+import time
+
+# Incarcarea in fundal a modelului primului senzor
+from concurrent.futures import Future
+
+# Buffer-e preallocate pentru plot
+from ring_buffer import RingBuffer, MinMaxPyramid
+
+# Numere de secventa si ceasul placii (format binar)
+from wire_format import SequenceTracker, DeviceClock
+
+# Leq / L10 / L50 / L90 / max pe ferestre glisante
+from window_stats import SlidingStats
+
+
+class Sensor:
+    """Starea unui nod Arduino: statistici, buffer-e plot, PatternAI si ultima predictie."""
+
+    def __init__(self, sensor_id, address, capacity, window=None):
+        self.id = sensor_id
+        self.address = address
+        # Esantioanele recente (nivelul de baza al piramidei) + toata sesiunea la nivel de detaliu
+        self.session = MinMaxPyramid(RingBuffer(capacity, window=window))
+        self.values = self.session.raw
+        self.stats = SlidingStats()
+        # Creat la prima observatie, de worker-ul AI (incarcarea starii poate dura)
+        self.ai = None
+        self.ai_pred = None
+        self.ai_pred_key = None
+        self.ai_pred_time = 0.0
+        # (t0, valori) - prognoza pe minute de la t0 (timestamp Unix), vezi PatternAI.forecast()
+        self.ai_forecast = None
+        self.packets = 0
+        self.last_seen = None
+        self.last_value = None
+        self.last_time = float('-inf')
+        self.sequence = SequenceTracker()
+        self.clock = DeviceClock()
+        self.reset()
+
+    def reset(self):
+        # Valoarea medie, minima, maxima + contor pentru medie
+        self.count = 0
+        self.avg = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.session.clear()
+        self.stats.clear()
+
+    def add(self, elapsed, value):
+        self.session.append(elapsed, value)
+        self.stats.add(elapsed, value)
+        self.count += 1
+        # Medie incrementala - fara produsul avg * count, care pierde precizie pe rulari lungi
+        self.avg += (value - self.avg) / self.count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.last_value = value
+        self.last_time = elapsed
+
+
+class SensorRegistry:
+    """Senzori indexati dupa node id (daca exista in payload) sau dupa IP-ul expeditorului."""
+
+    def __init__(self, capacity, window=None, state_dir=None, ai_factory=None):
+        self.capacity = capacity
+        self.window = window
+        if state_dir is None:
+            state_dir = os.path.dirname(os.path.abspath(__file__))
+        self.state_dir = state_dir
+        # ai_factory(save_path) -> PatternAI
+        self.ai_factory = ai_factory
+        self._sensors = {}
+        self._order = []
+        self._lock = threading.Lock()
+        # (cale stare, Future) - modelul primului senzor, incarcat inainte sa existe senzorul
+        self._preload = None
+
+    @staticmethod
+    def key_for(address, node_id=None):
+        return node_id if node_id is not None else address[0]
+
+    def get(self, address, node_id=None):
+        key = self.key_for(address, node_id)
+        sensor = self._sensors.get(key)
+        if sensor is None:
+            with self._lock:
+                sensor = self._sensors.get(key)
+                if sensor is None:
+                    sensor = Sensor(key, address, self.capacity, self.window)
+                    self._sensors[key] = sensor
+                    self._order.append(key)
+        sensor.packets += 1
+        sensor.last_seen = time.time()
+        return sensor
+
+    def __iter__(self):
+        return iter([self._sensors[k] for k in list(self._order)])
+
+    def __len__(self):
+        return len(self._order)
+
+    def ids(self):
+        return list(self._order)
+
+    def find(self, sensor_id):
+        return self._sensors.get(sensor_id)
+
+    @property
+    def primary(self):
+        return self._sensors[self._order[0]] if self._order else None
+
+    def state_path(self, sensor):
+        # Primul senzor pastreaza starea existenta (patternai_state.pkl) - compatibil cu instalarile cu un singur nod
+        if sensor is self.primary:
+            base = os.path.join(self.state_dir, "patternai_state")
+        else:
+            safe = re.sub(r"[^A-Za-z0-9_-]", "_", str(sensor.id))
+            base = os.path.join(self.state_dir, f"patternai_state_{safe}")
+        # O stare convertita cu misc/state_tool.py (.npz) are prioritate fata de pickle
+        return base + ".npz" if os.path.exists(base + ".npz") else base + ".pkl"
+
+    def preload(self):
+        """Incarca pe un thread separat modelul primului senzor (calea starii nu depinde de id).
+
+        Returneaza un Future cu PatternAI-ul (None fara ai_factory); ai_for() il preia pentru primul senzor.
+        """
+        if self.ai_factory is None:
+            return None
+        if self._preload is None:
+            base = os.path.join(self.state_dir, "patternai_state")
+            path = base + ".npz" if os.path.exists(base + ".npz") else base + ".pkl"
+            future = Future()
+
+            def load():
+                try:
+                    future.set_result(self.ai_factory(path))
+                except Exception as e:
+                    future.set_exception(e)
+            self._preload = (path, future)
+            threading.Thread(target=load, daemon=True).start()
+        return self._preload[1]
+
+    def ai_for(self, sensor):
+        if sensor.ai is None and self.ai_factory is not None:
+            path = self.state_path(sensor)
+            preload = self._preload
+            # Modelul incarcat in fundal - se asteapta finalul incarcarii in loc sa se incarce a doua oara
+            if preload is not None and preload[0] == path:
+                self._preload = None
+                if preload[1].exception() is None:
+                    sensor.ai = preload[1].result()
+            if sensor.ai is None:
+                sensor.ai = self.ai_factory(path)
+        return sensor.ai
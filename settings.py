@@ -0,0 +1,78 @@
+# Configurare comuna GUI / daemon - citita din .env
+
+import os
+from dotenv import load_dotenv
+
+# Incarca variabilele de mediu din .env
+load_dotenv()
+
+        # Configurare socket UDP
+# Aplicatia va accepta pachete de la orice IP de pe portul configurat in .env
+UDP_IP = os.getenv("UDP_IP", "0.0.0.0")
+UDP_PORT = int(os.getenv("UDP_PORT", 0))
+
+# Timeout pentru socket (secunde fara niciun pachet)
+UDP_TIMEOUT = float(os.getenv("UDP_TIMEOUT", 5))
+
+# Plot live: numar maxim de esantioane pastrate si fereastra de timp optionala (secunde, 0 = toata capacitatea)
+PLOT_CAPACITY = int(os.getenv("PLOT_CAPACITY", 18000))
+PLOT_WINDOW = float(os.getenv("PLOT_WINDOW", 0)) or None
+
+# Frecventa maxima de redesenare a plot-ului (independenta de rata pachetelor)
+RENDER_FPS = float(os.getenv("RENDER_FPS", 20))
+
+# Bugetul de CPU (%) pe care guvernatorul incearca sa-l respecte (predictii, reantrenari, FPS)
+CPU_BUDGET = float(os.getenv("CPU_BUDGET", 80))
+
+# Backend PatternAI (forest / hgb / bins / sgd)
+AI_BACKEND = os.getenv("AI_BACKEND", "forest")
+
+# Profilul de antrenare pentru forest / hgb: arbori (iteratii hgb), adancime maxima (0 = nelimitata), observatii
+# minime per frunza, thread-uri (-1 = toate nucleele, limitate de CPU_BUDGET), plafonul istoricului folosit la
+# o reantrenare (0 = tot) si alegerea observatiilor peste plafon (recent / random / stratified pe zi x ora)
+AI_PROFILE = {
+    "estimators": int(os.getenv("AI_ESTIMATORS", 100)),
+    "max_depth": int(os.getenv("AI_MAX_DEPTH", 12)) or None,
+    "min_samples_leaf": int(os.getenv("AI_MIN_SAMPLES_LEAF", 20)),
+    "n_jobs": int(os.getenv("AI_N_JOBS", -1)),
+    "max_samples": int(os.getenv("AI_MAX_TRAIN_SAMPLES", 100000)) or None,
+    "sampling": os.getenv("AI_TRAIN_SAMPLING", "stratified"),
+}
+
+# Prognoza PatternAI: minutele prognozate dupa minutul curent (0 = doar predictia sezoniera)
+AI_FORECAST_HORIZON = int(os.getenv("AI_FORECAST_HORIZON", 60))
+
+# Checkpoint PatternAI in fundal: cel mult o salvare la AI_CHECKPOINT_INTERVAL secunde sau AI_CHECKPOINT_SAMPLES
+# esantioane noi (plus dupa fiecare reantrenare), si AI_CHECKPOINT_KEEP generatii zilnice in checkpoints/
+AI_CHECKPOINT = {
+    "checkpoint_interval": float(os.getenv("AI_CHECKPOINT_INTERVAL", 300)),
+    "checkpoint_every": int(os.getenv("AI_CHECKPOINT_SAMPLES", 50000)),
+    "keep_generations": int(os.getenv("AI_CHECKPOINT_KEEP", 7)),
+}
+
+# Coada spre PatternAI: capacitate (esantioane), politica la umplere (drop-oldest / drop-newest / coalesce)
+# si numarul maxim de esantioane predate modelului intr-un lot
+AI_QUEUE_SIZE = int(os.getenv("AI_QUEUE_SIZE", 10000))
+AI_QUEUE_POLICY = os.getenv("AI_QUEUE_POLICY", "drop-oldest")
+AI_BATCH = int(os.getenv("AI_BATCH", 1000))
+
+# Interval (secunde) intre liniile de stare / metrici afisate in consola (0 = fara linia de metrici in GUI)
+LOG_INTERVAL = float(os.getenv("LOG_INTERVAL", 60))
+
+# Endpoint HTTP /metrics (format text Prometheus) - 0 = dezactivat; implicit doar pe localhost
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Istoric pe termen lung (serii de timp pe zile, cu agregari 1 s / 1 min / 1 h) - gol = dezactivat
+STORE_DIR = os.getenv("STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "timeseries"))
+
+# Captura datagramelor UDP brute pentru reluare (misc/replay.py): fisier .dbcap sau director (un fisier
+# nou per pornire) - gol = dezactivat
+UDP_CAPTURE = os.getenv("UDP_CAPTURE", "")
+
+# Alerte: prag initial (dB), histerezis (dB), durata minima si pauza intre alerte (secunde), jurnal evenimente
+ALERT_THRESHOLD = float(os.getenv("ALERT_THRESHOLD", 40))
+ALERT_HYSTERESIS = float(os.getenv("ALERT_HYSTERESIS", 3))
+ALERT_MIN_DURATION = float(os.getenv("ALERT_MIN_DURATION", 1))
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN", 5))
+ALERT_LOG = os.getenv("ALERT_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "alerts.evlog"))
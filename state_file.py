@@ -0,0 +1,151 @@
+# Citire / scriere stare PatternAI
+#
+# Formate acceptate la citire:
+#   - pickle vechi: {"history": [(zi, ora, dB), ...], "model": RandomForest | SGD, "scaler"?, "initialized"}
+#   - pickle curent: {"backend", "model", "initialized"} (istoricul sta in jurnalul .obs alaturat)
+#   - .npz: "history" (RECORD_DTYPE, optional), "model" (modelul serializat, octeti), "backend", "initialized"
+#
+# Fisierul .npz se citeste dintr-o singura trecere, fara reconstruirea a sute de mii de tupluri Python.
+
+import io
+import os
+import pickle
+import pickletools
+import zipfile
+
+import numpy as np
+
+from observation_log import RECORD_DTYPE
+
+
+def history_array(history):
+    """Lista de tupluri (zi, ora, dB) -> array structurat RECORD_DTYPE."""
+    data = np.array(history, dtype=np.float64).reshape(-1, 3)
+    records = np.empty(len(data), dtype=RECORD_DTYPE)
+    records["weekday"] = data[:, 0].astype(np.uint8)
+    records["hour"] = data[:, 1]
+    records["value"] = data[:, 2]
+    return records
+
+
+class CorruptStateError(ValueError):
+    """Fisierul nu incepe ca un checkpoint (gol, trunchiat la inceput sau alt continut)."""
+
+
+# Erori care inseamna un fisier deteriorat - celelalte (versiune sklearn, memorie, module lipsa) tin de mediu
+CORRUPT_ERRORS = (CorruptStateError, EOFError, pickle.UnpicklingError, zipfile.BadZipFile)
+
+# Inceputul fisierului: arhiva zip (.npz) sau pickle cu protocol >= 2
+_NPZ_MAGIC = b"PK\x03\x04"
+_PICKLE_MAGIC = b"\x80"
+
+
+def is_npz(path):
+    return os.path.splitext(path)[1].lower() == ".npz"
+
+
+def _check_header(path, npz):
+    with open(path, "rb") as f:
+        head = f.read(len(_NPZ_MAGIC))
+    if not head.startswith(_NPZ_MAGIC if npz else _PICKLE_MAGIC):
+        raise CorruptStateError(f"{path}: antet necunoscut {head!r}")
+
+
+def read_state(path):
+    """Returneaza dict cu cheile backend, model, scaler, initialized, history (array sau None)."""
+    npz = is_npz(path)
+    _check_header(path, npz)
+    if npz:
+        return _read_npz(path)
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    history = state.get("history")
+    return {
+        "backend": state.get("backend"),
+        "model": state.get("model"),
+        "scaler": state.get("scaler"),
+        "initialized": state.get("initialized", False),
+        "history": history_array(history) if history else None,
+    }
+
+
+def _read_npz(path):
+    with np.load(path, allow_pickle=False) as npz:
+        files = set(npz.files)
+        model = pickle.loads(npz["model"].tobytes()) if "model" in files else None
+        return {
+            "backend": str(npz["backend"]) if "backend" in files else None,
+            "model": model,
+            "scaler": None,
+            "initialized": bool(npz["initialized"]) if "initialized" in files else False,
+            "history": npz["history"] if "history" in files else None,
+        }
+
+
+def write_state(path, backend, model, initialized, history=None, compress=False):
+    """Scrie starea in formatul dat de extensie (.npz sau pickle).
+
+    Scrierea este atomica: fisier temporar in acelasi director, fsync, apoi os.replace - o intrerupere
+    lasa fie checkpoint-ul vechi, fie pe cel nou, niciodata un fisier trunchiat.
+    """
+    root, ext = os.path.splitext(path)
+    # Extensia ramane ultima - formatul se alege dupa ea
+    tmp = f"{root}.tmp{ext}"
+    try:
+        with open(tmp, "wb") as f:
+            _write(f, is_npz(path), backend, model, initialized, history, compress)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _write(f, npz, backend, model, initialized, history, compress):
+    if not npz:
+        state = {"backend": backend, "model": model, "initialized": initialized}
+        if history is not None:
+            state["history"] = [tuple(r) for r in history.tolist()]
+        pickle.dump(state, f)
+        return
+    arrays = {"initialized": np.array(bool(initialized))}
+    if backend is not None:
+        arrays["backend"] = np.array(backend)
+    if model is not None:
+        arrays["model"] = np.frombuffer(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+    if history is not None:
+        arrays["history"] = np.asarray(history, dtype=RECORD_DTYPE)
+    # np.savez adauga ".npz" doar la un nume de fisier - prin obiectul fisier numele ramane exact
+    (np.savez_compressed if compress else np.savez)(f, **arrays)
+
+
+def salvage_history(path):
+    """Recupereaza observatiile dintr-un pickle vechi trunchiat (scriere intrerupta).
+
+    Istoricul este primul camp din pickle: (BININT zi, BINFLOAT ora, BINFLOAT dB, TUPLE3) repetat.
+    Se citesc opcode-urile pana la primul camp urmator sau pana la locul unde fisierul se termina.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    rows = []
+    args = []
+    try:
+        for op, arg, _ in pickletools.genops(io.BytesIO(data)):
+            if op.name in ("BININT1", "BININT2", "BININT", "BINFLOAT"):
+                args.append(arg)
+                del args[:-3]
+            elif op.name == "TUPLE3":
+                if len(args) == 3 and isinstance(args[0], int):
+                    rows.append(args)
+                args = []
+            elif op.name in ("SHORT_BINUNICODE", "BINUNICODE") and rows:
+                # Urmatoarea cheie a dictionarului (ex. "model") - istoricul s-a incheiat
+                break
+            elif op.name not in ("MEMOIZE", "MARK", "APPENDS", "EMPTY_LIST", "BINPUT", "LONG_BINPUT"):
+                args = []
+    except ValueError:
+        # Sfarsit neasteptat al fisierului - ce s-a citit pana aici ramane valid
+        pass
+    return history_array(rows) if rows else np.empty(0, dtype=RECORD_DTYPE)
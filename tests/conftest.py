@@ -0,0 +1,5 @@
+# Modulele aplicatiei se afla in directorul parinte (fara pachet instalabil)
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
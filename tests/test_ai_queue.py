@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from ai_queue import SampleQueue
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SampleQueue(10, "drop-random")
+    with pytest.raises(ValueError):
+        SampleQueue(0)
+
+
+def test_batch_groups_per_sensor_in_order():
+    queue = SampleQueue(10)
+    queue.put("a", 1.0, 40.0)
+    queue.put("b", 1.0, 50.0)
+    queue.put("a", 2.0, 41.0)
+    assert queue.get_batch() == {"a": ([1.0, 2.0], [40.0, 41.0]), "b": ([1.0], [50.0])}
+    assert queue.qsize() == 0
+
+
+def test_batch_limit():
+    queue = SampleQueue(10)
+    for i in range(5):
+        queue.put("a", i, i)
+    assert queue.get_batch(max_items=3) == {"a": ([0, 1, 2], [0, 1, 2])}
+    assert len(queue) == 2
+
+
+def test_get_batch_timeout():
+    assert SampleQueue().get_batch(timeout=0.01) == {}
+
+
+def test_get_batch_wakes_on_put():
+    queue = SampleQueue()
+    threading.Timer(0.05, queue.put, args=("a", 0.0, 1.0)).start()
+    assert queue.get_batch(timeout=5) == {"a": ([0.0], [1.0])}
+
+
+def test_drop_oldest():
+    queue = SampleQueue(2, "drop-oldest")
+    assert queue.put("a", 0, 1) and queue.put("a", 1, 2)
+    assert not queue.put("a", 2, 3)
+    assert queue.dropped == 1
+    assert queue.get_batch() == {"a": ([1, 2], [2, 3])}
+
+
+def test_drop_newest():
+    queue = SampleQueue(2, "drop-newest")
+    queue.put("a", 0, 1)
+    queue.put("a", 1, 2)
+    assert not queue.put("a", 2, 3)
+    assert queue.dropped == 1
+    assert queue.get_batch() == {"a": ([0, 1], [1, 2])}
+
+
+def test_coalesce_keeps_every_sample_below_capacity():
+    queue = SampleQueue(10, "coalesce")
+    for v in (1.0, 2.0, 3.0):
+        queue.put("a", 5.0, v)
+    assert queue.coalesced == 0
+    assert queue.get_batch() == {"a": ([5.0, 5.0, 5.0], [1.0, 2.0, 3.0])}
+
+
+def test_coalesce_when_full():
+    queue = SampleQueue(2, "coalesce")
+    queue.put("a", 5.0, 1.0)
+    queue.put("a", 5.2, 2.0)
+    # Plina: aceeasi secunda se comaseaza in ultima intrare a senzorului
+    assert queue.put("a", 5.8, 6.0)
+    assert (queue.coalesced, queue.dropped) == (1, 0)
+    # Alta secunda: se elimina cea mai veche intrare
+    assert not queue.put("a", 6.1, 7.0)
+    assert queue.dropped == 1
+    assert queue.get_batch() == {"a": ([5.2, 6.1], [4.0, 7.0])}
+
+
+def test_coalesced_entry_counts_all_dropped_samples():
+    queue = SampleQueue(1, "coalesce")
+    queue.put("a", 1.0, 1.0)
+    queue.put("a", 1.5, 3.0)
+    queue.put("b", 2.0, 5.0)
+    assert queue.dropped == 2
+    assert queue.get_batch() == {"b": ([2.0], [5.0])}
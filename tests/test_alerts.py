@@ -0,0 +1,59 @@
+import pytest
+
+from alerts import AlertEngine, AlertLog
+
+
+def _feed(engine, samples, sensor="s1"):
+    return [(t, event) for t, v in samples for event in [engine.update(sensor, t, v)] if event is not None]
+
+
+def test_alert_after_min_duration():
+    engine = AlertEngine(threshold=60, hysteresis=3, min_duration=1.0, cooldown=5)
+    events = _feed(engine, [(0, 65), (0.5, 66), (1.0, 64), (1.5, 70), (2.0, 50)])
+    assert [(t, kind) for t, (kind, _) in events] == [(1.0, "alert_start"), (2.0, "alert_end")]
+    alert = events[-1][1][1]
+    assert (alert.start, alert.end, alert.peak, alert.threshold) == (0, 2.0, 70, 60)
+    assert 65 < alert.leq < 70
+
+
+def test_hysteresis_keeps_alert_active():
+    engine = AlertEngine(threshold=60, hysteresis=3, min_duration=0, cooldown=0)
+    events = _feed(engine, [(0, 61), (1, 58), (2, 57.5), (3, 56.9)])
+    assert [kind for _, (kind, _) in events] == ["alert_start", "alert_end"]
+    assert events[-1][0] == 3
+
+
+def test_short_exceedance_is_ignored():
+    engine = AlertEngine(threshold=60, hysteresis=3, min_duration=2.0)
+    assert _feed(engine, [(0, 65), (1, 50), (1.5, 65), (2.5, 40)]) == []
+    assert not engine.active("s1")
+
+
+def test_cooldown():
+    engine = AlertEngine(threshold=60, hysteresis=0, min_duration=0, cooldown=5)
+    events = _feed(engine, [(0, 70), (1, 50), (3, 70), (6, 70)])
+    assert [(t, kind) for t, (kind, _) in events] == [(0, "alert_start"), (1, "alert_end"), (6, "alert_start")]
+
+
+def test_sensors_are_independent():
+    engine = AlertEngine(threshold=60, min_duration=0)
+    engine.update("a", 0, 70)
+    assert engine.active("a") and not engine.active("b")
+
+
+def test_log_round_trip(tmp_path):
+    path = str(tmp_path / "alerts.evlog")
+    engine = AlertEngine(threshold=60, hysteresis=0, min_duration=0, cooldown=0, log_path=path)
+    _feed(engine, [(100, 70), (105, 50)], sensor="sala_2")
+    engine.close()
+    events = AlertLog(path).read()
+    assert len(events) == 1
+    assert events[0]["sensor"] == b"sala_2"
+    assert events[0]["duration"] == pytest.approx(5.0)
+
+
+def test_log_invalid_header(tmp_path):
+    path = tmp_path / "alerts.evlog"
+    path.write_bytes(b"XXXX" + b"\0" * 8)
+    with pytest.raises(ValueError):
+        AlertLog(str(path))
@@ -0,0 +1,49 @@
+import pytest
+
+from capture import EXTENSION, CaptureReader, CaptureWriter, paced
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "a.dbcap")
+    writer = CaptureWriter(path, start=1000.0)
+    writer.write(1000.5, b"41.0", ("10.0.0.2", 4210))
+    writer.write(1001.25, b"\x00\x01", ("10.0.0.3", 4210))
+    writer.write(1002.0, b"42.0", ("10.0.0.2", 4210))
+    writer.close()
+    reader = CaptureReader(path)
+    assert reader.start == 1000.0
+    assert list(reader) == [(1000.5, b"41.0", ("10.0.0.2", 4210)),
+                            (1001.25, b"\x00\x01", ("10.0.0.3", 4210)),
+                            (1002.0, b"42.0", ("10.0.0.2", 4210))]
+    assert writer.datagrams == 3 and writer.bytes == (tmp_path / "a.dbcap").stat().st_size
+
+
+def test_directory_gets_timestamped_file(tmp_path):
+    writer = CaptureWriter(str(tmp_path), start=0.0)
+    writer.close()
+    assert writer.path.startswith(str(tmp_path)) and writer.path.endswith(EXTENSION)
+
+
+def test_truncated_capture_reads_complete_records(tmp_path):
+    path = tmp_path / "a.dbcap"
+    writer = CaptureWriter(str(path), start=0.0)
+    for i in range(10):
+        writer.write(i, b"50.0", ("h", 1))
+    writer.close()
+    path.write_bytes(path.read_bytes()[:-3])
+    assert len(list(CaptureReader(str(path)))) == 9
+
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / "x.dbcap"
+    path.write_bytes(b"nu este o captura")
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
+    path.write_bytes(b"DB")
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
+
+
+def test_paced_without_pauses_keeps_order():
+    records = [(float(i), b"", ("h", 1)) for i in range(5)]
+    assert list(paced(records, speed=0)) == records
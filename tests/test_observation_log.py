@@ -0,0 +1,69 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from observation_log import HEADER_SIZE, RECORD_DTYPE, ObservationLog, local_to_unix, week_hours
+
+
+def test_append_extend_and_reopen(tmp_path):
+    path = str(tmp_path / "state.obs")
+    log = ObservationLog(path)
+    log.append(2, 13.5, 61.0)
+    log.extend(np.array([3, 4]), np.array([0.25, 23.75]), np.array([40.0, 45.0]))
+    assert len(log) == 3
+    X, y = log.arrays()
+    assert X.tolist() == [[2, 13.5], [3, 0.25], [4, 23.75]]
+    assert y.tolist() == [61.0, 40.0, 45.0]
+    log.close()
+    log = ObservationLog(path)
+    assert len(log) == 3 and log.records()["weekday"].tolist() == [2, 3, 4]
+    log.close()
+
+
+def test_truncated_record_is_recovered(tmp_path):
+    path = str(tmp_path / "state.obs")
+    log = ObservationLog(path)
+    log.extend(np.zeros(5), np.ones(5), np.full(5, 50.0))
+    log.close()
+    # Scriere intrerupta: jumatate de inregistrare la final
+    with open(path, "ab") as f:
+        f.write(b"\x01" * (RECORD_DTYPE.itemsize // 2))
+    log = ObservationLog(path)
+    assert len(log) == 5
+    log.append(6, 12.0, 70.0)
+    assert log.records()["value"].tolist() == [50.0] * 5 + [70.0]
+    log.close()
+    assert (tmp_path / "state.obs").stat().st_size == HEADER_SIZE + 6 * RECORD_DTYPE.itemsize
+
+
+def test_short_file_gets_new_header(tmp_path):
+    path = tmp_path / "state.obs"
+    path.write_bytes(b"PA")
+    log = ObservationLog(str(path))
+    assert len(log) == 0
+    log.close()
+
+
+def test_invalid_header(tmp_path):
+    path = tmp_path / "state.obs"
+    path.write_bytes(b"XXXX" + b"\0" * 20)
+    with pytest.raises(ValueError):
+        ObservationLog(str(path))
+
+
+def test_week_hours_unix_and_datetime_agree():
+    moments = [datetime.datetime(2026, 3, 29, 2, 30), datetime.datetime(2026, 10, 18, 23, 45),
+               datetime.datetime(2026, 1, 1, 0, 0)]
+    days, hours = week_hours([m.timestamp() for m in moments])
+    assert days.tolist() == [m.weekday() for m in moments]
+    assert hours.tolist() == pytest.approx([m.hour + m.minute / 60 for m in moments])
+    days_dt, hours_dt = week_hours(np.array(moments, dtype="datetime64[s]"))
+    assert days_dt.tolist() == days.tolist()
+    assert hours_dt.tolist() == pytest.approx(hours.tolist())
+
+
+def test_local_to_unix():
+    moments = [datetime.datetime(2026, 7, 1, 12, 0, 30), datetime.datetime(2026, 12, 24, 22, 0)]
+    assert local_to_unix(moments).tolist() == [m.timestamp() for m in moments]
+    assert len(local_to_unix(np.array([], dtype="datetime64[s]"))) == 0
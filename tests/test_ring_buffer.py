@@ -0,0 +1,94 @@
+import threading
+
+import numpy as np
+
+from ring_buffer import MinMaxPyramid, RingBuffer
+
+
+def test_view_is_contiguous_after_wrap():
+    buf = RingBuffer(4)
+    for i in range(10):
+        buf.append(float(i), 10.0 * i)
+    xs, ys = buf.view()
+    assert xs.tolist() == [6, 7, 8, 9] and ys.tolist() == [60, 70, 80, 90]
+    assert len(buf) == 4 and buf.last() == (9.0, 90.0)
+
+
+def test_time_window():
+    buf = RingBuffer(100, window=5)
+    for i in range(20):
+        buf.append(float(i), 0.0)
+    assert buf.view()[0].tolist() == [14, 15, 16, 17, 18, 19]
+    assert len(buf.view(windowed=False)[0]) == 20
+
+
+def test_clear():
+    buf = RingBuffer(3)
+    buf.append(1.0, 1.0)
+    buf.clear()
+    assert len(buf) == 0 and buf.last() is None
+    assert len(buf.view()[0]) == 0 and np.asarray(buf.view()[1]).size == 0
+
+
+def _pyramid(n, capacity=1000):
+    pyramid = MinMaxPyramid(RingBuffer(capacity))
+    values = np.sin(np.arange(n) / 50.0) * 20 + 50
+    for i, v in enumerate(values):
+        pyramid.append(float(i), float(v))
+    return pyramid, values
+
+
+def test_pyramid_returns_raw_samples_when_they_fit():
+    pyramid, values = _pyramid(500)
+    xs, ys = pyramid.view(100, 200, 1000)
+    assert xs[0] == 99 and xs[-1] == 201
+    np.testing.assert_array_equal(ys, values[99:202])
+
+
+def test_pyramid_bounds_points_and_keeps_extremes():
+    pyramid, values = _pyramid(100_000)
+    xs, ys = pyramid.view(0, 100_000, 800)
+    assert len(xs) <= 1000
+    assert ys.max() == values.max() and ys.min() == values.min()
+    # Toata sesiunea, desi buffer-ul brut pastreaza doar ultimele 1000 de esantioane
+    assert xs[0] == 0 and xs[-1] == 99_999
+    assert np.all(np.diff(xs) >= 0)
+
+
+def test_pyramid_zoom_into_evicted_range():
+    pyramid, values = _pyramid(100_000)
+    xs, ys = pyramid.view(10_000, 20_000, 2000)
+    inside = (xs >= 10_000) & (xs <= 20_000)
+    assert inside.sum() > 1000
+    assert ys.max() <= values.max() and ys.min() >= values.min()
+
+
+def test_pyramid_clear_and_raw_start():
+    pyramid, _ = _pyramid(5000)
+    assert pyramid.raw_start() == 4000 and pyramid.first == 0
+    pyramid.clear()
+    assert pyramid.raw_start() is None and pyramid.count == 0
+    xs, ys = pyramid.view(0, 10, 100)
+    assert len(xs) == 0
+
+
+def test_pyramid_view_is_a_consistent_copy_while_appending():
+    pyramid = MinMaxPyramid(RingBuffer(2000))
+    done = threading.Event()
+
+    def writer():
+        i = 0
+        while not done.is_set():
+            pyramid.append(float(i), float(i))
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(300):
+            xs, ys = pyramid.view(0, 1e12, 500)
+            # y = x pentru fiecare esantion; intervalele (t_start, min), (t_end, max) pastreaza egalitatea
+            np.testing.assert_array_equal(xs, ys)
+    finally:
+        done.set()
+        thread.join()
@@ -0,0 +1,49 @@
+import os
+
+from ingest_engine import IngestEngine
+from sensor_registry import SensorRegistry
+
+
+def test_sensors_keyed_by_node_id_or_sender_ip():
+    registry = SensorRegistry(100)
+    a = registry.get(("10.0.0.2", 4000))
+    assert registry.get(("10.0.0.2", 5000)) is a
+    b = registry.get(("10.0.0.2", 4000), node_id="sala_2")
+    assert b is not a
+    assert registry.ids() == ["10.0.0.2", "sala_2"]
+    assert registry.primary is a and registry.find("sala_2") is b
+    assert a.packets == 2
+
+
+def test_state_paths(tmp_path):
+    registry = SensorRegistry(100, state_dir=str(tmp_path))
+    first = registry.get(("10.0.0.2", 1))
+    other = registry.get(("10.0.0.3", 1), node_id="hol/etaj 1")
+    # Primul senzor pastreaza numele starii dintr-o instalare cu un singur nod
+    assert registry.state_path(first) == os.path.join(str(tmp_path), "patternai_state.pkl")
+    assert registry.state_path(other) == os.path.join(str(tmp_path), "patternai_state_hol_etaj_1.pkl")
+    (tmp_path / "patternai_state.npz").write_bytes(b"")
+    assert registry.state_path(first).endswith("patternai_state.npz")
+
+
+def test_sensor_statistics_and_reset():
+    sensor = SensorRegistry(100).get(("h", 1))
+    for t, v in enumerate((40.0, 60.0, 50.0)):
+        sensor.add(float(t), v)
+    assert (sensor.count, sensor.avg, sensor.min, sensor.max) == (3, 50.0, 40.0, 60.0)
+    assert sensor.last_time == 2.0
+    sensor.reset()
+    assert sensor.count == 0 and len(sensor.values) == 0
+
+
+def test_engine_demultiplexes_one_socket(tmp_path):
+    engine = IngestEngine("127.0.0.1", 0, SensorRegistry(100, state_dir=str(tmp_path)))
+    engine.start_offline(1000.0, ai=False)
+    engine.datagram_received(b"45.5", ("10.0.0.2", 4000), arrival=1001.0)
+    engine.datagram_received(b"sala_2:61.0", ("10.0.0.2", 4000), arrival=1001.5)
+    engine.datagram_received(b"sala_2:63.0", ("10.0.0.9", 4000), arrival=1002.0)
+    engine.datagram_received(b"sala_2:reset", ("10.0.0.9", 4000), arrival=1003.0)
+    sensors = {s.id: s for s in engine.sensors}
+    assert sorted(sensors) == ["10.0.0.2", "sala_2"]
+    assert sensors["10.0.0.2"].last_value == 45.5
+    assert sensors["sala_2"].packets == 3 and sensors["sala_2"].count == 0
@@ -0,0 +1,93 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from observation_log import RECORD_DTYPE, ObservationLog
+from state_file import CORRUPT_ERRORS, CorruptStateError, history_array, read_state, salvage_history, write_state
+
+
+@pytest.mark.parametrize("name", ["state.pkl", "state.npz"])
+def test_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    history = history_array([(1, 12.5, 50.0), (2, 13.0, 55.0)])
+    write_state(path, "bins", {"model": 1}, True, history)
+    state = read_state(path)
+    assert (state["backend"], state["model"], state["initialized"]) == ("bins", {"model": 1}, True)
+    assert state["history"].tolist() == history.tolist()
+    assert not list(tmp_path.glob("*.tmp*"))
+
+
+def test_header_check(tmp_path):
+    for name, data in (("a.pkl", b""), ("b.pkl", b"garbage"), ("c.npz", b"\x80\x04")):
+        path = tmp_path / name
+        path.write_bytes(data)
+        with pytest.raises(CorruptStateError):
+            read_state(str(path))
+
+
+def test_truncated_files_are_corrupt(tmp_path):
+    for name in ("a.pkl", "b.npz"):
+        path = tmp_path / name
+        write_state(str(path), "bins", list(range(1000)), True)
+        path.write_bytes(path.read_bytes()[:200])
+        with pytest.raises(CORRUPT_ERRORS):
+            read_state(str(path))
+
+
+def test_environment_errors_are_not_corruption(tmp_path):
+    # Clasa dintr-un modul inexistent (ex. alta versiune de biblioteca) - fisierul este intact
+    path = tmp_path / "a.pkl"
+    path.write_bytes(b"\x80\x04\x8c\tnosuchmod\x94\x8c\x01X\x94\x93\x94)\x81\x94.")
+    with pytest.raises(Exception) as info:
+        read_state(str(path))
+    assert not isinstance(info.value, CORRUPT_ERRORS)
+
+
+def test_salvage_truncated_legacy_pickle(tmp_path):
+    rows = [(d % 7, d * 0.5, 40.0 + d) for d in range(50)]
+    data = pickle.dumps({"history": rows, "model": None, "initialized": False}, protocol=2)
+    path = tmp_path / "old.pkl"
+    path.write_bytes(data[:len(data) // 2])
+    history = salvage_history(str(path))
+    assert history.dtype == RECORD_DTYPE
+    assert 0 < len(history) < 50
+    np.testing.assert_allclose(history["value"], [r[2] for r in rows[:len(history)]])
+
+
+def _history_log(path, n=60):
+    log = ObservationLog(str(path))
+    log.extend(np.arange(n) % 7, np.linspace(0, 23, n), np.full(n, 50.0))
+    log.close()
+
+
+def test_corrupt_checkpoint_is_quarantined(tmp_path):
+    from pattern_ai import PatternAI
+    path = tmp_path / "state.pkl"
+    path.write_bytes(b"\x80\x04\x95")
+    _history_log(tmp_path / "state.obs")
+    ai = PatternAI(save_path=str(path), backend="bins", keep_generations=0)
+    assert (tmp_path / "state.pkl.corrupt").exists()
+    assert ai.initialized and len(ai.history) == 60
+    ai.close()
+
+
+def test_unloadable_checkpoint_starts_fresh_and_is_kept(tmp_path):
+    from pattern_ai import PatternAI
+    path = tmp_path / "state.pkl"
+    data = b"\x80\x04\x8c\tnosuchmod\x94\x8c\x01X\x94\x93\x94)\x81\x94."
+    path.write_bytes(data)
+    ai = PatternAI(save_path=str(path), backend="bins", keep_generations=0)
+    assert not (tmp_path / "state.pkl.corrupt").exists()
+    assert (tmp_path / "state.pkl.unloaded").read_bytes() == data
+    ai.close()
+
+
+def test_close_skips_unchanged_checkpoint(tmp_path):
+    from pattern_ai import PatternAI
+    path = tmp_path / "state.pkl"
+    _history_log(tmp_path / "state.obs")
+    PatternAI(save_path=str(path), backend="bins", keep_generations=0).close()
+    written = path.stat().st_mtime_ns
+    PatternAI(save_path=str(path), backend="bins", keep_generations=0).close()
+    assert path.stat().st_mtime_ns == written
@@ -0,0 +1,129 @@
+import datetime
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from timeseries import RAW_DTYPE, ROLLUP_DTYPE, TimeSeriesStore, compact, merge_rollups, rollup
+
+
+def _raw(t, values):
+    raw = np.empty(len(t), dtype=RAW_DTYPE)
+    raw["t"] = t
+    raw["value"] = values
+    return raw
+
+
+def _midnight(days_ago=0):
+    day = datetime.date.today() - datetime.timedelta(days=days_ago)
+    return datetime.datetime.combine(day, datetime.time()).timestamp()
+
+
+def test_rollup():
+    rows = rollup(_raw([0.0, 0.5, 1.0, 1.2, 1.9], [40, 60, 50, 50, 80]), 1)
+    assert rows["t"].tolist() == [0.0, 1.0]
+    assert rows["n"].tolist() == [2, 3]
+    assert rows["min"].tolist() == [40, 50]
+    assert rows["max"].tolist() == [60, 80]
+    assert rows["mean"][1] == pytest.approx(60.0)
+    assert rows["leq"][0] == pytest.approx(10 * np.log10((1e4 + 1e6) / 2), abs=1e-4)
+    assert len(rollup(np.empty(0, dtype=RAW_DTYPE), 60)) == 0
+
+
+def test_merge_rollups_combines_split_interval():
+    raw = _raw([0.0, 10.0, 20.0, 30.0], [40, 50, 60, 70])
+    split = np.concatenate([rollup(raw[:2], 60), rollup(raw[2:], 60)])
+    merged = merge_rollups(split)
+    whole = rollup(raw, 60)
+    assert len(merged) == 1
+    for field in ROLLUP_DTYPE.names:
+        assert merged[field][0] == pytest.approx(whole[field][0], abs=1e-4)
+
+
+def test_level_for():
+    assert TimeSeriesStore.level_for(0) == 0
+    assert TimeSeriesStore.level_for(0.5) == 0
+    assert TimeSeriesStore.level_for(30) == 1
+    assert TimeSeriesStore.level_for(60) == 60
+    assert TimeSeriesStore.level_for(86400) == 3600
+
+
+def test_query_open_day(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    t0 = _midnight() + 60
+    for i in range(600):
+        store.append("s1", t0 + i * 0.5, 40.0 + i % 10)
+    level, raw = store.query("s1", t0, t0 + 100)
+    assert level == 0 and len(raw) == 200
+    level, rows = store.query("s1", t0, t0 + 300, resolution=60)
+    assert level == 60 and rows["n"].sum() == 600
+    assert store.query("s2", t0, t0 + 100)[1].size == 0
+    store.close()
+
+
+def test_rollover_compacts_finished_day(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    yesterday = _midnight(1) + 3600
+    today = _midnight() + 10
+    for i in range(100):
+        store.append("s1", yesterday + i, 50.0)
+    store.append("s1", today, 60.0)
+    level, rows = store.query("s1", yesterday, today + 1, resolution=3600)
+    assert rows["n"].sum() == 101
+    store.close()
+
+    day = datetime.date.fromtimestamp(yesterday).isoformat()
+    assert sorted(os.listdir(tmp_path / "s1")) == [day + ".npz", datetime.date.today().isoformat()]
+    # O zi comprimata si ziua curenta, citite dupa repornire
+    store = TimeSeriesStore(str(tmp_path))
+    assert len(store.query("s1", yesterday, today + 1)[1]) == 101
+    assert store.days("s1") == [day, datetime.date.today().isoformat()]
+    store.close()
+
+
+def test_stale_day_compacted_at_startup(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    t = _midnight(2) + 100
+    store.append("s1", t, 70.0)
+    store.close()
+    store = TimeSeriesStore(str(tmp_path))
+    assert store.query("s1", t, t + 1)[1]["value"].tolist() == [70.0]
+    store.close()
+    assert os.listdir(tmp_path / "s1") == [datetime.date.fromtimestamp(t).isoformat() + ".npz"]
+
+
+def test_truncated_record_is_dropped_on_reopen(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    t = _midnight() + 5
+    store.append("s1", t, 50.0)
+    store.close()
+    raw = tmp_path / "s1" / datetime.date.today().isoformat() / "raw.bin"
+    with open(raw, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    store = TimeSeriesStore(str(tmp_path))
+    store.append("s1", t + 1, 51.0)
+    assert store.query("s1", t, t + 2)[1]["value"].tolist() == [50.0, 51.0]
+    store.close()
+
+
+def test_compaction_interrupted_before_cleanup_does_not_duplicate(tmp_path):
+    day = tmp_path / "s1" / "2020-01-01"
+    day.mkdir(parents=True)
+    _raw([1.0, 2.0, 3.0], [50, 51, 52]).tofile(day / "raw.bin")
+    saved = (day / "raw.bin").read_bytes()
+    compact(str(day))
+    # Oprire intre scrierea arhivei si stergerea directorului: raw.bin ramane, plus un esantion intarziat
+    day.mkdir()
+    (day / "raw.bin").write_bytes(saved + _raw([2.5], [60]).tobytes())
+    compact(str(day))
+    with np.load(str(day) + ".npz") as npz:
+        assert npz["raw"]["t"].tolist() == [1.0, 2.0, 2.5, 3.0]
+        assert npz["r60"]["n"].tolist() == [4]
+
+
+def test_close_stops_compaction_thread(tmp_path):
+    before = threading.active_count()
+    for _ in range(3):
+        TimeSeriesStore(str(tmp_path)).close()
+    assert threading.active_count() == before
@@ -0,0 +1,105 @@
+import math
+import threading
+
+import numpy as np
+import pytest
+
+from window_stats import LevelHistogram, SlidingStats, WindowStats, format_summary
+
+
+def test_constant_signal():
+    window = WindowStats(60)
+    for i in range(100):
+        window.add(i * 0.1, 50.0)
+    summary = window.summary()
+    assert summary.n == 100
+    assert summary.leq == pytest.approx(50.0)
+    assert summary.max == summary.min == 50.0
+    for level in (summary.l10, summary.l50, summary.l90):
+        assert level == pytest.approx(50.0, abs=0.1)
+
+
+def test_leq_is_energy_average():
+    window = WindowStats(60)
+    window.add(0, 40.0)
+    window.add(1, 60.0)
+    assert window.leq == pytest.approx(10 * math.log10((1e4 + 1e6) / 2))
+
+
+def test_percentiles_match_numpy():
+    rng = np.random.default_rng(1)
+    values = rng.uniform(30, 90, 5000)
+    window = WindowStats(10_000)
+    for i, v in enumerate(values):
+        window.add(i, v)
+    summary = window.summary()
+    # L10 = nivelul depasit 10% din timp = percentila 90
+    assert summary.l10 == pytest.approx(np.percentile(values, 90), abs=0.2)
+    assert summary.l50 == pytest.approx(np.percentile(values, 50), abs=0.2)
+    assert summary.l90 == pytest.approx(np.percentile(values, 10), abs=0.2)
+
+
+def test_expiry_updates_max_min():
+    window = WindowStats(10)
+    window.add(0, 80.0)
+    window.add(5, 40.0)
+    window.add(9, 60.0)
+    assert window.summary().max == 80.0
+    window.add(12, 50.0)
+    summary = window.summary()
+    assert (summary.n, summary.max, summary.min) == (3, 60.0, 40.0)
+
+
+def test_summary_now_expires_without_new_samples():
+    stats = SlidingStats(windows=(60, 900))
+    for i in range(10):
+        stats.add(i, 55.0)
+    assert stats.summary(30)[60].n == 10
+    summary = stats.summary(100)
+    assert summary[60].n == 0 and summary[900].n == 10
+    assert format_summary(summary[60]) == "---"
+
+
+def test_nan_is_ignored():
+    stats = SlidingStats(windows=(60,))
+    stats.add(0, float("nan"))
+    stats.add(1, 45.0)
+    assert stats.window(60).summary().n == 1
+
+
+def test_histogram_clamps_out_of_range():
+    hist = LevelHistogram(lo=0, hi=10, step=1)
+    assert hist.bin(-math.inf) == 0
+    assert hist.bin(-5) == 0
+    assert hist.bin(500) == hist.size - 1
+    hist.add(hist.bin(3.2))
+    assert hist.quantiles([0.5]) == [3.5]
+
+
+def test_clear():
+    window = WindowStats(60)
+    window.add(0, 70.0)
+    window.clear()
+    assert window.summary().n == 0 and window.leq is None
+
+
+def test_concurrent_expiry_keeps_counts_consistent():
+    # Receptia adauga, GUI-ul expira din alt thread - histograma si numarul de esantioane raman egale
+    window = WindowStats(1.0)
+    done = threading.Event()
+
+    def reader():
+        t = 0.0
+        while not done.is_set():
+            window.summary(t)
+            t += 0.001
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for i in range(50_000):
+        window.add(i * 0.001, 40.0 + i % 30)
+    done.set()
+    thread.join()
+    assert window.hist.total == len(window)
+    assert window.hist.counts.min() >= 0
+    assert window.summary(1e9).n == 0 and window.hist.total == 0
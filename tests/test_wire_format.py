@@ -0,0 +1,77 @@
+import numpy as np
+
+from wire_format import HEADER, DeviceClock, SequenceTracker, decode, encode
+
+
+def test_binary_round_trip():
+    packet = decode(encode(7, 42, 1000, [40.5, 41.0, 41.5], interval_ms=100))
+    assert packet.node_id == "7"
+    assert (packet.seq, packet.millis, packet.interval_ms, packet.reset) == (42, 1000, 100, False)
+    np.testing.assert_array_equal(packet.values, np.array([40.5, 41.0, 41.5], dtype=np.float32))
+
+
+def test_binary_reset_without_values():
+    packet = decode(encode(1, 0, 0, [], reset=True))
+    assert packet.reset and len(packet.values) == 0
+
+
+def test_binary_invalid_length_or_version():
+    data = encode(1, 0, 0, [50.0, 51.0])
+    assert decode(data[:-1]) is None
+    assert decode(data + b"\0") is None
+    assert decode(data[:2] + b"\x02" + data[3:]) is None
+
+
+def test_seq_and_millis_wrap_to_u32():
+    packet = decode(encode(1, 2 ** 32 + 5, -1, [1.0]))
+    assert packet.seq == 5 and packet.millis == 0xFFFFFFFF
+
+
+def test_legacy_ascii():
+    packet = decode(b"41.25\n")
+    assert packet.node_id is None and packet.seq is None
+    assert packet.values.tolist() == [41.25]
+    assert decode(b"sala_2:55.5").node_id == "sala_2"
+    assert decode(b"sala_2:reset").reset
+    assert decode(b"RESET").reset
+    assert decode(b"nu este un numar") is None
+
+
+def test_short_binary_falls_back_to_ascii():
+    # "DB" fara header complet nu este un pachet binar
+    assert decode(b"DB" + b"\0" * (HEADER.size - 3)) is None
+
+
+def test_sequence_loss_and_reorder():
+    seq = SequenceTracker()
+    for n in (10, 11, 14):
+        assert seq.update(n)
+    assert seq.lost == 2
+    # 12 soseste tarziu - nu mai este pierdut, dar se ignora
+    assert not seq.update(12)
+    assert (seq.lost, seq.reordered, seq.received) == (1, 1, 4)
+    assert seq.loss_ratio == 1 / 5
+
+
+def test_sequence_wrap_around_and_restart():
+    seq = SequenceTracker()
+    seq.update(0xFFFFFFFE)
+    assert seq.update(0xFFFFFFFF) and seq.update(0) and seq.update(1)
+    assert seq.lost == 0
+    # Salt inapoi mare = reboot al placii
+    assert seq.update(1_000_000) and seq.update(3)
+    assert seq.restarts == 1
+
+
+def test_device_clock_keeps_minimum_offset():
+    clock = DeviceClock()
+    assert clock.to_local(1000, 100.05) == 100.05
+    # Intarzierea din retea nu muta ceasul; o sosire mai rapida il corecteaza
+    assert clock.to_local(2000, 101.30) == 101.05
+    assert abs(clock.to_local(3000, 102.01) - 102.01) < 1e-9
+
+
+def test_device_clock_resyncs_after_reboot():
+    clock = DeviceClock()
+    clock.to_local(500_000, 1000.0)
+    assert clock.to_local(1000, 1010.0) == 1010.0
@@ -0,0 +1,377 @@
+# Stocare pe termen lung - serii de timp partitionate pe senzor si zi, cu agregari 1 s / 1 min / 1 h
+#
+#   <root>/<senzor>/<AAAA-LL-ZZ>/raw.bin, r1.bin, r60.bin, r3600.bin   - ziua curenta, append-only
+#   <root>/<senzor>/<AAAA-LL-ZZ>.npz                                   - zilele incheiate, comprimate
+#
+# Comprimarea zilelor incheiate (la miezul noptii si cele ramase de la o rulare anterioara) se face pe un
+# thread separat - receptia si pornirea interfetei nu asteapta scrierea arhivei.
+#
+# Fiecare agregare pastreaza (t inceput interval, n, min, max, medie, Leq). query() alege cea mai grosiera
+# rezolutie care respecta pasul cerut, deci o zi intreaga la rezolutie de minut inseamna 1440 de randuri.
+
+import datetime
+import math
+import os
+import queue
+import re
+import shutil
+import struct
+import threading
+
+import numpy as np
+
+
+RAW_DTYPE = np.dtype([("t", "<f8"), ("value", "<f4")])
+ROLLUP_DTYPE = np.dtype([("t", "<f8"), ("n", "<u4"), ("min", "<f4"), ("max", "<f4"),
+                         ("mean", "<f4"), ("leq", "<f4")])
+# Rezolutiile agregarilor (secunde); 0 = esantioane brute
+LEVELS = (1, 60, 3600)
+
+# Scriere per esantion fara array-uri temporare
+_RAW = struct.Struct("<df")
+_ROLLUP = struct.Struct("<dIffff")
+
+
+def _safe(sensor_id):
+    return re.sub(r"[^A-Za-z0-9_-]", "_", str(sensor_id))
+
+
+def _day_bounds(t):
+    """(cheie zi, inceput, sfarsit) in ora locala pentru timestamp-ul Unix t."""
+    day = datetime.datetime.fromtimestamp(t).date()
+    start = datetime.datetime.combine(day, datetime.time()).timestamp()
+    end = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time()).timestamp()
+    return day.isoformat(), start, end
+
+
+def rollup(raw, level):
+    """Agregarea vectorizata a esantioanelor brute (sortate in timp) pe intervale de `level` secunde."""
+    if not len(raw):
+        return np.empty(0, dtype=ROLLUP_DTYPE)
+    t = raw["t"]
+    v = raw["value"].astype(np.float64)
+    keys = np.floor(t / level)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+    n = np.diff(np.append(starts, len(v)))
+    out = np.empty(len(starts), dtype=ROLLUP_DTYPE)
+    out["t"] = keys[starts] * level
+    out["n"] = n
+    out["min"] = np.minimum.reduceat(v, starts)
+    out["max"] = np.maximum.reduceat(v, starts)
+    out["mean"] = np.add.reduceat(v, starts) / n
+    with np.errstate(divide="ignore"):
+        out["leq"] = 10 * np.log10(np.add.reduceat(10 ** (v / 10), starts) / n)
+    return out
+
+
+def merge_rollups(rows):
+    """Combina randurile cu acelasi t (ex. interval inceput inainte si continuat dupa o repornire)."""
+    if len(rows) < 2 or np.all(np.diff(rows["t"]) > 0):
+        return rows
+    order = np.argsort(rows["t"], kind="stable")
+    rows = rows[order]
+    uniq, starts = np.unique(rows["t"], return_index=True)
+    n = np.add.reduceat(rows["n"].astype(np.float64), starts)
+    out = np.empty(len(uniq), dtype=ROLLUP_DTYPE)
+    out["t"] = uniq
+    out["n"] = n
+    out["min"] = np.minimum.reduceat(rows["min"], starts)
+    out["max"] = np.maximum.reduceat(rows["max"], starts)
+    out["mean"] = np.add.reduceat(rows["mean"] * rows["n"], starts) / n
+    energy = 10 ** (rows["leq"].astype(np.float64) / 10) * rows["n"]
+    with np.errstate(divide="ignore"):
+        out["leq"] = 10 * np.log10(np.add.reduceat(energy, starts) / n)
+    return out
+
+
+class _Bucket:
+    """Intervalul de agregare deschis (inca nescris) pentru un nivel."""
+
+    __slots__ = ("key", "n", "min", "max", "sum", "energy")
+
+    def __init__(self, key):
+        self.key = key
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.energy = 0.0
+
+    def add(self, value):
+        self.n += 1
+        self.sum += value
+        self.energy += 10.0 ** (value / 10.0)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def row(self, level):
+        leq = 10.0 * math.log10(self.energy / self.n) if self.energy > 0 else -math.inf
+        return (self.key * level, self.n, self.min, self.max, self.sum / self.n, leq)
+
+
+class _Partition:
+    """Ziua curenta a unui senzor: fisiere append-only + intervalele deschise."""
+
+    def __init__(self, path, day, start, end):
+        self.path = path
+        self.day = day
+        self.start = start
+        self.end = end
+        os.makedirs(path, exist_ok=True)
+        self.files = {0: self._open("raw.bin", RAW_DTYPE)}
+        for level in LEVELS:
+            self.files[level] = self._open(f"r{level}.bin", ROLLUP_DTYPE)
+        self.buckets = {level: None for level in LEVELS}
+
+    def _open(self, name, dtype):
+        path = os.path.join(self.path, name)
+        f = open(path, "ab")
+        # O scriere intrerupta poate lasa o inregistrare incompleta la final
+        size = f.tell()
+        if size % dtype.itemsize:
+            f.truncate(size - size % dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+        return f
+
+    def append(self, t, value):
+        self.files[0].write(_RAW.pack(t, value))
+        for level in LEVELS:
+            key = int(t // level)
+            bucket = self.buckets[level]
+            if bucket is None or bucket.key != key:
+                if bucket is not None:
+                    self._write(level, bucket)
+                bucket = self.buckets[level] = _Bucket(key)
+            bucket.add(value)
+
+    def _write(self, level, bucket):
+        self.files[level].write(_ROLLUP.pack(*bucket.row(level)))
+
+    def flush(self):
+        for f in self.files.values():
+            f.flush()
+
+    def read(self, level):
+        """Datele scrise + intervalul deschis (agregarile), fara copie pe disc."""
+        self.files[level].flush()
+        name = "raw.bin" if level == 0 else f"r{level}.bin"
+        data = np.fromfile(os.path.join(self.path, name), dtype=RAW_DTYPE if level == 0 else ROLLUP_DTYPE)
+        if level:
+            bucket = self.buckets[level]
+            if bucket is not None:
+                data = np.append(data, np.array(bucket.row(level), dtype=ROLLUP_DTYPE))
+            data = merge_rollups(data)
+        return data
+
+    def close(self):
+        for level, bucket in self.buckets.items():
+            if bucket is not None:
+                self._write(level, bucket)
+        self.buckets = {level: None for level in LEVELS}
+        for f in self.files.values():
+            f.close()
+
+
+def _not_archived(raw, archive):
+    """Esantioanele din raw care nu sunt deja in arhiva (acelasi t si aceeasi valoare).
+
+    O oprire intre scrierea arhivei si stergerea directorului lasa raw.bin langa un .npz care il contine -
+    la urmatoarea comprimare acele esantioane nu se mai adauga a doua oara.
+    """
+    if not len(raw) or not len(archive):
+        return raw
+    archive = archive[np.argsort(archive["t"], kind="stable")]
+    idx = np.minimum(np.searchsorted(archive["t"], raw["t"]), len(archive) - 1)
+    known = (archive["t"][idx] == raw["t"]) & (archive["value"][idx] == raw["value"])
+    return raw[~known]
+
+
+def compact(path):
+    """Transforma directorul unei zile incheiate intr-un singur .npz comprimat; agregarile se refac din brute."""
+    raw_path = os.path.join(path, "raw.bin")
+    raw = np.fromfile(raw_path, dtype=RAW_DTYPE) if os.path.exists(raw_path) else np.empty(0, dtype=RAW_DTYPE)
+    # Esantioane intarziate pentru o zi deja comprimata - se adauga la arhiva existenta
+    if os.path.exists(path + ".npz"):
+        with np.load(path + ".npz") as npz:
+            raw = np.concatenate([npz["raw"], _not_archived(raw, npz["raw"])])
+    if len(raw) > 1 and np.any(np.diff(raw["t"]) < 0):
+        raw = raw[np.argsort(raw["t"], kind="stable")]
+    arrays = {"raw": raw}
+    for level in LEVELS:
+        arrays[f"r{level}"] = rollup(raw, level)
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path + ".npz")
+    shutil.rmtree(path)
+
+
+# Cererea de cautare a zilelor ramase necomprimate (prima din coada thread-ului de comprimare)
+_STALE_SCAN = "<stale>"
+
+
+class TimeSeriesStore:
+    """Esantioane (t Unix, dB) per senzor, pastrate pe disc, cu interogari pe interval."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._partitions = {}
+        self._lock = threading.Lock()
+        # Zilele cerute thread-ului de comprimare si inca neterminate (cai de directoare)
+        self._compacting = set()
+        self._compacted = threading.Condition(self._lock)
+        self._compact_queue = None
+        self._compact_thread = None
+        # Zilele ramase de la rularea anterioara se cauta tot pe thread-ul de comprimare; close() asteapta si
+        # cautarea (marcata in _compacting ca o cerere obisnuita)
+        with self._lock:
+            self._schedule(_STALE_SCAN)
+
+    def _sensor_dir(self, sensor_id):
+        return os.path.join(self.root, _safe(sensor_id))
+
+    # Zilele ramase deschise dupa o oprire (sau dinaintea miezului noptii) se comprima la pornire
+    def _compact_stale(self):
+        today = datetime.date.today().isoformat()
+        for sensor in os.listdir(self.root):
+            sensor_dir = os.path.join(self.root, sensor)
+            if not os.path.isdir(sensor_dir):
+                continue
+            for day in os.listdir(sensor_dir):
+                path = os.path.join(sensor_dir, day)
+                if os.path.isdir(path) and day < today:
+                    with self._lock:
+                        # Ziua deschisa de receptie (esantioane cu data din urma) se comprima la inchiderea ei
+                        if all(part.path != path for part in self._partitions.values()):
+                            self._schedule(path)
+
+    def _schedule(self, path):
+        # Apelat sub self._lock; dupa close() (esantion tarziu) thread-ul de comprimare porneste din nou,
+        # cu o coada proprie
+        if path in self._compacting:
+            return
+        if self._compact_thread is None:
+            self._compact_queue = queue.Queue()
+            self._compact_thread = threading.Thread(target=self._compact_worker, args=(self._compact_queue,),
+                                                    name="timeseries-compact", daemon=True)
+            self._compact_thread.start()
+        self._compacting.add(path)
+        self._compact_queue.put(path)
+
+    def _compact_worker(self, requests):
+        while True:
+            path = requests.get()
+            # None: oprire (close)
+            if path is None:
+                return
+            try:
+                if path is _STALE_SCAN:
+                    self._compact_stale()
+                else:
+                    compact(path)
+            except Exception as e:
+                # Ziua ramane necomprimata pe disc - se reincearca la urmatoarea pornire
+                print(f"Istoric: comprimarea {path} a esuat - {e!r}")
+            with self._compacted:
+                self._compacting.discard(path)
+                self._compacted.notify_all()
+
+    def _wait_compacted(self, path):
+        # Apelat sub self._lock; wait() elibereaza lock-ul, deci receptia celorlalti senzori continua
+        while path in self._compacting:
+            self._compacted.wait()
+
+    def append(self, sensor_id, t, value):
+        with self._lock:
+            part = self._partitions.get(sensor_id)
+            if part is None or not part.start <= t < part.end:
+                part = self._roll(sensor_id, part, t)
+            part.append(t, value)
+
+    def _roll(self, sensor_id, part, t):
+        day, start, end = _day_bounds(t)
+        if part is not None:
+            part.close()
+            # Ziua anterioara s-a incheiat - se comprima in fundal
+            if part.day < day:
+                self._schedule(part.path)
+        path = os.path.join(self._sensor_dir(sensor_id), day)
+        # Un esantion intarziat pentru o zi in curs de comprimare asteapta arhiva, apoi deschide ziua din nou
+        self._wait_compacted(path)
+        part = _Partition(path, day, start, end)
+        self._partitions[sensor_id] = part
+        return part
+
+    def sensors(self):
+        return sorted(os.listdir(self.root))
+
+    def days(self, sensor_id):
+        sensor_dir = self._sensor_dir(sensor_id)
+        if not os.path.isdir(sensor_dir):
+            return []
+        return sorted({name.split(".")[0] for name in os.listdir(sensor_dir)})
+
+    @staticmethod
+    def level_for(resolution):
+        """Cea mai grosiera agregare cu pasul <= resolution (secunde); 0 = esantioane brute."""
+        return max([0] + [level for level in LEVELS if level <= (resolution or 0)])
+
+    def query(self, sensor_id, start, end, resolution=0):
+        """Datele din [start, end) (timestamp-uri Unix).
+
+        resolution = pasul maxim acceptat (secunde). Returneaza (level, array): esantioane brute (RAW_DTYPE)
+        pentru level 0, altfel randuri ROLLUP_DTYPE.
+        """
+        level = self.level_for(resolution)
+        key = "raw" if level == 0 else f"r{level}"
+        sensor_dir = self._sensor_dir(sensor_id)
+        chunks = []
+        day = datetime.datetime.fromtimestamp(start).date()
+        last = datetime.datetime.fromtimestamp(max(end - 1e-6, start)).date()
+        with self._lock:
+            while day <= last:
+                name = day.isoformat()
+                # Arhiva unei zile in curs de comprimare inca nu exista, iar fisierele zilei dispar la final
+                self._wait_compacted(os.path.join(sensor_dir, name))
+                # Citita dupa asteptare - intre timp receptia poate trece la o zi noua
+                open_part = self._partitions.get(sensor_id)
+                if open_part is not None and open_part.day == name:
+                    chunks.append(open_part.read(level))
+                elif os.path.exists(os.path.join(sensor_dir, name + ".npz")):
+                    with np.load(os.path.join(sensor_dir, name + ".npz")) as npz:
+                        chunks.append(npz[key])
+                elif os.path.isdir(os.path.join(sensor_dir, name)):
+                    # Zi deschisa de un alt proces (ex. daemon-ul ruleaza inca)
+                    part = os.path.join(sensor_dir, name, "raw.bin" if level == 0 else f"{key}.bin")
+                    if os.path.exists(part):
+                        data = np.fromfile(part, dtype=RAW_DTYPE if level == 0 else ROLLUP_DTYPE)
+                        chunks.append(data if level == 0 else merge_rollups(data))
+                day += datetime.timedelta(days=1)
+        dtype = RAW_DTYPE if level == 0 else ROLLUP_DTYPE
+        data = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+        # Intervalul agregat care contine `start` se include si el
+        lo = np.searchsorted(data["t"], start - level, side="right") if level else np.searchsorted(data["t"], start)
+        hi = np.searchsorted(data["t"], end)
+        return level, data[lo:hi]
+
+    def flush(self):
+        with self._lock:
+            for part in self._partitions.values():
+                part.flush()
+
+    def close(self):
+        with self._lock:
+            for part in self._partitions.values():
+                part.close()
+            self._partitions.clear()
+            # Comprimarile cerute (si cautarea de la pornire) se termina inainte de iesire
+            while self._compacting:
+                self._compacted.wait()
+            thread = self._compact_thread
+            if thread is not None:
+                self._compact_queue.put(None)
+                self._compact_thread = None
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,197 @@
+# Statistici pe ferestre glisante (1 min / 15 min / 1 h) - actualizate la fiecare esantion
+#
+#   Leq      - nivel echivalent (media energiei, in domeniul liniar)
+#   L10/L50/L90 - nivelul depasit 10% / 50% / 90% din timp (percentilele 90 / 50 / 10)
+#   max/min  - deque-uri monotone, O(1) amortizat per esantion
+
+import math
+import threading
+from collections import deque, namedtuple
+
+import numpy as np
+
+
+# Ferestrele implicite (secunde) si etichetele lor
+WINDOWS = (60, 900, 3600)
+LABELS = {60: "1 min", 900: "15 min", 3600: "1 h"}
+
+WindowSummary = namedtuple("WindowSummary", "n leq l10 l50 l90 max min")
+
+
+def window_label(span):
+    return LABELS.get(span, f"{span:g} s")
+
+
+class LevelHistogram:
+    """Histograma cu pas fix pentru percentile - adaugare / eliminare O(1), interogare O(numar bin-uri)."""
+
+    def __init__(self, lo=0.0, hi=140.0, step=0.1):
+        self.lo = lo
+        self.step = step
+        self.size = int(round((hi - lo) / step))
+        self.counts = np.zeros(self.size, dtype=np.int64)
+        self.total = 0
+
+    def bin(self, value):
+        # Valorile in afara intervalului (inclusiv -inf de la un semnal nul) se strang in bin-urile extreme
+        x = (value - self.lo) / self.step
+        if not x > 0:
+            return 0
+        return self.size - 1 if x >= self.size else int(x)
+
+    def add(self, b):
+        self.counts[b] += 1
+        self.total += 1
+
+    def remove(self, b):
+        self.counts[b] -= 1
+        self.total -= 1
+
+    def clear(self):
+        self.counts[:] = 0
+        self.total = 0
+
+    def quantiles(self, qs):
+        """Percentilele cerute (0..1), cu rezolutia unui bin - o singura suma cumulativa pentru toate."""
+        if not self.total:
+            return [None] * len(qs)
+        cum = np.cumsum(self.counts)
+        ranks = np.maximum(np.ceil(np.asarray(qs) * self.total), 1)
+        idx = np.searchsorted(cum, ranks)
+        return (self.lo + (idx + 0.5) * self.step).tolist()
+
+
+class WindowStats:
+    """Statistici pentru ultimele `span` secunde.
+
+    Scrise de thread-ul de receptie si citite (cu expirare) si din GUI - add / expire / summary / clear
+    lucreaza sub acelasi lock.
+    """
+
+    def __init__(self, span):
+        self.span = span
+        self._lock = threading.Lock()
+        # (timp, valoare, energie, bin histograma)
+        self._samples = deque()
+        # Candidatii pentru max / min: valori descrescatoare / crescatoare
+        self._max = deque()
+        self._min = deque()
+        self._energy = 0.0
+        self._evicted = 0
+        self.hist = LevelHistogram()
+        self._version = 0
+        self._cache = None
+
+    def __len__(self):
+        return len(self._samples)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._max.clear()
+            self._min.clear()
+            self._energy = 0.0
+            self._evicted = 0
+            self.hist.clear()
+            self._version += 1
+
+    def add(self, t, value):
+        energy = 10.0 ** (value / 10.0)
+        b = self.hist.bin(value)
+        with self._lock:
+            self._samples.append((t, value, energy, b))
+            self._energy += energy
+            self.hist.add(b)
+
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((t, value))
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((t, value))
+
+            self._expire(t)
+            self._version += 1
+
+    def expire(self, now):
+        with self._lock:
+            self._expire(now)
+
+    def _expire(self, now):
+        limit = now - self.span
+        samples = self._samples
+        while samples and samples[0][0] <= limit:
+            _, _, energy, b = samples.popleft()
+            self._energy -= energy
+            self.hist.remove(b)
+            self._evicted += 1
+            self._version += 1
+        while self._max and self._max[0][0] <= limit:
+            self._max.popleft()
+        while self._min and self._min[0][0] <= limit:
+            self._min.popleft()
+
+        # Suma energiei se reface exact dupa ce fereastra s-a innoit complet - erorile de rotunjire
+        # din scaderi nu se acumuleaza pe rulari lungi (cost amortizat O(1))
+        if self._evicted and self._evicted >= len(samples):
+            self._energy = math.fsum(s[2] for s in samples)
+            self._evicted = 0
+
+    @property
+    def leq(self):
+        with self._lock:
+            return self._leq()
+
+    def _leq(self):
+        n = len(self._samples)
+        if not n or self._energy <= 0:
+            return None
+        return 10.0 * math.log10(self._energy / n)
+
+    def summary(self, now=None):
+        """WindowSummary pentru fereastra curenta; recalculat doar daca s-au schimbat esantioanele."""
+        with self._lock:
+            if now is not None:
+                self._expire(now)
+            if self._cache is not None and self._cache[0] == self._version:
+                return self._cache[1]
+            result = WindowSummary(0, None, None, None, None, None, None)
+            if self._samples:
+                l90, l50, l10 = self.hist.quantiles((0.10, 0.50, 0.90))
+                result = WindowSummary(len(self._samples), self._leq(), l10, l50, l90,
+                                       self._max[0][1], self._min[0][1])
+            self._cache = (self._version, result)
+            return result
+
+
+class SlidingStats:
+    """Acelasi flux de esantioane, mai multe ferestre (implicit 1 min / 15 min / 1 h)."""
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = {span: WindowStats(span) for span in windows}
+
+    def add(self, t, value):
+        # NaN nu are loc in statistici (pachet corupt)
+        if value != value:
+            return
+        for window in self.windows.values():
+            window.add(t, value)
+
+    def clear(self):
+        for window in self.windows.values():
+            window.clear()
+
+    def window(self, span):
+        return self.windows[span]
+
+    def summary(self, now=None):
+        return {span: window.summary(now) for span, window in self.windows.items()}
+
+
+def format_summary(summary):
+    if not summary.n:
+        return "---"
+    def fmt(v):
+        return f"{v:.1f}" if v is not None and math.isfinite(v) else "---"
+    return (f"Leq {fmt(summary.leq)}  L10 {fmt(summary.l10)}  L50 {fmt(summary.l50)}"
+            f"  L90 {fmt(summary.l90)}  Max {fmt(summary.max)}")
@@ -0,0 +1,128 @@
+# Format pachete senzor
+#
+# v1 (binar, little-endian) - header de 18 octeti urmat de N valori float32:
+#   magic "DB" | version u8 | flags u8 | node_id u16 | seq u32 | millis u32 | count u16 | interval_ms u16
+#   millis = momentul primei valori (ceasul placii), interval_ms = distanta dintre valori
+#   flags bit 0 = cerere reset (count poate fi 0)
+#
+# Legacy (ASCII): "41.25", "reset", optional cu prefix "<id>:"
+
+import re
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+
+MAGIC = b"DB"
+VERSION = 1
+FLAG_RESET = 0x01
+HEADER = struct.Struct("<2sBBHIIHH")
+_SAMPLES = np.dtype("<f4")
+
+# seq / millis sunt None pentru pachetele legacy (fara informatie de la senzor)
+Packet = namedtuple("Packet", "node_id seq millis interval_ms values reset")
+
+# Prefix optional de identificare a nodului in payload: "<id>:<valoare>" sau "<id>:reset"
+_NODE_ID = re.compile(r"^([A-Za-z0-9_-]{1,32}):(.*)$")
+
+
+def split_node_id(line):
+    """Returneaza (node_id, rest) - node_id este None pentru payload-urile fara prefix."""
+    m = _NODE_ID.match(line)
+    if m:
+        return m.group(1), m.group(2).strip()
+    return None, line
+
+
+def encode(node_id, seq, millis, values, interval_ms=0, reset=False):
+    values = np.asarray(values, dtype=_SAMPLES)
+    header = HEADER.pack(MAGIC, VERSION, FLAG_RESET if reset else 0, node_id,
+                         seq & 0xFFFFFFFF, millis & 0xFFFFFFFF, len(values), interval_ms)
+    return header + values.tobytes()
+
+
+def decode(data):
+    """Decodeaza un datagram (binar v1 sau ASCII legacy). Returneaza Packet sau None daca este invalid."""
+    if len(data) >= HEADER.size and data[:2] == MAGIC:
+        magic, version, flags, node_id, seq, millis, count, interval_ms = HEADER.unpack_from(data)
+        if version != VERSION or len(data) != HEADER.size + count * _SAMPLES.itemsize:
+            return None
+        # Toate valorile dintr-un singur apel, fara copiere
+        values = np.frombuffer(data, dtype=_SAMPLES, count=count, offset=HEADER.size)
+        return Packet(str(node_id), seq, millis, interval_ms, values, bool(flags & FLAG_RESET))
+
+    node_id, line = split_node_id(data.decode(errors="ignore").strip())
+    # Reset remote, daca se detecteaza cuvantul "reset"
+    if line.lower() == "reset":
+        return Packet(node_id, None, None, 0, np.empty(0, dtype=_SAMPLES), True)
+    # Daca nu se reuseste extragerea unei valori float, pachetul a avut o eroare
+    try:
+        value = float(line)
+    except ValueError:
+        return None
+    return Packet(node_id, None, None, 0, np.array([value], dtype=_SAMPLES), False)
+
+
+class SequenceTracker:
+    """Pierderi / reordonari pe baza numerelor de secventa (u32, cu wrap-around)."""
+
+    # Un salt inapoi mai mare decat atat inseamna reboot al placii, nu reordonare
+    RESTART_GAP = 1000
+
+    def __init__(self):
+        self.expected = None
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.restarts = 0
+
+    def update(self, seq):
+        """Returneaza False pentru pachetele sosite in afara ordinii (deja considerate pierdute)."""
+        self.received += 1
+        if self.expected is None:
+            self.expected = (seq + 1) & 0xFFFFFFFF
+            return True
+        # Diferenta cu semn, modulo 2^32
+        delta = ((seq - self.expected + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+        if delta >= 0:
+            self.lost += delta
+            self.expected = (seq + 1) & 0xFFFFFFFF
+            return True
+        if -delta > self.RESTART_GAP:
+            self.restarts += 1
+            self.expected = (seq + 1) & 0xFFFFFFFF
+            return True
+        # Pachet intarziat: fusese numarat ca pierdut
+        self.reordered += 1
+        self.lost = max(self.lost - 1, 0)
+        return False
+
+    @property
+    def loss_ratio(self):
+        total = self.received + self.lost
+        return self.lost / total if total else 0.0
+
+
+class DeviceClock:
+    """Transforma millis() de pe placa in timp local, folosind offset-ul minim observat.
+
+    Intarzierea din retea doar mareste offset-ul, deci minimul aproximeaza cel mai bine ceasul placii.
+    """
+
+    RESYNC = 2.0
+
+    def __init__(self):
+        self.offset = None
+        self._last_millis = None
+
+    def to_local(self, millis, arrival):
+        device = millis / 1000.0
+        # millis() face wrap dupa ~49 zile; un salt mare inapoi inseamna wrap sau reboot - se resincronizeaza
+        if self._last_millis is not None and self._last_millis - millis > 60000:
+            self.offset = None
+        self._last_millis = millis
+        offset = arrival - device
+        if self.offset is None or offset < self.offset or offset - self.offset > self.RESYNC:
+            self.offset = offset
+        return device + self.offset